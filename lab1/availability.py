@@ -0,0 +1,211 @@
+# Учёт занятости мест читального зала по временным слотам.
+# Для каждого места и дня хранится битовая маска занятых слотов (бит = слот длиной
+# slot_minutes), поэтому вопрос «свободно ли место с 14:00 до 17:00» — это одна
+# побитовая операция на день, а не перебор всех бронирований
+
+import threading
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Iterator, Tuple, Optional
+
+SLOT_MINUTES = 60
+
+# Результаты пакетного бронирования по каждой заявке
+RESERVED = "reserved"      # место забронировано
+TAKEN = "taken"            # место уже занято на это время
+NO_SEAT = "no_seat"        # такого места нет в зале
+BAD_TIME = "bad_time"      # время не является datetime
+DUPLICATE = "duplicate"    # повтор заявки в том же пакете
+SKIPPED = "skipped"        # заявка корректна, но пакет отменён из-за других заявок
+
+
+class SeatSchedule:
+    slot_minutes: int
+    slots_per_day: int
+
+    def __init__(self, slot_minutes: int = SLOT_MINUTES):
+        if not isinstance(slot_minutes, int):
+            raise TypeError("slot_minutes должен быть целым числом.")
+        if slot_minutes < 1 or 1440 % slot_minutes:
+            raise ValueError("slot_minutes должен делить сутки (1440 минут) нацело.")
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = 1440 // slot_minutes
+        # место -> {день (ordinal) -> маска занятых слотов}
+        self._masks: Dict[int, Dict[int, int]] = {}
+        # Несколько бронирований в одном слоте (например, 14:00 и 14:30 при часовых слотах)
+        self._extra: Dict[Tuple[int, int, int], int] = {}
+        # день -> {время бронирования -> сколько мест забронировано на это время}
+        self._by_day: Dict[int, Dict[datetime, int]] = {}
+        self._max_day: Optional[int] = None
+        # Места одного зала бронируются параллельно, а счётчики по дням у них общие
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _slot(self, dt: datetime) -> Tuple[int, int]:
+        return dt.toordinal(), (dt.hour * 60 + dt.minute) // self.slot_minutes
+
+    def slot_start(self, dt: datetime) -> datetime:
+        minutes = (dt.hour * 60 + dt.minute) // self.slot_minutes * self.slot_minutes
+        return datetime.combine(dt.date(), datetime.min.time()) + timedelta(minutes=minutes)
+
+    def add(self, seat: int, dt: datetime) -> None:
+        with self._lock:
+            self._add(seat, dt)
+
+    def _add(self, seat: int, dt: datetime) -> None:
+        day, slot = self._slot(dt)
+        days = self._masks.setdefault(seat, {})
+        mask = days.get(day, 0)
+        bit = 1 << slot
+        if mask & bit:
+            key = (seat, day, slot)
+            self._extra[key] = self._extra.get(key, 0) + 1
+        else:
+            days[day] = mask | bit
+        times = self._by_day.setdefault(day, {})
+        times[dt] = times.get(dt, 0) + 1
+        if self._max_day is None or day > self._max_day:
+            self._max_day = day
+
+    def remove(self, seat: int, dt: datetime) -> None:
+        with self._lock:
+            self._remove(seat, dt)
+
+    def _remove(self, seat: int, dt: datetime) -> None:
+        day, slot = self._slot(dt)
+        key = (seat, day, slot)
+        if key in self._extra:
+            self._extra[key] -= 1
+            if not self._extra[key]:
+                del self._extra[key]
+        else:
+            days = self._masks.get(seat, {})
+            mask = days.get(day, 0) & ~(1 << slot)
+            if mask:
+                days[day] = mask
+            else:
+                days.pop(day, None)
+        times = self._by_day.get(day)
+        if times and dt in times:
+            times[dt] -= 1
+            if not times[dt]:
+                del times[dt]
+            if not times:
+                del self._by_day[day]
+                if day == self._max_day:
+                    self._max_day = max(self._by_day) if self._by_day else None
+
+    def clear_seat(self, seat: int, bookings) -> None:
+        for dt in bookings:
+            self.remove(seat, dt)
+
+    def _range_masks(self, start: datetime, end: datetime) -> Iterator[Tuple[int, int]]:
+        # Маски слотов по дням, покрывающие полуинтервал [start, end)
+        if end <= start:
+            return
+        first_day, first_slot = self._slot(start)
+        last = end - timedelta(microseconds=1)
+        last_day, last_slot = self._slot(last)
+        full = (1 << self.slots_per_day) - 1
+        for day in range(first_day, last_day + 1):
+            lo = first_slot if day == first_day else 0
+            hi = last_slot if day == last_day else self.slots_per_day - 1
+            yield day, full & ~((1 << lo) - 1) & ((1 << (hi + 1)) - 1)
+
+    def slot_starts(self, start: datetime, end: datetime) -> List[datetime]:
+        # Начала всех слотов, пересекающихся с [start, end)
+        result = []
+        for day, mask in self._range_masks(start, end):
+            base = datetime.combine(date.fromordinal(day), datetime.min.time())
+            slot = 0
+            while mask:
+                if mask & 1:
+                    result.append(base + timedelta(minutes=slot * self.slot_minutes))
+                mask >>= 1
+                slot += 1
+        return result
+
+    def is_free(self, seat: int, start: datetime, end: datetime) -> bool:
+        days = self._masks.get(seat)
+        if not days:
+            return True
+        return all(not (days.get(day, 0) & mask) for day, mask in self._range_masks(start, end))
+
+    def find_free(self, seats, start: datetime, end: datetime, n: Optional[int] = None) -> List[int]:
+        ranges = list(self._range_masks(start, end))
+        result = []
+        for seat in seats:
+            days = self._masks.get(seat)
+            if not days or all(not (days.get(day, 0) & mask) for day, mask in ranges):
+                result.append(seat)
+                if n is not None and len(result) >= n:
+                    break
+        return result
+
+    def has_bookings_after(self, now: datetime) -> bool:
+        if self._max_day is None:
+            return False
+        today = now.toordinal()
+        if self._max_day > today:
+            return True
+        if self._max_day < today:
+            return False
+        return any(dt >= now for dt in self._by_day[today])
+
+
+# Бронирования одного места {время -> читатель}; любые изменения словаря
+# (в том числе из загрузчиков) сразу отражаются в расписании зала
+class SeatBookings(dict):
+    def __init__(self, schedule: SeatSchedule, seat: int):
+        super().__init__()
+        self.schedule = schedule
+        self.seat = seat
+
+    def __setitem__(self, dt, reader) -> None:
+        if dt not in self:
+            self.schedule.add(self.seat, dt)
+        super().__setitem__(dt, reader)
+
+    def __delitem__(self, dt) -> None:
+        super().__delitem__(dt)
+        self.schedule.remove(self.seat, dt)
+
+    def pop(self, dt, *default):
+        if dt in self:
+            self.schedule.remove(self.seat, dt)
+        return super().pop(dt, *default)
+
+    def popitem(self):
+        dt, reader = super().popitem()
+        self.schedule.remove(self.seat, dt)
+        return dt, reader
+
+    def setdefault(self, dt, reader=None):
+        if dt not in self:
+            self[dt] = reader
+        return self[dt]
+
+    def update(self, *args, **kwargs) -> None:
+        for dt, reader in dict(*args, **kwargs).items():
+            self[dt] = reader
+
+    def clear(self) -> None:
+        self.schedule.clear_seat(self.seat, list(self))
+        super().clear()
+
+    def __reduce__(self):
+        return _rebuild_seat_bookings, (self.schedule, self.seat, dict(self))
+
+
+def _rebuild_seat_bookings(schedule: SeatSchedule, seat: int, items: dict) -> SeatBookings:
+    # Расписание восстанавливается вместе с залом, поэтому повторно его не заполняем
+    bookings = SeatBookings(schedule, seat)
+    dict.update(bookings, items)
+    return bookings
@@ -0,0 +1,958 @@
+# Подключаемые хранилища данных. Бэкенд подписывается на события хранилищ (stores.emit)
+# и превращает каждое изменение в одну транзакцию вместо полной перезаписи снимка
+
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Dict, Optional
+
+import stores
+from stores import catalog, reader_registry, librarian_registry, NameRegistry
+from classes import Author, Location, Book, Reader, Librarian, Room, Review, Club
+from cache import ObjectCache, CacheStats, LRU
+from lazy import CAPACITY, ReaderRef
+from scheduler import scheduler, LOAN, TICKET
+
+
+# Базовый класс: обработчики on_<событие> вызываются для событий хранилищ
+class StorageBackend:
+    def attach(self) -> None:
+        stores.subscribe(self.on_event)
+
+    def detach(self) -> None:
+        stores.unsubscribe(self.on_event)
+
+    def on_event(self, op: str, data: dict) -> None:
+        handler = getattr(self, f"on_{op}", None)
+        if handler is not None:
+            handler(**data)
+
+    def is_empty(self) -> bool:
+        raise NotImplementedError
+
+    def load(self) -> None:
+        # Заполняет хранилища (каталог, реестры, залы, клубы) из бэкенда
+        raise NotImplementedError
+
+    def import_current(self) -> None:
+        # Записывает всё, что сейчас загружено (например, из data.json или data.xml)
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS librarians (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    phone TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS librarians_name ON librarians (first_name, last_name);
+
+CREATE TABLE IF NOT EXISTS readers (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    email TEXT NOT NULL,
+    reader_type TEXT NOT NULL,
+    education_place TEXT,
+    in_club INTEGER NOT NULL DEFAULT 0,
+    school_name TEXT,
+    grade TEXT,
+    university TEXT,
+    course INTEGER
+);
+CREATE INDEX IF NOT EXISTS readers_name ON readers (first_name, last_name);
+
+CREATE TABLE IF NOT EXISTS tickets (
+    reader_id INTEGER PRIMARY KEY REFERENCES readers (id) ON DELETE CASCADE,
+    ticket_id TEXT NOT NULL,
+    issue_date TEXT NOT NULL,
+    expiry_date TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    reader_id INTEGER PRIMARY KEY REFERENCES readers (id) ON DELETE CASCADE,
+    text TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    date TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS books (
+    isbn TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    author_first TEXT NOT NULL,
+    author_last TEXT NOT NULL,
+    author_bio TEXT NOT NULL DEFAULT '',
+    rack TEXT NOT NULL,
+    shelf TEXT NOT NULL,
+    is_available INTEGER NOT NULL DEFAULT 1,
+    borrower_id INTEGER REFERENCES readers (id),
+    loan_seq INTEGER,
+    seq INTEGER NOT NULL,
+    due_date TEXT
+);
+CREATE INDEX IF NOT EXISTS books_borrower ON books (borrower_id, loan_seq);
+CREATE INDEX IF NOT EXISTS books_author ON books (author_last, author_first);
+CREATE INDEX IF NOT EXISTS books_location ON books (rack, shelf);
+
+CREATE TABLE IF NOT EXISTS rooms (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    total_seats INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS bookings (
+    room_id INTEGER NOT NULL REFERENCES rooms (id) ON DELETE CASCADE,
+    seat INTEGER NOT NULL,
+    dt TEXT NOT NULL,
+    reader_id INTEGER NOT NULL REFERENCES readers (id) ON DELETE CASCADE,
+    PRIMARY KEY (room_id, seat, dt)
+);
+CREATE INDEX IF NOT EXISTS bookings_dt ON bookings (room_id, dt);
+
+CREATE TABLE IF NOT EXISTS clubs (
+    id INTEGER PRIMARY KEY,
+    current_book_isbn TEXT,
+    name TEXT
+);
+
+CREATE TABLE IF NOT EXISTS club_members (
+    club_id INTEGER NOT NULL REFERENCES clubs (id) ON DELETE CASCADE,
+    reader_id INTEGER NOT NULL REFERENCES readers (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (club_id, reader_id)
+);
+
+CREATE TABLE IF NOT EXISTS club_meetings (
+    club_id INTEGER NOT NULL REFERENCES clubs (id) ON DELETE CASCADE,
+    dt TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS club_meetings_club ON club_meetings (club_id);
+"""
+
+
+READER_QUERY = (
+    "SELECT r.id, r.first_name, r.last_name, r.phone, r.email, r.reader_type, r.education_place,"
+    " r.in_club, r.school_name, r.grade, r.university, r.course,"
+    " t.ticket_id, t.issue_date, t.expiry_date, v.text, v.rating, v.date"
+    " FROM readers r JOIN tickets t ON t.reader_id = r.id"
+    " LEFT JOIN reviews v ON v.reader_id = r.id"
+)
+BOOK_QUERY = (
+    "SELECT isbn, title, author_first, author_last, author_bio, rack, shelf, is_available,"
+    " borrower_id, loan_seq, due_date FROM books"
+)
+
+
+# SQLite-бэкенд (стандартный sqlite3, без сервера)
+class SQLiteBackend(StorageBackend):
+    path: str
+
+    def __init__(self, path: str):
+        self.path = path
+        # Одно соединение на процесс; события из разных потоков пишутся по очереди под _lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        # Объект в памяти -> первичный ключ строки (читатели и клубы не имеют
+        # естественного уникального ключа)
+        self._ids: dict[int, int] = {}
+        self._seq = 0
+
+    def on_event(self, op: str, data: dict) -> None:
+        with self._lock:
+            super().on_event(op, data)
+
+    def _migrate(self) -> None:
+        # Базы, созданные до появления сроков выдачи, получают недостающую колонку
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(books)")}
+        if "due_date" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE books ADD COLUMN due_date TEXT")
+        # ...и клубы — колонку названия
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(clubs)")}
+        if "name" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE clubs ADD COLUMN name TEXT")
+
+    def close(self) -> None:
+        self.detach()
+        self.conn.close()
+
+    def is_empty(self) -> bool:
+        tables = ("librarians", "readers", "books", "rooms", "clubs")
+        return not any(self.conn.execute(f"SELECT 1 FROM {t} LIMIT 1").fetchone() for t in tables)
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _id(self, obj) -> int | None:
+        return self._ids.get(id(obj))
+
+    # --- Запись отдельных объектов ---
+
+    def _insert_librarian(self, l: Librarian) -> None:
+        cur = self.conn.execute(
+            "INSERT INTO librarians (first_name, last_name, phone) VALUES (?, ?, ?)",
+            (l.first_name, l.last_name, l.phone)
+        )
+        self._ids[id(l)] = cur.lastrowid
+
+    def _reader_row(self, r: Reader) -> tuple:
+        return (
+            r.first_name, r.last_name, r.phone, r.email, r.reader_type,
+            r.education_place, int(bool(r.in_club)),
+            getattr(r, "school_name", None), getattr(r, "grade", None),
+            getattr(r, "university", None), getattr(r, "course", None)
+        )
+
+    def _insert_reader(self, r: Reader) -> None:
+        cur = self.conn.execute(
+            "INSERT INTO readers (first_name, last_name, phone, email, reader_type, education_place,"
+            " in_club, school_name, grade, university, course) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self._reader_row(r)
+        )
+        rid = self._ids[id(r)] = cur.lastrowid
+        self.conn.execute(
+            "INSERT INTO tickets (reader_id, ticket_id, issue_date, expiry_date) VALUES (?, ?, ?, ?)",
+            (rid, r.ticket.ticket_id, r.ticket.issue_date.isoformat(), r.ticket.expiry_date.isoformat())
+        )
+        if r.review:
+            self._upsert_review(r)
+
+    def _upsert_review(self, r: Reader) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO reviews (reader_id, text, rating, date) VALUES (?, ?, ?, ?)",
+            (self._id(r), r.review.text, r.review.rating, r.review.date.isoformat())
+        )
+
+    def _insert_book(self, b: Book) -> None:
+        borrower_id = self._id(b.current_borrower) if b.current_borrower else None
+        self.conn.execute(
+            "INSERT OR REPLACE INTO books (isbn, title, author_first, author_last, author_bio, rack, shelf,"
+            " is_available, borrower_id, loan_seq, seq, due_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (b.isbn, b.title, b.author.first_name, b.author.last_name, b.author.bio,
+             b.location.rack, b.location.shelf, int(bool(b.is_available)), borrower_id,
+             self._next_seq() if borrower_id else None, self._next_seq(),
+             b.due_date.isoformat() if b.due_date else None)
+        )
+
+    def _insert_room(self, room: Room) -> None:
+        cur = self.conn.execute(
+            "INSERT INTO rooms (name, total_seats) VALUES (?, ?)", (room.name, len(room.seats))
+        )
+        room_id = self._ids[id(room)] = cur.lastrowid
+        self.conn.executemany(
+            "INSERT INTO bookings (room_id, seat, dt, reader_id) VALUES (?, ?, ?, ?)",
+            [(room_id, seat, dt.isoformat(), self._id(reader))
+             for seat, times in room.seats.items() for dt, reader in times.items()
+             if self._id(reader) is not None]
+        )
+
+    def _insert_club(self, club: Club) -> None:
+        cur = self.conn.execute(
+            "INSERT INTO clubs (current_book_isbn, name) VALUES (?, ?)",
+            (club.current_book.isbn if club.current_book else None, club.key())
+        )
+        club_id = self._ids[id(club)] = cur.lastrowid
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO club_members (club_id, reader_id, seq) VALUES (?, ?, ?)",
+            [(club_id, self._id(m), self._next_seq()) for m in club.members if self._id(m) is not None]
+        )
+        self.conn.executemany(
+            "INSERT INTO club_meetings (club_id, dt) VALUES (?, ?)",
+            [(club_id, dt.isoformat()) for dt in club.meetings]
+        )
+
+    # --- Обработчики событий: одно изменение — одна транзакция ---
+
+    def on_add_book(self, obj: Book) -> None:
+        with self.conn:
+            self._insert_book(obj)
+
+    def on_update_book(self, obj: Book) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE books SET title = ?, author_first = ?, author_last = ?, author_bio = ?,"
+                " rack = ?, shelf = ? WHERE isbn = ?",
+                (obj.title, obj.author.first_name, obj.author.last_name, obj.author.bio,
+                 obj.location.rack, obj.location.shelf, obj.isbn)
+            )
+
+    def on_remove_book(self, obj: Book) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM books WHERE isbn = ?", (obj.isbn,))
+
+    def on_lend(self, book: Book, reader: Reader) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE books SET is_available = 0, borrower_id = ?, loan_seq = ?, due_date = ? WHERE isbn = ?",
+                (self._id(reader), self._next_seq(),
+                 book.due_date.isoformat() if book.due_date else None, book.isbn)
+            )
+
+    def on_return(self, book: Book, reader: Reader) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE books SET is_available = 1, borrower_id = NULL, loan_seq = NULL, due_date = NULL"
+                " WHERE isbn = ?",
+                (book.isbn,)
+            )
+
+    def on_add_reader(self, obj: Reader) -> None:
+        with self.conn:
+            self._insert_reader(obj)
+
+    def on_update_reader(self, obj: Reader) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE readers SET first_name = ?, last_name = ?, phone = ?, email = ?, reader_type = ?,"
+                " education_place = ?, in_club = ?, school_name = ?, grade = ?, university = ?, course = ?"
+                " WHERE id = ?",
+                self._reader_row(obj) + (self._id(obj),)
+            )
+
+    def on_review(self, reader: Reader) -> None:
+        if self._id(reader) is None:
+            return
+        with self.conn:
+            self._upsert_review(reader)
+
+    def on_remove_reader(self, obj: Reader) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM readers WHERE id = ?", (self._ids.pop(id(obj), None),))
+
+    def on_add_librarian(self, obj: Librarian) -> None:
+        with self.conn:
+            self._insert_librarian(obj)
+
+    def on_update_librarian(self, obj: Librarian) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE librarians SET first_name = ?, last_name = ?, phone = ? WHERE id = ?",
+                (obj.first_name, obj.last_name, obj.phone, self._id(obj))
+            )
+
+    def on_remove_librarian(self, obj: Librarian) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM librarians WHERE id = ?", (self._ids.pop(id(obj), None),))
+
+    def on_add_room(self, obj: Room) -> None:
+        with self.conn:
+            self._insert_room(obj)
+
+    def on_rename_room(self, obj: Room, old_name: str) -> None:
+        with self.conn:
+            self.conn.execute("UPDATE rooms SET name = ? WHERE id = ?", (obj.name, self._id(obj)))
+
+    def on_remove_room(self, obj: Room) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM rooms WHERE id = ?", (self._ids.pop(id(obj), None),))
+
+    def on_reserve_seat(self, room: Room, seat: int, dt: datetime, reader: Reader) -> None:
+        # Залы и клубы, не сохранённые через save(), в базе не отслеживаются
+        if self._id(room) is None or self._id(reader) is None:
+            return
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO bookings (room_id, seat, dt, reader_id) VALUES (?, ?, ?, ?)",
+                (self._id(room), seat, dt.isoformat(), self._id(reader))
+            )
+
+    def on_reserve_seats(self, room: Room, bookings: list) -> None:
+        if self._id(room) is None:
+            return
+        rows = [
+            (self._id(room), seat, dt.isoformat(), self._id(reader))
+            for seat, dt, reader in bookings if self._id(reader) is not None
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO bookings (room_id, seat, dt, reader_id) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def on_add_club(self, obj: Club) -> None:
+        with self.conn:
+            self._insert_club(obj)
+
+    def on_update_club(self, obj: Club) -> None:
+        if self._id(obj) is None:
+            return
+        with self.conn:
+            self.conn.execute(
+                "UPDATE clubs SET current_book_isbn = ? WHERE id = ?",
+                (obj.current_book.isbn if obj.current_book else None, self._id(obj))
+            )
+
+    def on_remove_club(self, obj: Club) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM clubs WHERE id = ?", (self._ids.pop(id(obj), None),))
+
+    def on_add_meeting(self, club: Club, dt: datetime) -> None:
+        if self._id(club) is None:
+            return
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO club_meetings (club_id, dt) VALUES (?, ?)", (self._id(club), dt.isoformat())
+            )
+
+    def on_join_club(self, club: Club, reader: Reader) -> None:
+        if self._id(club) is None or self._id(reader) is None:
+            return
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO club_members (club_id, reader_id, seq) VALUES (?, ?, ?)",
+                (self._id(club), self._id(reader), self._next_seq())
+            )
+            self.conn.execute("UPDATE readers SET in_club = 1 WHERE id = ?", (self._id(reader),))
+
+    def on_leave_club(self, club: Club, reader: Reader) -> None:
+        if self._id(club) is None or self._id(reader) is None:
+            return
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM club_members WHERE club_id = ? AND reader_id = ?",
+                (self._id(club), self._id(reader))
+            )
+            self.conn.execute("UPDATE readers SET in_club = 0 WHERE id = ?", (self._id(reader),))
+
+    # --- Импорт и загрузка целиком ---
+
+    def import_current(self) -> None:
+        with self.conn:
+            for table in ("club_meetings", "club_members", "clubs", "bookings", "rooms",
+                          "books", "reviews", "tickets", "readers", "librarians"):
+                self.conn.execute(f"DELETE FROM {table}")
+            self._ids.clear()
+            for l in librarian_registry:
+                self._insert_librarian(l)
+            for r in reader_registry:
+                self._insert_reader(r)
+            # Книги в порядке выдачи каждому читателю, затем остальные
+            loaned = set()
+            for r in reader_registry:
+                for b in r.borrowed_books:
+                    if b.current_borrower is r and catalog.get(b.isbn) is b:
+                        loaned.add(id(b))
+            for b in catalog:
+                self._insert_book(b)
+            for r in reader_registry:
+                for b in r.borrowed_books:
+                    if id(b) in loaned:
+                        self.conn.execute(
+                            "UPDATE books SET loan_seq = ? WHERE isbn = ?", (self._next_seq(), b.isbn)
+                        )
+            for room in stores.rooms:
+                self._insert_room(room)
+            for club in stores.clubs:
+                self._insert_club(club)
+
+    @staticmethod
+    def _reader_from_row(row: tuple) -> Reader:
+        (_, first, last, phone, email, reader_type, education_place, in_club,
+         school_name, grade, university, course, ticket_id, issue, expiry, text, rating, rev_date) = row
+        # Данные в базу попали уже проверенными — повторные проверки не нужны
+        reader = Reader.from_records([{
+            "first_name": first, "last_name": last, "phone": phone, "email": email,
+            "reader_type": reader_type, "school_name": school_name, "grade": grade,
+            "university": university, "course": course,
+            "ticket": {"ticket_id": ticket_id, "issue_date": issue, "expiry_date": expiry}
+        }], trusted=True)[0]
+        reader.education_place = education_place
+        reader.in_club = bool(in_club)
+        if text is not None:
+            review = Review(text, rating, reader)
+            review.date = datetime.fromisoformat(rev_date)
+            reader.review = review
+        return reader
+
+    @staticmethod
+    def _book_from_row(row: tuple, authors: dict, locations: dict) -> Book:
+        # Заёмщика (row[8]) связывает вызывающий код
+        isbn, title, a_first, a_last, a_bio, rack, shelf, is_available, _, _, due = row
+        author = authors.get((a_first, a_last))
+        if author is None:
+            author = authors[(a_first, a_last)] = Author.get_or_create(a_first, a_last, a_bio)
+        location = locations.get((rack, shelf))
+        if location is None:
+            location = locations[(rack, shelf)] = Location.get_or_create(rack, shelf)
+        book = Book(title, author, isbn, location)
+        book.is_available = bool(is_available)
+        if due:
+            book.due_date = date.fromisoformat(due)
+        return book
+
+    def _load_seq(self) -> None:
+        q = self.conn.execute
+        self._seq = q("SELECT MAX(MAX(seq), IFNULL(MAX(loan_seq), 0)) FROM books").fetchone()[0] or 0
+        self._seq = max(self._seq, q("SELECT IFNULL(MAX(seq), 0) FROM club_members").fetchone()[0])
+
+    def _load_librarians(self) -> None:
+        q = self.conn.execute
+        for lid, first, last, phone in q("SELECT id, first_name, last_name, phone FROM librarians ORDER BY id"):
+            librarian = Librarian(last, first, phone)
+            self._ids[id(librarian)] = lid
+            librarian_registry.add(librarian)
+
+    def load(self) -> None:
+        librarian_registry.clear()
+        reader_registry.clear()
+        catalog.clear()
+        stores.rooms.clear()
+        stores.clubs.clear()
+        self._ids.clear()
+        q = self.conn.execute
+        self._load_seq()
+        self._load_librarians()
+
+        readers = {}
+        for row in q(READER_QUERY + " ORDER BY r.id"):
+            reader = self._reader_from_row(row)
+            readers[row[0]] = reader
+            self._ids[id(reader)] = row[0]
+            reader_registry.add(reader)
+
+        authors = {}
+        locations = {}
+        loans = []
+        for row in q(BOOK_QUERY + " ORDER BY seq"):
+            book = self._book_from_row(row, authors, locations)
+            borrower_id, loan_seq = row[8], row[9]
+            if borrower_id in readers:
+                book.current_borrower = readers[borrower_id]
+                loans.append((loan_seq, book))
+            catalog.add(book)
+        for _, book in sorted(loans, key=lambda item: item[0]):
+            book.current_borrower.borrowed_books.append(book)
+
+        rooms = {}
+        for room_id, name, total_seats in q("SELECT id, name, total_seats FROM rooms ORDER BY id"):
+            room = rooms[room_id] = Room(name, total_seats)
+            self._ids[id(room)] = room_id
+            stores.rooms.append(room)
+        for room_id, seat, dt, reader_id in q("SELECT room_id, seat, dt, reader_id FROM bookings ORDER BY rowid"):
+            if room_id in rooms and reader_id in readers:
+                rooms[room_id].seats[seat][datetime.fromisoformat(dt)] = readers[reader_id]
+
+        clubs = {}
+        for club_id, isbn, name in q("SELECT id, current_book_isbn, name FROM clubs ORDER BY id"):
+            club = clubs[club_id] = Club(name)
+            if isbn:
+                club.current_book = catalog.get(isbn)
+            self._ids[id(club)] = club_id
+            stores.clubs.append(club)
+        for club_id, reader_id in q("SELECT club_id, reader_id FROM club_members ORDER BY seq"):
+            if club_id in clubs and reader_id in readers:
+                clubs[club_id].members.append(readers[reader_id])
+        for club_id, dt in q("SELECT club_id, dt FROM club_meetings ORDER BY rowid"):
+            if club_id in clubs:
+                clubs[club_id].meetings.append(datetime.fromisoformat(dt))
+
+
+# SQLite с загрузкой по требованию и отложенной записью (для баз, не влезающих в память).
+# load() читает только библиотекарей, залы и клубы; книга или читатель собираются из
+# строк при первом обращении через catalog.get / reader_registry.get. Группы (читатель
+# с выданными ему книгами или невыданная книга, как в lazy.py) держит ObjectCache на
+# capacity групп. Выдача, возврат, отзыв и правка книги или читателя лишь отмечают
+# группу изменённой: её строки обновляются, когда группу вытесняют, при flush() и при
+# закрытии. Добавление и удаление книг и читателей, залы и клубы пишутся сразу.
+# Участники клубов и книги клубов не вытесняются: на них ссылаются клубы
+class CachedSQLiteBackend(SQLiteBackend):
+    cache: ObjectCache
+
+    def __init__(self, path: str, capacity: int = CAPACITY, policy: str = LRU):
+        super().__init__(path)
+        # Загрузка по требованию и запись вытесняемых групп идут и внутри обработчиков событий
+        self._lock = threading.RLock()
+        self.conn.create_function("fold", 1, lambda s: s.strip().casefold(), deterministic=True)
+        self.cache = ObjectCache(capacity, policy, write_back=self._write_group, on_evict=self._unload)
+        self._books: Dict[str, Book] = {}
+        self._readers: Dict[int, Reader] = {}
+        self._club_keys: set = set()
+        self._authors: dict = {}
+        self._locations: dict = {}
+
+    @property
+    def resident(self) -> int:
+        return len(self._books) + len(self._readers)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.cache.stats
+
+    def close(self) -> None:
+        self.detach()
+        if catalog.loader == self.book:
+            catalog.loader = None
+        if reader_registry.loader == self.reader:
+            reader_registry.loader = None
+        if scheduler.source == self.due_dates:
+            scheduler.source = None
+        self.flush()
+        self.conn.close()
+
+    def due_dates(self) -> list:
+        # Сроки для планировщика прямо из базы: в памяти лишь рабочий набор. Вытесняемые
+        # изменения к этому моменту уже записаны, а загруженные объекты планировщик берёт сам
+        with self._lock:
+            q = self.conn.execute
+            loans = q("SELECT isbn, due_date FROM books WHERE is_available = 0 AND due_date IS NOT NULL").fetchall()
+            tickets = q(
+                "SELECT r.first_name, r.last_name, t.expiry_date FROM tickets t JOIN readers r ON r.id = t.reader_id"
+            ).fetchall()
+        return ([(date.fromisoformat(due), LOAN, isbn) for isbn, due in loans]
+                + [(date.fromisoformat(expiry), TICKET, (first, last)) for first, last, expiry in tickets])
+
+    def flush(self) -> int:
+        # Все изменённые группы — одной транзакцией; в памяти они остаются
+        with self._lock, self.conn:
+            return self.cache.flush()
+
+    # --- Загрузка ---
+
+    def load(self) -> None:
+        librarian_registry.clear()
+        reader_registry.clear()
+        catalog.clear()
+        stores.rooms.clear()
+        stores.clubs.clear()
+        with self._lock:
+            self._ids.clear()
+            self.cache.clear()
+            self._books.clear()
+            self._readers.clear()
+            self._club_keys = set()
+            self._load_seq()
+            self._load_librarians()
+            catalog.loader = self.book
+            reader_registry.loader = self.reader
+            scheduler.source = self.due_dates
+            q = self.conn.execute
+
+            # Броням нужны только имена — читатели со старыми бронями не загружаются
+            rooms = {}
+            for room_id, name, total_seats in q("SELECT id, name, total_seats FROM rooms ORDER BY id"):
+                room = rooms[room_id] = Room(name, total_seats)
+                self._ids[id(room)] = room_id
+                stores.rooms.append(room)
+            for room_id, seat, dt, first, last in q(
+                "SELECT b.room_id, b.seat, b.dt, r.first_name, r.last_name"
+                " FROM bookings b JOIN readers r ON r.id = b.reader_id ORDER BY b.rowid"
+            ):
+                if room_id in rooms:
+                    rooms[room_id].seats[seat][datetime.fromisoformat(dt)] = ReaderRef(first, last)
+
+            clubs = {}
+            for club_id, isbn, name in q("SELECT id, current_book_isbn, name FROM clubs ORDER BY id").fetchall():
+                club = clubs[club_id] = Club(name)
+                if isbn:
+                    club.current_book = self.book(isbn)
+                self._ids[id(club)] = club_id
+                stores.clubs.append(club)
+            for club_id, reader_id in q("SELECT club_id, reader_id FROM club_members ORDER BY seq").fetchall():
+                reader = self._readers.get(reader_id) or self._load_reader(reader_id)
+                if club_id in clubs and reader is not None:
+                    clubs[club_id].members.append(reader)
+            for club_id, dt in q("SELECT club_id, dt FROM club_meetings ORDER BY rowid"):
+                if club_id in clubs:
+                    clubs[club_id].meetings.append(datetime.fromisoformat(dt))
+            self._repin()
+
+    def import_current(self) -> None:
+        # После импорта источник данных — база, а в памяти остаётся только рабочий набор
+        super().import_current()
+        self.load()
+
+    def book(self, isbn: str, resident: Optional[Book] = None) -> Optional[Book]:
+        with self._lock:
+            book = resident or self._books.get(isbn) or self._load_book(isbn)
+            if book is not None:
+                self._touch(self._cluster(book))
+            return book
+
+    def reader(self, first_name: str, last_name: str, casefold: bool = False,
+               resident: Optional[Reader] = None) -> Optional[Reader]:
+        with self._lock:
+            reader = resident
+            if reader is None:
+                rid = self._find_reader_id(first_name, last_name, casefold)
+                if rid is None:
+                    return None
+                reader = self._readers.get(rid) or self._load_reader(rid)
+                # Строка базы ещё со старым именем, а в памяти читатель уже переименован
+                if reader is None or not self._named(reader, first_name, last_name, casefold):
+                    return None
+            self._touch(self._cluster(reader))
+            return reader
+
+    @staticmethod
+    def _named(reader: Reader, first_name: str, last_name: str, casefold: bool) -> bool:
+        if casefold:
+            return NameRegistry.fold(reader.first_name, reader.last_name) == NameRegistry.fold(first_name, last_name)
+        return (reader.first_name, reader.last_name) == (first_name, last_name)
+
+    def _find_reader_id(self, first_name: str, last_name: str, casefold: bool = False) -> Optional[int]:
+        if casefold:
+            row = self.conn.execute(
+                "SELECT id FROM readers WHERE fold(first_name) = ? AND fold(last_name) = ? ORDER BY id LIMIT 1",
+                NameRegistry.fold(first_name, last_name)
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT id FROM readers WHERE first_name = ? AND last_name = ? ORDER BY id LIMIT 1",
+                (first_name, last_name)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _load_book(self, isbn: str) -> Optional[Book]:
+        row = self.conn.execute(BOOK_QUERY + " WHERE isbn = ?", (isbn,)).fetchone()
+        if row is None:
+            return None
+        borrower_id = row[8]
+        if borrower_id is not None and borrower_id not in self._readers:
+            # Заёмщик загружается вместе со всеми своими книгами, в том числе этой
+            self._load_reader(borrower_id)
+            if isbn in self._books:
+                return self._books[isbn]
+        book = self._book_from_row(row, self._authors, self._locations)
+        self._books[isbn] = book
+        catalog.adopt(book)
+        return book
+
+    def _load_reader(self, rid: int) -> Optional[Reader]:
+        row = self.conn.execute(READER_QUERY + " WHERE r.id = ?", (rid,)).fetchone()
+        if row is None:
+            return None
+        reader = self._reader_from_row(row)
+        self._readers[rid] = reader
+        self._ids[id(reader)] = rid
+        reader_registry.adopt(reader)
+        for row in self.conn.execute(BOOK_QUERY + " WHERE borrower_id = ? ORDER BY loan_seq", (rid,)).fetchall():
+            # Книга уже в памяти — значит, её возврат ещё не записан в базу
+            if row[0] in self._books:
+                continue
+            book = self._book_from_row(row, self._authors, self._locations)
+            book.current_borrower = reader
+            reader.borrowed_books.append(book)
+            self._books[book.isbn] = book
+            catalog.adopt(book)
+        return reader
+
+    # --- Кэш групп ---
+
+    def _cluster(self, obj) -> tuple:
+        if isinstance(obj, Book):
+            if obj.current_borrower is None:
+                return ("book", obj.isbn)
+            obj = obj.current_borrower
+        return ("reader", self._id(obj))
+
+    def _root(self, key: tuple):
+        kind, k = key
+        return self._books.get(k) if kind == "book" else self._readers.get(k)
+
+    def _touch(self, key: tuple) -> None:
+        if key[1] is None:
+            return
+        # Вытеснение изменённой группы пишет её строки — в своей транзакции
+        with self.conn:
+            if self.cache.get(key) is None:
+                self.cache.put(key, self._root(key), pinned=key in self._club_keys)
+
+    def _mark(self, obj) -> None:
+        # Изменение группы: её строки запишутся при вытеснении или flush()
+        self._readmit(obj)
+        key = self._cluster(obj)
+        if key[1] is None:
+            return
+        with self.conn:
+            if key in self.cache:
+                self.cache.mark_dirty(key)
+            else:
+                self.cache.put(key, self._root(key), dirty=True, pinned=key in self._club_keys)
+
+    def _readmit(self, obj) -> None:
+        # Вызывающий код держал уже вытесненный объект — возвращаем его в память,
+        # вытесняя (с записью) копию, загруженную тем временем
+        if isinstance(obj, Book):
+            current = self._books.get(obj.isbn)
+            if current is obj:
+                return
+            if current is not None:
+                self._drop(current)
+            self._books[obj.isbn] = obj
+            catalog.adopt(obj)
+            if obj.current_borrower is not None:
+                self._readmit(obj.current_borrower)
+            return
+        rid = self._id(obj)
+        if rid is not None and self._readers.get(rid) is obj:
+            return
+        rid = self._find_reader_id(obj.first_name, obj.last_name)
+        if rid is None:
+            return
+        current = self._readers.get(rid)
+        if current is not None:
+            self._drop(current)
+        self._readers[rid] = obj
+        self._ids[id(obj)] = rid
+        reader_registry.adopt(obj)
+        for book in obj.borrowed_books:
+            self._readmit(book)
+
+    def _drop(self, obj) -> None:
+        key = self._cluster(obj)
+        with self.conn:
+            if not self.cache.evict(key):
+                self._unload(key, obj)
+
+    def _repin(self) -> None:
+        # Закреплены группы участников клубов и книг клубов; группа книги меняется при выдаче
+        keys = set()
+        for club in stores.clubs:
+            for member in club.members:
+                keys.add(self._cluster(member))
+            if club.current_book is not None:
+                keys.add(self._cluster(club.current_book))
+        keys = {key for key in keys if key[1] is not None}
+        with self.conn:
+            for key in keys - self._club_keys:
+                if key in self.cache:
+                    self.cache.pin(key)
+                else:
+                    self.cache.put(key, self._root(key), pinned=True)
+            for key in self._club_keys - keys:
+                self.cache.unpin(key)
+        self._club_keys = keys
+
+    def _write_book(self, book: Book, borrower_id: Optional[int]) -> None:
+        self.conn.execute(
+            "UPDATE books SET title = ?, author_first = ?, author_last = ?, author_bio = ?, rack = ?, shelf = ?,"
+            " is_available = ?, borrower_id = ?, loan_seq = ?, due_date = ? WHERE isbn = ?",
+            (book.title, book.author.first_name, book.author.last_name, book.author.bio,
+             book.location.rack, book.location.shelf, int(bool(book.is_available)), borrower_id,
+             self._next_seq() if borrower_id is not None else None,
+             book.due_date.isoformat() if book.due_date else None, book.isbn)
+        )
+
+    def _write_group(self, key: tuple, root) -> None:
+        # Обратная запись: строки читателя и всех его книг или одной невыданной книги.
+        # Транзакцию открывает вызывающий код
+        kind, k = key
+        if kind == "book":
+            self._write_book(root, None)
+            return
+        self.conn.execute(
+            "UPDATE readers SET first_name = ?, last_name = ?, phone = ?, email = ?, reader_type = ?,"
+            " education_place = ?, in_club = ?, school_name = ?, grade = ?, university = ?, course = ?"
+            " WHERE id = ?",
+            self._reader_row(root) + (k,)
+        )
+        if root.review:
+            self._upsert_review(root)
+        for book in root.borrowed_books:
+            self._write_book(book, k)
+
+    def _unload(self, key: tuple, root) -> None:
+        kind, k = key
+        if kind == "book":
+            if self._books.get(k) is root:
+                del self._books[k]
+                catalog.evict(root)
+            return
+        if self._readers.get(k) is root:
+            del self._readers[k]
+        # Без ключа id(объекта) не достанется другому объекту после сборки мусора
+        self._ids.pop(id(root), None)
+        reader_registry.evict(root)
+        for book in root.borrowed_books:
+            if self._books.get(book.isbn) is book:
+                del self._books[book.isbn]
+                catalog.evict(book)
+
+    # --- Обработчики событий ---
+
+    def on_add_book(self, obj: Book) -> None:
+        self._readmit(obj)
+        super().on_add_book(obj)
+        self._touch(self._cluster(obj))
+
+    def on_update_book(self, obj: Book) -> None:
+        self._mark(obj)
+
+    def on_remove_book(self, obj: Book) -> None:
+        super().on_remove_book(obj)
+        self.cache.pop(("book", obj.isbn))
+        if self._books.get(obj.isbn) is obj:
+            del self._books[obj.isbn]
+
+    def on_lend(self, book: Book, reader: Reader) -> None:
+        self._readmit(reader)
+        self._readmit(book)
+        # Книга переходит в группу читателя; её изменения запишутся вместе с ней
+        self.cache.pop(("book", book.isbn))
+        self._mark(reader)
+        self._repin()
+
+    def on_return(self, book: Book, reader: Reader) -> None:
+        self._mark(reader)
+        self._mark(book)
+        self._repin()
+
+    def on_add_reader(self, obj: Reader) -> None:
+        super().on_add_reader(obj)
+        self._readers[self._id(obj)] = obj
+        self._touch(self._cluster(obj))
+
+    def on_update_reader(self, obj: Reader) -> None:
+        self._mark(obj)
+
+    def on_review(self, reader: Reader) -> None:
+        self._mark(reader)
+
+    def on_remove_reader(self, obj: Reader) -> None:
+        rid = self._id(obj)
+        super().on_remove_reader(obj)
+        if rid is not None:
+            self.cache.pop(("reader", rid))
+            self._readers.pop(rid, None)
+
+    def on_reserve_seat(self, room: Room, seat: int, dt: datetime, reader: Reader) -> None:
+        self._readmit(reader)
+        super().on_reserve_seat(room, seat, dt, reader)
+
+    def on_reserve_seats(self, room: Room, bookings: list) -> None:
+        for _, _, reader in bookings:
+            self._readmit(reader)
+        super().on_reserve_seats(room, bookings)
+
+    def on_join_club(self, club: Club, reader: Reader) -> None:
+        self._readmit(reader)
+        super().on_join_club(club, reader)
+        self._repin()
+
+    def on_leave_club(self, club: Club, reader: Reader) -> None:
+        self._readmit(reader)
+        super().on_leave_club(club, reader)
+        self._repin()
+
+    def on_add_club(self, obj: Club) -> None:
+        super().on_add_club(obj)
+        self._repin()
+
+    def on_update_club(self, obj: Club) -> None:
+        super().on_update_club(obj)
+        self._repin()
+
+    def on_remove_club(self, obj: Club) -> None:
+        super().on_remove_club(obj)
+        self._repin()
@@ -0,0 +1,275 @@
+# Набор замеров производительности на синтетической библиотеке (synth.py):
+# загрузка и сохранение JSON/XML, поиск по ISBN и по имени читателя, поток
+# выдач/возвратов и бронирование мест. Каждый сценарий повторяется несколько раз,
+# в зачёт идёт лучшее время — так меньше влияют фоновые процессы.
+# Результаты можно сохранить как базовые (--save) и сравнивать с ними следующие
+# прогоны: сценарий, ставший медленнее базового больше чем на порог, считается
+# регрессией, и программа завершается с кодом 1.
+# Запуск: python bench.py [книг] [--repeat N] [--only имя,имя] [--save] [--baseline файл] [--threshold 0.2]
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from classes import Librarian, Room
+from snapshot import atomic_write
+import stores
+import synth
+
+import main
+
+BASELINE_FILE = "bench_baseline.json"
+THRESHOLD = 0.2
+REPEAT = 3
+# Число операций в сценариях поиска, выдачи и бронирования
+LOOKUPS = 100_000
+CHURN = 20_000
+RESERVATIONS = 20_000
+
+
+class Scenario(NamedTuple):
+    name: str
+    # Возвращает функцию замера: подготовка в setup не входит во время
+    setup: Callable[[], Callable[[], None]]
+    ops: int = 1
+
+
+class Result(NamedTuple):
+    name: str
+    seconds: float
+    ops: int
+
+    @property
+    def per_op(self) -> float:
+        return self.seconds / self.ops
+
+
+class Regression(NamedTuple):
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+# --- Сценарии ---
+
+def _load(loader: Callable[[], None]):
+    def setup():
+        return loader
+    return setup
+
+
+def _save(saver: Callable[[], None], scale: synth.Scale):
+    def setup():
+        # Сохраняется исходное состояние генератора, а не то, что оставила загрузка
+        synth.populate(scale)
+        return saver
+    return setup
+
+
+def _lookup_isbn(scale: synth.Scale):
+    def setup():
+        rng = random.Random(1)
+        keys = [synth.book_isbn(rng.randrange(scale.books)) for _ in range(LOOKUPS)]
+        find = main.find_book_by_isbn
+
+        def run():
+            for isbn in keys:
+                find(isbn)
+        return run
+    return setup
+
+
+def _lookup_name(scale: synth.Scale):
+    def setup():
+        rng = random.Random(2)
+        names = [synth.reader_name(rng.randrange(scale.readers)) for _ in range(LOOKUPS)]
+        find = main.find_reader_by_name
+
+        def run():
+            for first, last in names:
+                find(first, last)
+        return run
+    return setup
+
+
+def _lend_return(scale: synth.Scale):
+    def setup():
+        librarian = Librarian("Тестова", "Мария", "+79990000000")
+        books = stores.catalog.by_availability(True)[:1000]
+        readers = stores.reader_registry.items[:100]
+        pairs = [(books[i % len(books)], readers[i % len(readers)]) for i in range(CHURN // 2)]
+
+        def run():
+            for book, reader in pairs:
+                librarian.lend_book_to_reader(book, reader)
+                librarian.accept_book_return(book, reader)
+        return run
+    return setup
+
+
+def _reserve(scale: synth.Scale):
+    def setup():
+        # Новый зал на каждый повтор: все слоты свободны
+        room = Room("Замерный зал", synth.ROOM_SEATS)
+        rng = random.Random(3)
+        reader = stores.reader_registry.items[0]
+        start = datetime.combine(synth.EPOCH, datetime.min.time())
+        requests = [
+            (rng.randint(1, synth.ROOM_SEATS), start + timedelta(minutes=30 * rng.randrange(10_000)))
+            for _ in range(RESERVATIONS)
+        ]
+
+        def run():
+            for seat, dt in requests:
+                room.reserve_seat(seat, dt, reader)
+        return run
+    return setup
+
+
+def scenarios(scale: synth.Scale) -> List[Scenario]:
+    # Сначала сценарии над сгенерированным состоянием, загрузки — в конце:
+    # они заменяют содержимое хранилищ
+    return [
+        Scenario("save_json", _save(main.save_to_json, scale)),
+        Scenario("save_xml", _save(main.save_to_xml, scale)),
+        Scenario("lookup_isbn", _lookup_isbn(scale), LOOKUPS),
+        Scenario("lookup_name", _lookup_name(scale), LOOKUPS),
+        Scenario("lend_return", _lend_return(scale), CHURN),
+        Scenario("reserve_seat", _reserve(scale), RESERVATIONS),
+        Scenario("load_json", _load(main.load_from_json)),
+        Scenario("load_xml", _load(main.load_from_xml)),
+    ]
+
+
+def _measure(scenario: Scenario, repeat: int) -> Result:
+    best = float("inf")
+    for _ in range(repeat):
+        run = scenario.setup()
+        # Сборщик мусора выключен на время замера, чтобы не попадать в случайные сборки
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return Result(scenario.name, best, scenario.ops)
+
+
+def run(
+    scale: synth.Scale,
+    repeat: int = REPEAT,
+    only: Optional[List[str]] = None,
+    directory: Optional[str] = None
+) -> List[Result]:
+    # Файлы данных создаются во временном каталоге (или в directory)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = directory or tmp
+        old = main.JSON_FILE, main.XML_FILE
+        try:
+            main.JSON_FILE, main.XML_FILE = synth.generate(scale, directory)
+            synth.populate(scale)
+            return [
+                _measure(s, repeat) for s in scenarios(scale)
+                if only is None or s.name in only
+            ]
+        finally:
+            main.JSON_FILE, main.XML_FILE = old
+
+
+# --- Базовые результаты ---
+
+def save_baseline(results: List[Result], scale: synth.Scale, path: str = BASELINE_FILE) -> None:
+    data = {
+        "scale": scale._asdict(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {r.name: r.seconds for r in results},
+    }
+    atomic_write(path, lambda f: json.dump(data, f, ensure_ascii=False, indent=2))
+
+
+def load_baseline(path: str = BASELINE_FILE) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: List[Result], baseline: dict, threshold: float = THRESHOLD) -> List[Regression]:
+    # Сценарии, которых нет в базовых результатах, не сравниваются
+    old: Dict[str, float] = baseline.get("results", {})
+    return [
+        Regression(r.name, old[r.name], r.seconds)
+        for r in results
+        if r.name in old and r.seconds > old[r.name] * (1 + threshold)
+    ]
+
+
+def _format(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} с"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.1f} мс"
+    return f"{seconds * 1e6:.2f} мкс"
+
+
+def report(results: List[Result], baseline: Optional[dict] = None) -> None:
+    old = baseline.get("results", {}) if baseline else {}
+    for r in results:
+        line = f"{r.name:<14} {_format(r.seconds):>10}"
+        if r.ops > 1:
+            line += f"  ({_format(r.per_op)} на операцию)"
+        if r.name in old:
+            line += f"  базовое {_format(old[r.name])}, {r.seconds / old[r.name] - 1:+.0%}"
+        print(line)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры производительности библиотеки")
+    parser.add_argument("books", nargs="?", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--only", help="сценарии через запятую")
+    parser.add_argument("--save", action="store_true", help="сохранить результаты как базовые")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    scale = synth.Scale.of(args.books)
+    only = args.only.split(",") if args.only else None
+    print(f"Книг: {scale.books}, читателей: {scale.readers}, броней: {scale.bookings}, клубов: {scale.clubs}")
+    results = run(scale, args.repeat, only)
+
+    baseline = load_baseline(args.baseline)
+    if baseline is not None and baseline.get("scale") != scale._asdict():
+        print(f"Базовые результаты сняты на другом размере ({baseline.get('scale')}) — сравнение пропущено.")
+        baseline = None
+    report(results, baseline)
+
+    if args.save:
+        save_baseline(results, scale, args.baseline)
+        print(f"Базовые результаты сохранены в {args.baseline}")
+        return 0
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for reg in regressions:
+            print(f"Регрессия: {reg.name} медленнее базового в {reg.ratio:.2f} раза")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
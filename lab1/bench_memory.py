@@ -0,0 +1,62 @@
+# Сравнение расхода памяти: классы со __slots__ и общими Location против
+# прежней раскладки на __dict__ (по отдельному объекту Location на каждую книгу).
+# Запуск: python bench_memory.py [количество книг]
+
+import sys
+import tracemalloc
+
+from classes import Author, Location, Book, Ticket, Reader
+
+
+def _dict_layout(cls, bases=()):
+    # Копия класса без __slots__: те же методы и проверки, но атрибуты в __dict__
+    slots = set(cls.__dict__.get("__slots__", ()))
+    ns = {k: v for k, v in cls.__dict__.items() if k not in slots and k != "__slots__"}
+    return type(cls.__name__, bases, ns)
+
+
+DictAuthor = _dict_layout(Author)
+DictLocation = _dict_layout(Location)
+DictBook = _dict_layout(Book)
+DictTicket = _dict_layout(Ticket)
+DictReader = _dict_layout(Reader)
+
+
+def _build(n: int, author_cls, location_cls, book_cls, reader_cls, ticket_cls, shared: bool) -> list:
+    authors = [author_cls(f"Имя{i}", f"Фамилия{i}") for i in range(max(1, n // 20))]
+    locations = {}
+    objects = []
+    for i in range(n):
+        # Строки собираются заново, как при разборе файла
+        rack, shelf = "R" + str(i % 50), str(i % 8)
+        if shared:
+            location = locations.get((rack, shelf))
+            if location is None:
+                location = locations[(rack, shelf)] = location_cls(rack, shelf)
+        else:
+            location = location_cls(rack, shelf)
+        objects.append(book_cls(f"Книга {i}", authors[i % len(authors)], f"ISBN-{i}", location))
+    for i in range(n // 10):
+        reader = reader_cls(f"Читатель{i}", "Тестов", "+79990000000", f"r{i}@mail.ru", "regular")
+        reader.ticket = ticket_cls(reader)
+        objects.append(reader)
+    return objects
+
+
+def measure(n: int, *classes, shared: bool) -> int:
+    tracemalloc.start()
+    objects = _build(n, *classes, shared=shared)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    old = measure(n, DictAuthor, DictLocation, DictBook, DictReader, DictTicket, shared=False)
+    new = measure(n, Author, Location, Book, Reader, Ticket, shared=True)
+    print(f"Книг: {n}, читателей: {n // 10}")
+    print(f"__dict__, своя Location у каждой книги: {old / 2**20:.1f} МБ")
+    print(f"__slots__, общие Location:              {new / 2**20:.1f} МБ")
+    print(f"Экономия: {(1 - new / old) * 100:.0f}%")
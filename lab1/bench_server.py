@@ -0,0 +1,98 @@
+# Нагрузочный тест сервера: несколько клиентов одновременно выдают и возвращают
+# книги, считаем запросы в секунду и задержки (p50, p99).
+# Сервер работает в отдельном потоке со своим циклом событий, журнал — во временном каталоге.
+# Запуск: python bench_server.py [клиентов] [запросов на клиента]
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from classes import Author, Location, Book, Reader
+from journal import Journal
+from server import LibraryServer
+
+import main
+
+
+def _populate(clients: int, books_per_client: int = 20) -> None:
+    author = Author.get_or_create("Тест", "Автор")
+    location = Location.get_or_create("A1", "1")
+    for i in range(clients * books_per_client):
+        main.catalog.add(Book(f"Книга {i}", author, f"BENCH-{i}", location))
+    for i in range(clients):
+        main.readers.append(Reader(f"Читатель{i}", "Тестов", "+79999999999", f"r{i}@mail.ru", "regular"))
+
+
+def _serve(journal: Journal, started: threading.Event, box: dict) -> None:
+    async def serve():
+        server = LibraryServer(journal)
+        await server.start(port=0)
+        box["port"] = server.port
+        box["loop"] = asyncio.get_running_loop()
+        box["stop"] = asyncio.Event()
+        started.set()
+        await box["stop"].wait()
+        await server.close()
+
+    asyncio.run(serve())
+
+
+async def _client(port: int, i: int, clients: int, requests: int, latencies: list) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    me = main.readers[i]
+    mine = main.books[i::clients]
+    for n in range(requests):
+        book = mine[(n // 2) % len(mine)]
+        op = "lend" if n % 2 == 0 else "return"
+        line = json.dumps({"op": op, "isbn": book.isbn, "reader": [me.first_name, me.last_name]})
+        t = time.perf_counter()
+        writer.write(line.encode("utf-8") + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - t)
+        assert response["ok"], response
+    writer.close()
+
+
+def run(clients: int, requests: int) -> dict:
+    _populate(clients)
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = Journal(os.path.join(tmp, "journal.log"), fsync=False)
+        journal.open()
+        started, box = threading.Event(), {}
+        thread = threading.Thread(target=_serve, args=(journal, started, box))
+        thread.start()
+        started.wait()
+        latencies = []
+
+        async def load():
+            await asyncio.gather(*(_client(box["port"], i, clients, requests, latencies) for i in range(clients)))
+
+        t = time.perf_counter()
+        asyncio.run(load())
+        elapsed = time.perf_counter() - t
+        box["loop"].call_soon_threadsafe(box["stop"].set)
+        thread.join()
+        journal.close()
+    main.books.clear()
+    main.readers.clear()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    result = run(clients, requests)
+    print(f"Клиентов: {clients}, запросов: {result['requests']}")
+    print(f"Запросов в секунду: {result['rps']:,.0f}")
+    print(f"Задержка p50: {result['p50'] * 1000:.2f} мс, p99: {result['p99'] * 1000:.2f} мс")
@@ -0,0 +1,289 @@
+# Бинарный колоночный снимок библиотеки (data.bin).
+# Каждое поле хранится отдельной колонкой-массивом фиксированной ширины, все строки
+# (имена авторов, стеллажи, полки, даты) вынесены в общую таблицу и записаны один раз.
+# Это компактный формат, а не доступ по требованию: файл читается целиком одним
+# вызовом, колонки — срезы memoryview над прочитанными байтами без копирования,
+# и все объекты собираются сразу, как при загрузке JSON
+
+import struct
+import sys
+from array import array
+from datetime import date, datetime
+
+import stores
+from stores import catalog, reader_registry, librarian_registry
+from classes import Author, Location, Book, Reader, Librarian, Room, Review, Club
+from snapshot import atomic_write
+
+MAGIC = b"LIBSNAP1"
+_ALIGN = 8
+_NONE = 0      # id строки None в таблице строк
+_NO_REF = -1   # нет ссылки на читателя или книгу
+
+
+class _Strings:
+    # Таблица строк: одинаковые строки получают один id
+    def __init__(self):
+        self.ids = {None: _NONE}
+        self.items = [None]
+
+    def __call__(self, s) -> int:
+        i = self.ids.get(s)
+        if i is None:
+            i = self.ids[s] = len(self.items)
+            self.items.append(s)
+        return i
+
+
+def _write_column(f, name: str, values: array) -> None:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    encoded = name.encode("ascii")
+    header = struct.pack("<B", len(encoded)) + encoded + values.typecode.encode("ascii")
+    header += struct.pack("<Q", len(values))
+    f.write(header)
+    pad = -(f.tell()) % _ALIGN
+    f.write(b"\0" * pad)
+    f.write(values.tobytes())
+    f.write(b"\0" * (-(f.tell()) % _ALIGN))
+
+
+def save_binary(path: str) -> None:
+    prepare_binary(path)()
+
+
+def prepare_binary(path: str):
+    # Колонки собираются сразу (под блокировками каталога и реестра читателей),
+    # а возвращённая функция только пишет файл — её можно звать из другого потока
+    with catalog.lock, reader_registry.lock:
+        cols = _columns()
+
+    def write(f):
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(cols)))
+        for name, values in cols.items():
+            _write_column(f, name, values)
+
+    return lambda: atomic_write(path, write, binary=True)
+
+
+def _columns() -> dict:
+    s = _Strings()
+    cols: dict[str, array] = {}
+
+    def col(name: str, code: str) -> array:
+        return cols.setdefault(name, array(code))
+
+    for l in librarian_registry:
+        col("lib.first", "I").append(s(l.first_name))
+        col("lib.last", "I").append(s(l.last_name))
+        col("lib.phone", "I").append(s(l.phone))
+
+    reader_idx = {}
+    for i, r in enumerate(reader_registry):
+        reader_idx[id(r)] = i
+        col("rdr.first", "I").append(s(r.first_name))
+        col("rdr.last", "I").append(s(r.last_name))
+        col("rdr.phone", "I").append(s(r.phone))
+        col("rdr.email", "I").append(s(r.email))
+        col("rdr.type", "I").append(s(r.reader_type))
+        col("rdr.edu", "I").append(s(r.education_place))
+        col("rdr.in_club", "B").append(bool(r.in_club))
+        col("rdr.ticket_id", "I").append(s(r.ticket.ticket_id))
+        col("rdr.ticket_issue", "i").append(r.ticket.issue_date.toordinal())
+        col("rdr.ticket_expiry", "i").append(r.ticket.expiry_date.toordinal())
+        review = r.review
+        col("rdr.rev_text", "I").append(s(review.text) if review else _NONE)
+        col("rdr.rev_rating", "B").append(review.rating if review else 0)
+        col("rdr.rev_date", "I").append(s(review.date.isoformat()) if review else _NONE)
+        col("rdr.school", "I").append(s(getattr(r, "school_name", None)))
+        col("rdr.grade", "I").append(s(getattr(r, "grade", None)))
+        col("rdr.university", "I").append(s(getattr(r, "university", None)))
+        col("rdr.course", "B").append(getattr(r, "course", 0))
+
+    book_idx = {}
+    for i, b in enumerate(catalog):
+        book_idx[id(b)] = i
+        col("book.title", "I").append(s(b.title))
+        col("book.author_first", "I").append(s(b.author.first_name))
+        col("book.author_last", "I").append(s(b.author.last_name))
+        col("book.author_bio", "I").append(s(b.author.bio))
+        col("book.isbn", "I").append(s(b.isbn))
+        col("book.rack", "I").append(s(b.location.rack))
+        col("book.shelf", "I").append(s(b.location.shelf))
+        col("book.available", "B").append(bool(b.is_available))
+        col("book.borrower", "i").append(reader_idx.get(id(b.current_borrower), _NO_REF))
+        col("book.due", "i").append(b.due_date.toordinal() if b.due_date else 0)
+
+    # Порядок borrowed_books у читателя хранится отдельной таблицей выдач
+    for r in reader_registry:
+        for b in r.borrowed_books:
+            col("loan.reader", "i").append(reader_idx[id(r)])
+            col("loan.book", "i").append(book_idx.get(id(b), _NO_REF))
+
+    for i, room in enumerate(stores.rooms):
+        col("room.name", "I").append(s(room.name))
+        col("room.seats", "I").append(len(room.seats))
+        for seat_num, times in room.seats.items():
+            for dt, reader in times.items():
+                col("booking.room", "I").append(i)
+                col("booking.seat", "I").append(seat_num)
+                col("booking.dt", "I").append(s(dt.isoformat()))
+                col("booking.reader", "i").append(reader_idx.get(id(reader), _NO_REF))
+
+    for i, club in enumerate(stores.clubs):
+        col("club.name", "I").append(s(club.key()))
+        col("club.book", "i").append(book_idx.get(id(club.current_book), _NO_REF))
+        for m in club.members:
+            col("member.club", "I").append(i)
+            col("member.reader", "i").append(reader_idx.get(id(m), _NO_REF))
+        for dt in club.meetings:
+            col("meeting.club", "I").append(i)
+            col("meeting.dt", "I").append(s(dt.isoformat()))
+
+    # Таблица строк: смещения и общий UTF-8 блок
+    offsets = array("Q", [0])
+    blob = bytearray()
+    for text in s.items[1:]:
+        blob += text.encode("utf-8")
+        offsets.append(len(blob))
+    cols["str.off"] = offsets
+    cols["str.blob"] = array("B", bytes(blob))
+    return cols
+
+
+def _read_columns(data: bytes) -> dict:
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Файл не является бинарным снимком библиотеки.")
+    view = memoryview(data)
+    pos = len(MAGIC)
+    (count,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    cols = {}
+    for _ in range(count):
+        name_len = data[pos]
+        name = data[pos + 1:pos + 1 + name_len].decode("ascii")
+        pos += 1 + name_len
+        code = chr(data[pos])
+        (n,) = struct.unpack_from("<Q", data, pos + 1)
+        pos += 9
+        pos += -pos % _ALIGN
+        size = n * array(code).itemsize
+        column = view[pos:pos + size].cast(code)
+        if sys.byteorder == "big":
+            column = array(code, column)
+            column.byteswap()
+        cols[name] = column
+        pos += size
+        pos += -pos % _ALIGN
+    return cols
+
+
+def load_binary(path: str) -> None:
+    with open(path, "rb") as f:
+        data = f.read()
+    _build(_read_columns(data))
+
+
+def _build(cols: dict) -> None:
+    empty = ()
+    c = lambda name: cols.get(name, empty)
+
+    off, blob = c("str.off"), c("str.blob")
+    strings = [None] + [
+        str(blob[off[i]:off[i + 1]], "utf-8") for i in range(len(off) - 1)
+    ]
+
+    librarian_registry.clear()
+    reader_registry.clear()
+    catalog.clear()
+    stores.rooms.clear()
+    stores.clubs.clear()
+
+    first, last, phone = c("lib.first"), c("lib.last"), c("lib.phone")
+    for i in range(len(first)):
+        librarian_registry.add(Librarian(strings[last[i]], strings[first[i]], strings[phone[i]]))
+
+    readers = []
+    rdr = {name[4:]: col for name, col in cols.items() if name.startswith("rdr.")}
+    for i in range(len(rdr.get("first", empty))):
+        record = {
+            "first_name": strings[rdr["first"][i]], "last_name": strings[rdr["last"][i]],
+            "phone": strings[rdr["phone"][i]], "email": strings[rdr["email"][i]],
+            "reader_type": strings[rdr["type"][i]],
+            "ticket": {
+                "ticket_id": strings[rdr["ticket_id"][i]],
+                "issue_date": date.fromordinal(rdr["ticket_issue"][i]),
+                "expiry_date": date.fromordinal(rdr["ticket_expiry"][i])
+            }
+        }
+        if record["reader_type"] == "school":
+            record["school_name"] = strings[rdr["school"][i]]
+            record["grade"] = strings[rdr["grade"][i]]
+        elif record["reader_type"] == "student":
+            record["university"] = strings[rdr["university"][i]]
+            record["course"] = rdr["course"][i]
+        # Снимок пишется только из уже проверенных объектов
+        reader = Reader.from_records([record], trusted=True)[0]
+        reader.education_place = strings[rdr["edu"][i]]
+        reader.in_club = bool(rdr["in_club"][i])
+
+        if rdr["rev_text"][i] != _NONE:
+            review = Review(strings[rdr["rev_text"][i]], rdr["rev_rating"][i], reader)
+            review.date = datetime.fromisoformat(strings[rdr["rev_date"][i]])
+            reader.review = review
+        readers.append(reader)
+        reader_registry.add(reader)
+
+    books = []
+    authors = {}
+    locations = {}
+    title, a_first, a_last, a_bio = c("book.title"), c("book.author_first"), c("book.author_last"), c("book.author_bio")
+    isbn, rack, shelf = c("book.isbn"), c("book.rack"), c("book.shelf")
+    available, borrower, due = c("book.available"), c("book.borrower"), c("book.due")
+    for i in range(len(title)):
+        author_key = (a_first[i], a_last[i], a_bio[i])
+        author = authors.get(author_key)
+        if author is None:
+            author = authors[author_key] = Author.get_or_create(*(strings[k] for k in author_key))
+        location_key = (rack[i], shelf[i])
+        location = locations.get(location_key)
+        if location is None:
+            location = locations[location_key] = Location.get_or_create(strings[rack[i]], strings[shelf[i]])
+        book = Book(strings[title[i]], author, strings[isbn[i]], location)
+        book.is_available = bool(available[i])
+        if borrower[i] != _NO_REF:
+            book.current_borrower = readers[borrower[i]]
+        if due and due[i]:
+            book.due_date = date.fromordinal(due[i])
+        books.append(book)
+        catalog.add(book)
+
+    loan_reader, loan_book = c("loan.reader"), c("loan.book")
+    for i in range(len(loan_reader)):
+        if loan_book[i] != _NO_REF:
+            readers[loan_reader[i]].borrowed_books.append(books[loan_book[i]])
+
+    names, seats = c("room.name"), c("room.seats")
+    for i in range(len(names)):
+        stores.rooms.append(Room(strings[names[i]], seats[i]))
+    b_room, b_seat, b_dt, b_reader = c("booking.room"), c("booking.seat"), c("booking.dt"), c("booking.reader")
+    for i in range(len(b_room)):
+        if b_reader[i] != _NO_REF:
+            room = stores.rooms[b_room[i]]
+            room.seats[b_seat[i]][datetime.fromisoformat(strings[b_dt[i]])] = readers[b_reader[i]]
+
+    club_book, club_name = c("club.book"), c("club.name")
+    for i in range(len(club_book)):
+        club = Club(strings[club_name[i]] if club_name else None)
+        if club_book[i] != _NO_REF:
+            club.current_book = books[club_book[i]]
+        stores.clubs.append(club)
+    m_club, m_reader = c("member.club"), c("member.reader")
+    for i in range(len(m_club)):
+        if m_reader[i] != _NO_REF:
+            stores.clubs[m_club[i]].members.append(readers[m_reader[i]])
+    mt_club, mt_dt = c("meeting.club"), c("meeting.dt")
+    for i in range(len(mt_club)):
+        stores.clubs[mt_club[i]].meetings.append(datetime.fromisoformat(strings[mt_dt[i]]))
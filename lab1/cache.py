@@ -0,0 +1,292 @@
+# Ограниченный кэш объектов перед хранилищем (снимок data.json, база SQLite).
+# Когда вытесняемых записей становится больше capacity, вытесняется одна из них:
+# давно не использованная (LRU) или реже всех используемая (LFU). Изменённая
+# запись перед вытеснением записывается обратно в хранилище функцией write_back;
+# если такой функции нет, изменённые записи не вытесняются, пока их не отметят
+# сохранёнными (mark_clean). Закреплённые записи (pin) не вытесняются и в capacity
+# не входят. Счётчики попаданий, промахов, вытеснений и обратных записей помогают
+# подобрать capacity под рабочий набор; held — сколько изменённых записей сейчас
+# удерживается сверх capacity из-за отсутствия write_back. Кэш не потокобезопасен:
+# вызывающий код держит свою блокировку
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Set
+
+LRU = "lru"
+LFU = "lfu"
+
+
+class CacheStats:
+    __slots__ = ("hits", "misses", "evictions", "writebacks", "held")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writebacks = 0
+        self.held = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "writebacks": self.writebacks,
+            "held": self.held,
+            "hit_ratio": self.hit_ratio,
+        }
+
+    def __str__(self) -> str:
+        return (f"попаданий: {self.hits}, промахов: {self.misses} ({self.hit_ratio:.0%} попаданий), "
+                f"вытеснено: {self.evictions}, записано обратно: {self.writebacks}, "
+                f"изменённых сверх capacity: {self.held}")
+
+
+# Порядок вытеснения: в нём только те записи, которые можно вытеснить
+class _LRUOrder:
+    def __init__(self):
+        self._keys: 'OrderedDict[Hashable, None]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key) -> None:
+        self._keys[key] = None
+
+    def touch(self, key) -> None:
+        self._keys.move_to_end(key)
+
+    def remove(self, key) -> None:
+        del self._keys[key]
+
+    def victim(self):
+        key, _ = self._keys.popitem(last=False)
+        return key
+
+
+# LFU за O(1): корзины ключей по числу обращений, внутри корзины — по давности
+class _LFUOrder:
+    def __init__(self):
+        self._freq: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, 'OrderedDict[Hashable, None]'] = {}
+        self._min = 0
+
+    def __len__(self) -> int:
+        return len(self._freq)
+
+    def add(self, key, freq: int = 1) -> None:
+        self._freq[key] = freq
+        self._buckets.setdefault(freq, OrderedDict())[key] = None
+        if len(self._freq) == 1 or freq < self._min:
+            self._min = freq
+
+    def touch(self, key) -> None:
+        freq = self.remove(key)
+        self.add(key, freq + 1)
+
+    def remove(self, key) -> int:
+        freq = self._freq.pop(key)
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+        return freq
+
+    def victim(self):
+        if self._min not in self._buckets:
+            self._min = min(self._buckets)
+        key, _ = self._buckets[self._min].popitem(last=False)
+        if not self._buckets[self._min]:
+            del self._buckets[self._min]
+        del self._freq[key]
+        return key
+
+
+class ObjectCache:
+    capacity: int
+    policy: str
+
+    def __init__(
+        self,
+        capacity: int,
+        policy: str = LRU,
+        write_back: Optional[Callable[[Hashable, object], None]] = None,
+        on_evict: Optional[Callable[[Hashable, object], None]] = None
+    ):
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("capacity должен быть целым числом >= 1.")
+        if policy not in (LRU, LFU):
+            raise ValueError("policy должен быть 'lru' или 'lfu'.")
+        self.capacity = capacity
+        self.policy = policy
+        self._stats = CacheStats()
+        self.write_back = write_back
+        self.on_evict = on_evict
+        self._values: Dict[Hashable, object] = {}
+        self._order = _LRUOrder() if policy == LRU else _LFUOrder()
+        self._dirty: Set[Hashable] = set()
+        self._pinned: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key) -> bool:
+        return key in self._values
+
+    @property
+    def stats(self) -> CacheStats:
+        # Без write_back изменённые незакреплённые записи остаются в памяти до mark_clean
+        self._stats.held = 0 if self.write_back is not None else len(self._dirty - self._pinned)
+        return self._stats
+
+    @property
+    def dirty(self) -> int:
+        return len(self._dirty)
+
+    @property
+    def evictable(self) -> int:
+        return len(self._order)
+
+    def _evictable(self, key) -> bool:
+        if key in self._pinned:
+            return False
+        return self.write_back is not None or key not in self._dirty
+
+    def _update_order(self, key, was: bool) -> None:
+        # Запись входит в порядок вытеснения или выходит из него при смене флагов
+        now = self._evictable(key)
+        if now and not was:
+            self._order.add(key)
+        elif was and not now:
+            self._order.remove(key)
+
+    def get(self, key, default=None):
+        value = self._values.get(key, default)
+        if key in self._values:
+            self._stats.hits += 1
+            if self._evictable(key):
+                self._order.touch(key)
+        else:
+            self._stats.misses += 1
+        return value
+
+    def peek(self, key, default=None):
+        # Без учёта в статистике и без обновления порядка вытеснения
+        return self._values.get(key, default)
+
+    def put(self, key, value, dirty: bool = False, pinned: bool = False) -> None:
+        if key in self._values:
+            self._values[key] = value
+            if dirty:
+                self.mark_dirty(key)
+            if pinned:
+                self.pin(key)
+            if self._evictable(key):
+                self._order.touch(key)
+            return
+        evictable = not pinned and (self.write_back is not None or not dirty)
+        if evictable:
+            # Место освобождается до вставки: в LFU новая запись иначе сразу стала бы жертвой
+            self._shrink(self.capacity - 1)
+        self._values[key] = value
+        if dirty:
+            self._dirty.add(key)
+        if pinned:
+            self._pinned.add(key)
+        if evictable:
+            self._order.add(key)
+
+    def pop(self, key, default=None):
+        # Удаление без записи в хранилище (объект удалён или больше не отдельная запись)
+        if key not in self._values:
+            return default
+        if self._evictable(key):
+            self._order.remove(key)
+        self._dirty.discard(key)
+        self._pinned.discard(key)
+        return self._values.pop(key)
+
+    def mark_dirty(self, key) -> None:
+        if key in self._values and key not in self._dirty:
+            was = self._evictable(key)
+            self._dirty.add(key)
+            self._update_order(key, was)
+
+    def mark_clean(self, key) -> None:
+        if key in self._dirty:
+            was = self._evictable(key)
+            self._dirty.discard(key)
+            self._update_order(key, was)
+            self._shrink()
+
+    def is_dirty(self, key) -> bool:
+        return key in self._dirty
+
+    def pin(self, key) -> None:
+        if key in self._values and key not in self._pinned:
+            was = self._evictable(key)
+            self._pinned.add(key)
+            self._update_order(key, was)
+
+    def unpin(self, key) -> None:
+        if key in self._pinned:
+            was = self._evictable(key)
+            self._pinned.discard(key)
+            self._update_order(key, was)
+            self._shrink()
+
+    def evict(self, key) -> bool:
+        # Вытеснение конкретной записи (с записью в хранилище, если она изменена)
+        if key not in self._values:
+            return False
+        if key in self._dirty and self.write_back is None:
+            raise ValueError("Изменённую запись нельзя вытеснить без write_back.")
+        if self._evictable(key):
+            self._order.remove(key)
+        self._pinned.discard(key)
+        self._drop(key)
+        return True
+
+    def _drop(self, key) -> None:
+        value = self._values[key]
+        if key in self._dirty:
+            try:
+                self.write_back(key, value)
+            except BaseException:
+                # Не записали — запись остаётся в кэше изменённой
+                self._order.add(key)
+                raise
+            self._dirty.discard(key)
+            self._stats.writebacks += 1
+        del self._values[key]
+        self._stats.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def _shrink(self, limit: Optional[int] = None) -> None:
+        limit = self.capacity if limit is None else limit
+        while len(self._order) > limit:
+            self._drop(self._order.victim())
+
+    def flush(self) -> int:
+        # Записывает все изменённые записи; они остаются в кэше уже неизменёнными
+        if self.write_back is None:
+            return 0
+        written = 0
+        for key in list(self._dirty):
+            self.write_back(key, self._values[key])
+            self._dirty.discard(key)
+            self._stats.writebacks += 1
+            written += 1
+        return written
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._order = _LRUOrder() if self.policy == LRU else _LFUOrder()
+        self._dirty.clear()
+        self._pinned.clear()
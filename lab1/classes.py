@@ -1,14 +1,31 @@
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 import uuid
-import re
+import sys
 
 from exceptions import (
-    BookNotAvailableError
+    BookNotAvailableError, ValidationError
 )
+import validators
+from stores import (
+    catalog, reader_registry, librarian_registry, rooms, clubs, emit,
+    author_registry, location_registry
+)
+from logs import log, DEBUG, INFO, WARNING
+from locks import book_locks, seat_locks, club_locks, book_key, seat_key, club_key
+from availability import (
+    SeatSchedule, SeatBookings,
+    RESERVED, TAKEN, NO_SEAT, BAD_TIME, DUPLICATE, SKIPPED
+)
+
+# Срок выдачи книги, дней
+LOAN_DAYS = 14
+
 
 # Автор книги
 class Author:
+    __slots__ = ("first_name", "last_name", "bio", "__weakref__")
+
     first_name: str
     last_name: str
     bio: str
@@ -23,13 +40,13 @@ class Author:
             raise TypeError("first_name должен быть строкой.")
         if not first_name.strip():
             raise ValueError("first_name не может быть пустым.")
-        self.first_name = first_name.strip()
+        self.first_name = sys.intern(first_name.strip())
 
         if not isinstance(last_name, str):
             raise TypeError("last_name должен быть строкой.")
         if not last_name.strip():
             raise ValueError("last_name не может быть пустым.")
-        self.last_name = last_name.strip()
+        self.last_name = sys.intern(last_name.strip())
 
         if not isinstance(bio, str):
             raise TypeError("bio должен быть строкой.")
@@ -38,14 +55,30 @@ class Author:
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name}"
 
+    @classmethod
+    def get_or_create(cls, first_name: str, last_name: str, bio: str = "") -> 'Author':
+        # Один объект на автора (по имени и фамилии) во всём приложении
+        if not isinstance(first_name, str) or not isinstance(last_name, str):
+            return cls(first_name, last_name, bio)
+        key = (first_name.strip(), last_name.strip())
+        author = author_registry.get(key)
+        if author is None:
+            author = cls(first_name, last_name, bio)
+            author_registry.add(key, author)
+        elif not author.bio and isinstance(bio, str) and bio.strip():
+            author.bio = bio.strip()
+        return author
+
     def save(self):
         if not self.first_name or not self.last_name:
             raise ValueError("Имя и фамилия автора обязательны.")
-        print(f"Автор '{self}' готов к использованию.")
+        log(INFO, "author_ready", "Автор '%s' готов к использованию.", self)
 
 
 # Место книги
 class Location:
+    __slots__ = ("rack", "shelf", "__weakref__")
+
     rack: str
     shelf: str
 
@@ -58,26 +91,41 @@ class Location:
             raise TypeError("rack должен быть строкой.")
         if not rack.strip():
             raise ValueError("rack не может быть пустым.")
-        self.rack = rack.strip()
+        self.rack = sys.intern(rack.strip())
 
         if not isinstance(shelf, str):
             raise TypeError("shelf должен быть строкой.")
         if not shelf.strip():
             raise ValueError("shelf не может быть пустым.")
-        self.shelf = shelf.strip()
+        self.shelf = sys.intern(shelf.strip())
 
     def __str__(self) -> str:
         return f"стеллаж {self.rack}, полка {self.shelf}"
 
+    @classmethod
+    def get_or_create(cls, rack: str, shelf: str) -> 'Location':
+        # Один объект на полку: книги на одной полке делят общий Location
+        if not isinstance(rack, str) or not isinstance(shelf, str):
+            return cls(rack, shelf)
+        key = (rack.strip(), shelf.strip())
+        location = location_registry.get(key)
+        if location is None:
+            location = cls(rack, shelf)
+            location_registry.add(key, location)
+        return location
+
 
 # Книга
 class Book:
+    __slots__ = ("title", "author", "isbn", "location", "is_available", "current_borrower", "due_date")
+
     title: str
     author: Author
     isbn: str
     location: Location
     is_available: bool
     current_borrower: Optional['Reader']
+    due_date: Optional[date]
 
     def __init__(
         self,
@@ -102,6 +150,7 @@ class Book:
         self.location = location
         self.is_available = True
         self.current_borrower = None
+        self.due_date = None
 
     def __str__(self) -> str:
         if self.is_available:
@@ -115,48 +164,59 @@ class Book:
         return f"'{self.title}' ({self.author}) — {status}"
 
     def save(self) -> bool:
-        existing_book = Book.find_by_isbn(self.isbn)
+        existing_book = catalog.get(self.isbn)
         if existing_book:
-            print(f"Книга с ISBN '{self.isbn}' уже существует. Обновляем.")
+            log(INFO, "book_updated", "Книга с ISBN '%s' уже существует. Обновляем.", self.isbn, isbn=self.isbn)
             # Обновляем поля кроме ISBN
             existing_book.title = self.title
             existing_book.author = self.author
             existing_book.location = self.location
+            catalog.refresh(existing_book)
+            emit("update_book", obj=existing_book)
             return True
-        books.append(self)
-        print(f"Книга '{self}' создана и добавлена в список.")
+        catalog.add(self)
+        log(INFO, "book_created", "Книга '%s' создана и добавлена в список.", self, isbn=self.isbn)
         return True
 
     @classmethod
     def find_by_isbn(cls, isbn: str) -> Optional['Book']:
-        import main
-        for book in main.books:
-            if book.isbn == isbn:
-                print(f"Найдена книга: {book}")
-                return book
-        print(f"Книга с ISBN '{isbn}' не найдена.")
+        book = catalog.get(isbn)
+        if book is not None:
+            log(DEBUG, "book_found", "Найдена книга: %s", book, isbn=isbn)
+            return book
+        log(DEBUG, "book_not_found", "Книга с ISBN '%s' не найдена.", isbn, isbn=isbn)
         return None
 
     def update_location(self, new_location: Location) -> bool:
         self.location = new_location
-        print(f"Местоположение книги '{self}' обновлено.")
+        catalog.refresh(self)
+        emit("update_book", obj=self)
+        log(INFO, "book_moved", "Местоположение книги '%s' обновлено.", self, isbn=self.isbn)
         return True
 
     def delete(self) -> bool:
         if not self.is_available:
-            print(f"Невозможно удалить книгу '{self}', так как она выдана читателю.")
+            log(WARNING, "book_delete_refused", "Невозможно удалить книгу '%s', так как она выдана читателю.", self, isbn=self.isbn)
             return False
-        if self in books:
-            books.remove(self)
-            print(f"Книга '{self}' удалена из списка.")
+        if catalog.remove(self):
+            log(INFO, "book_deleted", "Книга '%s' удалена из списка.", self, isbn=self.isbn)
             return True
         else:
-            print(f"Книга '{self}' не найдена в списке для удаления.")
+            log(WARNING, "book_delete_missing", "Книга '%s' не найдена в списке для удаления.", self, isbn=self.isbn)
             return False
 
 
+def _as_date(value) -> date:
+    # Дата из снимка: объект date или строка ISO (в том числе с временем)
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(value).date()
+
+
 # Читательский билет
 class Ticket:
+    __slots__ = ("ticket_id", "issue_date", "expiry_date", "owner")
+
     ticket_id: str
     issue_date: date
     expiry_date: date
@@ -171,9 +231,21 @@ class Ticket:
     def __str__(self) -> str:
         return f"билет №{self.ticket_id} (до {self.expiry_date})"
 
+    @classmethod
+    def restore(cls, owner: 'Reader', data: dict) -> 'Ticket':
+        # Сохранённый билет: без генерации нового номера и запроса текущего времени
+        ticket = cls.__new__(cls)
+        ticket.owner = owner
+        ticket.ticket_id = data["ticket_id"]
+        ticket.issue_date = _as_date(data["issue_date"])
+        ticket.expiry_date = _as_date(data["expiry_date"])
+        return ticket
+
 
 # Отзыв
 class Review:
+    __slots__ = ("text", "rating", "author", "date")
+
     text: str
     rating: int
     author: 'Reader'
@@ -215,6 +287,11 @@ class Review:
 
 # Читатель
 class Reader:
+    __slots__ = (
+        "first_name", "last_name", "phone", "email", "reader_type",
+        "borrowed_books", "ticket", "review", "in_club", "education_place"
+    )
+
     first_name: str
     last_name: str
     phone: str
@@ -234,60 +311,87 @@ class Reader:
         email: str,
         reader_type: str
     ):
-        if not isinstance(first_name, str):
-            raise TypeError("first_name должен быть строкой.")
-        if not first_name.strip():
-            raise ValueError("first_name не может быть пустым.")
-        self.first_name = first_name.strip()
-
-        if not isinstance(last_name, str):
-            raise TypeError("last_name должен быть строкой.")
-        if not last_name.strip():
-            raise ValueError("last_name не может быть пустым.")
-        self.last_name = last_name.strip()
-
-        if not isinstance(phone, str):
-            raise TypeError("phone должен быть строкой.")
-        if not re.match(r"^\+7\d{10}$", phone.strip()):
-            raise ValueError("Неверный формат телефона. Пример: +70000000000")
-        self.phone = phone.strip()
-
-        if not isinstance(email, str):
-            raise TypeError("email должен быть строкой.")
-        if not email.strip() or "@" not in email:
-            raise ValueError("Некорректный email.")
-        self.email = email.strip()
-
-        if not isinstance(reader_type, str):
-            raise TypeError("reader_type должен быть строкой.")
-        if reader_type not in {"school", "student", "regular"}:
-            raise ValueError("reader_type должен быть 'school', 'student' или 'regular'.")
-        self.reader_type = reader_type
-
+        self.first_name = validators.first_name(first_name)
+        self.last_name = validators.last_name(last_name)
+        self.phone = validators.phone(phone)
+        self.email = validators.email(email)
+        self.reader_type = validators.reader_type(reader_type)
+        self._init_state()
+
+    def _init_state(self, ticket: Optional[dict] = None) -> None:
         self.borrowed_books = []
-        self.ticket = Ticket(self)
+        self.ticket = Ticket(self) if ticket is None else Ticket.restore(self, ticket)
         self.review = None
         self.in_club = False
         self.education_place = ""
 
+    @classmethod
+    def from_records(cls, records: list, trusted: bool = False) -> List['Reader']:
+        # Пачка читателей из словарей с полями конструктора (для школьника и студента —
+        # ещё school_name/grade и university/course) и, если есть, сохранённым билетом
+        # "ticket". Все записи проверяются за один проход, и при ошибках
+        # ValidationError сообщает их все сразу.
+        # trusted=True — данные из наших же снимков, уже проверенные при сохранении
+        if not trusted:
+            records, errors = validators.validate_many(records, validators.reader_schema)
+            if errors:
+                raise ValidationError(errors)
+        readers = []
+        for r in records:
+            reader_type = r["reader_type"]
+            if reader_type == "school":
+                reader = School.__new__(School)
+                reader.school_name = r["school_name"]
+                reader.grade = r["grade"]
+            elif reader_type == "student":
+                reader = Student.__new__(Student)
+                reader.university = r["university"]
+                reader.course = r["course"]
+            else:
+                reader = Reader.__new__(Reader)
+            reader.first_name = r["first_name"]
+            reader.last_name = r["last_name"]
+            reader.phone = r["phone"]
+            reader.email = r["email"]
+            reader.reader_type = reader_type
+            reader._init_state(r.get("ticket"))
+            readers.append(reader)
+        return readers
+
     def take_book(self, book: 'Book') -> bool:
-        if not book.is_available:
-            raise BookNotAvailableError(book.title) 
-        book.is_available = False
-        book.current_borrower = self
-        self.borrowed_books.append(book)
+        # Проверка и выдача под блокировкой книги: два терминала не выдадут её дважды.
+        # Событие тоже уходит под блокировкой, как и у мест и клубов: подписчики
+        # (журнал, база, планировщик) получают операции с книгой в порядке изменений
+        with book_locks.hold(book_key(book)):
+            if not book.is_available:
+                raise BookNotAvailableError(book.title) 
+            book.is_available = False
+            book.current_borrower = self
+            book.due_date = date.today() + timedelta(days=LOAN_DAYS)
+            self.borrowed_books.append(book)
+            catalog.refresh(book)
+            emit("lend", book=book, reader=self)
         return True
 
     def return_borrowed_book(self, book: 'Book') -> bool:
+        with book_locks.hold(book_key(book)):
+            self._release(book)
+            emit("return", book=book, reader=self)
+        return True
+
+    def _release(self, book: 'Book') -> None:
+        # Возврат без события; вызывающий держит блокировку книги
         if book not in self.borrowed_books:
             raise ValueError(f"Читатель {self.first_name} {self.last_name} не брал книгу '{book.title}' для возврата.") # <-- Эта строка новая
         book.is_available = True
         book.current_borrower = None
+        book.due_date = None
         self.borrowed_books.remove(book)
-        return True
+        catalog.refresh(book)
 
     def set_review(self, text: str, rating: int) -> None:
         self.review = Review(text, rating, self)
+        emit("review", reader=self)
 
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name} ({self.reader_type})"
@@ -295,45 +399,48 @@ class Reader:
     def save(self) -> bool:
         existing_reader = Reader.find_by_name(self.first_name, self.last_name)
         if existing_reader:
-            print(f"Читатель '{self}' уже существует. Обновляем данные.")
+            log(INFO, "reader_updated", "Читатель '%s' уже существует. Обновляем данные.", self, reader=(self.first_name, self.last_name))
             existing_reader.phone = self.phone
             existing_reader.email = self.email
             existing_reader.reader_type = self.reader_type
             existing_reader.education_place = self.education_place
+            emit("update_reader", obj=existing_reader)
             return True
-        readers.append(self)
-        print(f"Читатель '{self}' создан и добавлен в список.")
+        reader_registry.add(self)
+        log(INFO, "reader_created", "Читатель '%s' создан и добавлен в список.", self, reader=(self.first_name, self.last_name))
         return True
 
     @classmethod
-    def find_by_name(cls, first_name: str, last_name: str) -> Optional['Reader']:
-        for reader in readers:
-            if reader.first_name == first_name and reader.last_name == last_name:
-                print(f"Найден читатель: {reader}")
-                return reader
-        print(f"Читатель '{first_name} {last_name}' не найден.")
+    def find_by_name(cls, first_name: str, last_name: str, casefold: bool = False) -> Optional['Reader']:
+        reader = reader_registry.get(first_name, last_name, casefold)
+        if reader is not None:
+            log(DEBUG, "reader_found", "Найден читатель: %s", reader, reader=(first_name, last_name))
+            return reader
+        log(DEBUG, "reader_not_found", "Читатель '%s %s' не найден.", first_name, last_name, reader=(first_name, last_name))
         return None
 
     def update_education_place(self, new_education_place: str) -> bool:
         self.education_place = new_education_place.strip()
-        print(f"Место учёбы/работы читателя '{self}' обновлено.")
+        emit("update_reader", obj=self)
+        log(INFO, "reader_updated", "Место учёбы/работы читателя '%s' обновлено.", self, reader=(self.first_name, self.last_name))
         return True
 
     def delete(self) -> bool:
         if len(self.borrowed_books) > 0:
-            print(f"Невозможно удалить читателя '{self}', у него есть невозвращённые книги.")
+            log(WARNING, "reader_delete_refused", "Невозможно удалить читателя '%s', у него есть невозвращённые книги.", self, reader=(self.first_name, self.last_name))
             return False
-        if self in readers:
-            readers.remove(self)
-            print(f"Читатель '{self}' удалён из списка.")
+        if reader_registry.remove(self):
+            log(INFO, "reader_deleted", "Читатель '%s' удалён из списка.", self, reader=(self.first_name, self.last_name))
             return True
         else:
-            print(f"Читатель '{self}' не найден в списке для удаления.")
+            log(WARNING, "reader_delete_missing", "Читатель '%s' не найден в списке для удаления.", self, reader=(self.first_name, self.last_name))
             return False
 
 
 # Библиотекарь
 class Librarian:
+    __slots__ = ("first_name", "last_name", "phone")
+
     ACCESS_CODE: int = 314
 
     first_name: str
@@ -346,23 +453,9 @@ class Librarian:
         first_name: str, 
         phone: str
     ):
-        if not isinstance(first_name, str):
-            raise TypeError("first_name должен быть строкой.")
-        if not first_name.strip():
-            raise ValueError("first_name не может быть пустым.")
-        self.first_name = first_name.strip()
-
-        if not isinstance(last_name, str):
-            raise TypeError("last_name должен быть строкой.")
-        if not last_name.strip():
-            raise ValueError("last_name не может быть пустым.")
-        self.last_name = last_name.strip()
-
-        if not isinstance(phone, str):
-            raise TypeError("phone должен быть строкой.")
-        if not re.match(r"^\+7\d{10}$", phone.strip()):
-            raise ValueError("Неверный формат телефона. Пример: +70000000000")
-        self.phone = phone.strip()
+        self.first_name = validators.first_name(first_name)
+        self.last_name = validators.last_name(last_name)
+        self.phone = validators.phone(phone)
 
     @staticmethod
     def verify_code(code: int) -> bool:
@@ -371,11 +464,13 @@ class Librarian:
         return code == Librarian.ACCESS_CODE
 
     def accept_book_return(self, book: 'Book', reader: 'Reader') -> bool:
-        if book.is_available: # Книга уже доступна, значит, её не было в выдаче
-             raise ValueError(f"Книга '{book.title}' уже доступна, она не была выдана.")
-        if book.current_borrower != reader: # Книга выдана другому читателю
-             raise ValueError(f"Книга '{book.title}' выдана другому читателю, а не '{reader.first_name} {reader.last_name}'.")
-        reader.return_borrowed_book(book) # Этот вызов теперь может выбросить ValueError
+        with book_locks.hold(book_key(book)):
+            if book.is_available: # Книга уже доступна, значит, её не было в выдаче
+                 raise ValueError(f"Книга '{book.title}' уже доступна, она не была выдана.")
+            if book.current_borrower != reader: # Книга выдана другому читателю
+                 raise ValueError(f"Книга '{book.title}' выдана другому читателю, а не '{reader.first_name} {reader.last_name}'.")
+            reader._release(book) # Этот вызов теперь может выбросить ValueError
+            emit("return", book=book, reader=reader)
         return True
 
     def lend_book_to_reader(self, book: Book, reader: Reader) -> bool:
@@ -385,46 +480,50 @@ class Librarian:
         if not isinstance(new_place, str):
             raise TypeError("new_place должен быть строкой.")
         reader.education_place = new_place.strip()
+        emit("update_reader", obj=reader)
 
     def save(self) -> bool:
         existing_librarian = Librarian.find_by_name(self.first_name, self.last_name)
         if existing_librarian:
-            print(f"Библиотекарь '{self}' уже существует. Обновляем данные.")
+            log(INFO, "librarian_updated", "Библиотекарь '%s' уже существует. Обновляем данные.", self, librarian=(self.first_name, self.last_name))
             existing_librarian.phone = self.phone
+            emit("update_librarian", obj=existing_librarian)
             return True
-        librarians.append(self)
-        print(f"Библиотекарь '{self}' создан и добавлен в список.")
+        librarian_registry.add(self)
+        log(INFO, "librarian_created", "Библиотекарь '%s' создан и добавлен в список.", self, librarian=(self.first_name, self.last_name))
         return True
 
     @classmethod
-    def find_by_name(cls, first_name: str, last_name: str) -> Optional['Librarian']:
-        for librarian in librarians:
-            if librarian.first_name == first_name and librarian.last_name == last_name:
-                print(f"Найден библиотекарь: {librarian}")
-                return librarian
-        print(f"Библиотекарь '{first_name} {last_name}' не найден.")
+    def find_by_name(cls, first_name: str, last_name: str, casefold: bool = False) -> Optional['Librarian']:
+        librarian = librarian_registry.get(first_name, last_name, casefold)
+        if librarian is not None:
+            log(DEBUG, "librarian_found", "Найден библиотекарь: %s", librarian, librarian=(first_name, last_name))
+            return librarian
+        log(DEBUG, "librarian_not_found", "Библиотекарь '%s %s' не найден.", first_name, last_name, librarian=(first_name, last_name))
         return None
 
     def update_phone(self, new_phone: str) -> bool:
-        if not re.match(r"^\+7\d{10}$", new_phone.strip()):
-            print("Неверный формат телефона.")
+        if not validators.is_phone(new_phone):
+            log(WARNING, "librarian_bad_phone", "Неверный формат телефона.", librarian=(self.first_name, self.last_name))
             return False
         self.phone = new_phone.strip()
-        print(f"Телефон библиотекаря '{self}' обновлён.")
+        emit("update_librarian", obj=self)
+        log(INFO, "librarian_updated", "Телефон библиотекаря '%s' обновлён.", self, librarian=(self.first_name, self.last_name))
         return True
 
     def delete(self) -> bool:
-        if self in librarians:
-            librarians.remove(self)
-            print(f"Библиотекарь '{self}' удалён из списка.")
+        if librarian_registry.remove(self):
+            log(INFO, "librarian_deleted", "Библиотекарь '%s' удалён из списка.", self, librarian=(self.first_name, self.last_name))
             return True
         else:
-            print(f"Библиотекарь '{self}' не найден в списке для удаления.")
+            log(WARNING, "librarian_delete_missing", "Библиотекарь '%s' не найден в списке для удаления.", self, librarian=(self.first_name, self.last_name))
             return False
 
 
 # Школьник
 class School(Reader):
+    __slots__ = ("school_name", "grade")
+
     school_name: str
     grade: str
 
@@ -437,23 +536,16 @@ class School(Reader):
         school_name: str,
         grade: str
     ):
-        if not isinstance(school_name, str):
-            raise TypeError("school_name должен быть строкой.")
-        if not school_name.strip():
-            raise ValueError("school_name не может быть пустым.")
-        self.school_name = school_name.strip()
-
-        if not isinstance(grade, str):
-            raise TypeError("grade должен быть строкой.")
-        if not grade.strip():
-            raise ValueError("grade не может быть пустым.")
-        self.grade = grade.strip()
+        self.school_name = validators.school_name(school_name)
+        self.grade = validators.grade(grade)
 
         super().__init__(first_name, last_name, phone, email, "school")
 
 
 # Студент
 class Student(Reader):
+    __slots__ = ("university", "course")
+
     university: str
     course: int
 
@@ -466,17 +558,8 @@ class Student(Reader):
         university: str,
         course: int
     ):
-        if not isinstance(university, str):
-            raise TypeError("university должен быть строкой.")
-        if not university.strip():
-            raise ValueError("university не может быть пустым.")
-        self.university = university.strip()
-
-        if not isinstance(course, int):
-            raise TypeError("course должен быть целым числом.")
-        if not (1 <= course <= 6):
-            raise ValueError("course должен быть от 1 до 6.")
-        self.course = course
+        self.university = validators.university(university)
+        self.course = validators.course(course)
 
         super().__init__(first_name, last_name, phone, email, "student")
 
@@ -485,6 +568,7 @@ class Student(Reader):
 class Room:
     name: str
     seats: Dict[int, Dict[datetime, Reader]]
+    schedule: SeatSchedule
 
     def __init__(
         self, 
@@ -501,7 +585,8 @@ class Room:
             raise TypeError("total_seats должен быть целым числом.")
         if total_seats < 1:
             raise ValueError("total_seats должен быть >= 1.")
-        self.seats = {i: {} for i in range(1, total_seats + 1)}
+        self.schedule = SeatSchedule()
+        self.seats = {i: SeatBookings(self.schedule, i) for i in range(1, total_seats + 1)}
 
     def is_seat_available_at(self, seat_num: int, dt: datetime) -> bool:
         if not isinstance(seat_num, int) or seat_num not in self.seats:
@@ -511,115 +596,227 @@ class Room:
         return dt not in self.seats[seat_num]
 
     def reserve_seat(self, seat_num: int, dt: datetime, reader: 'Reader') -> bool:
-        if self.is_seat_available_at(seat_num, dt):
-            self.seats[seat_num][dt] = reader
-            return True
+        with seat_locks.hold(seat_key(self, seat_num)):
+            if self.is_seat_available_at(seat_num, dt):
+                self.seats[seat_num][dt] = reader
+                emit("reserve_seat", room=self, seat=seat_num, dt=dt, reader=reader)
+                return True
         return False
 
+    def is_seat_free_between(self, seat_num: int, start: datetime, end: datetime) -> bool:
+        if seat_num not in self.seats:
+            return False
+        return self.schedule.is_free(seat_num, start, end)
+
+    def free_seats(self, start: datetime, end: datetime) -> List[int]:
+        return self.schedule.find_free(self.seats, start, end)
+
+    def find_free_seats(self, count: int, start: datetime, end: datetime) -> List[int]:
+        if not isinstance(count, int) or count < 1:
+            raise ValueError("count должен быть целым числом >= 1.")
+        found = self.schedule.find_free(self.seats, start, end, count)
+        return found if len(found) == count else []
+
+    def reserve_range(self, seat_num: int, start: datetime, end: datetime, reader: 'Reader') -> bool:
+        # Бронирует все слоты в [start, end) целиком или не бронирует ничего
+        if not self.is_seat_free_between(seat_num, start, end):
+            return False
+        slots = self.schedule.slot_starts(start, end)
+        if not slots:
+            return False
+        return all(r == RESERVED for r in self.reserve_many([(seat_num, dt, reader) for dt in slots]))
+
+    def reserve_many(self, requests: List[Tuple[int, datetime, 'Reader']]) -> List[str]:
+        # Пакетное бронирование: сначала проверяются все заявки, затем, только если
+        # все корректны, они записываются разом и уходят одним событием reserve_seats.
+        # Для каждой заявки возвращается результат (RESERVED, TAKEN, NO_SEAT, ...)
+        keys = {
+            seat_key(self, seat_num) for seat_num, _, _ in requests
+            if isinstance(seat_num, int) and seat_num in self.seats
+        }
+        with seat_locks.hold(*keys):
+            return self._reserve_many(requests)
+
+    def _reserve_many(self, requests: List[Tuple[int, datetime, 'Reader']]) -> List[str]:
+        results = []
+        seen = set()
+        failed = False
+        for seat_num, dt, _ in requests:
+            if not isinstance(seat_num, int) or seat_num not in self.seats:
+                result = NO_SEAT
+            elif not isinstance(dt, datetime):
+                result = BAD_TIME
+            elif dt in self.seats[seat_num]:
+                result = TAKEN
+            elif (seat_num, dt) in seen:
+                result = DUPLICATE
+            else:
+                seen.add((seat_num, dt))
+                result = RESERVED
+            failed = failed or result != RESERVED
+            results.append(result)
+        if failed or not requests:
+            return [SKIPPED if r == RESERVED else r for r in results]
+
+        bookings = []
+        for seat_num, dt, reader in requests:
+            self.seats[seat_num][dt] = reader
+            bookings.append((seat_num, dt, reader))
+        emit("reserve_seats", room=self, bookings=bookings)
+        return results
+
+    def find_adjacent_seats(self, count: int, start: datetime, end: datetime) -> List[int]:
+        # Первые count мест подряд (по номерам), свободных на весь интервал
+        if not isinstance(count, int) or count < 1:
+            raise ValueError("count должен быть целым числом >= 1.")
+        run: List[int] = []
+        for seat_num in self.schedule.find_free(sorted(self.seats), start, end):
+            if run and seat_num != run[-1] + 1:
+                run = []
+            run.append(seat_num)
+            if len(run) == count:
+                return run
+        return []
+
+    def reserve_adjacent(self, count: int, start: datetime, end: datetime, reader: 'Reader') -> List[int]:
+        # Бронирует count соседних мест на все слоты интервала (например, для группы).
+        # Возвращает номера мест или пустой список, если подходящего ряда нет
+        seat_nums = self.find_adjacent_seats(count, start, end)
+        slots = self.schedule.slot_starts(start, end)
+        if not seat_nums or not slots:
+            return []
+        requests = [(seat_num, dt, reader) for seat_num in seat_nums for dt in slots]
+        if any(r != RESERVED for r in self.reserve_many(requests)):
+            return []
+        return seat_nums
+
+    def has_future_bookings(self, now: Optional[datetime] = None) -> bool:
+        return self.schedule.has_bookings_after(now or datetime.now())
+
     def save(self) -> bool:
         existing_room = Room.find_by_name(self.name)
         if existing_room:
-            print(f"Читательский зал '{self.name}' уже существует. Обновляем (например, количество мест).")
+            log(INFO, "room_updated", "Читательский зал '%s' уже существует. Обновляем (например, количество мест).", self.name, room=self.name)
             existing_room.name = self.name # Обновляем имя, если оно изменилось
             return True
         rooms.append(self)
-        print(f"Читательский зал '{self.name}' создан и добавлен в список.")
+        emit("add_room", obj=self)
+        log(INFO, "room_created", "Читательский зал '%s' создан и добавлен в список.", self.name, room=self.name)
         return True
 
     @classmethod
     def find_by_name(cls, name: str) -> Optional['Room']:
         for room in rooms:
             if room.name == name:
-                print(f"Найден зал: {room.name}")
+                log(DEBUG, "room_found", "Найден зал: %s", room.name, room=name)
                 return room
-        print(f"Читательский зал '{name}' не найден.")
+        log(DEBUG, "room_not_found", "Читательский зал '%s' не найден.", name, room=name)
         return None
 
     def update_name(self, new_name: str) -> bool:
         existing_room = Room.find_by_name(new_name)
         if existing_room and existing_room != self:
-             print(f"Читательский зал с названием '{new_name}' уже существует.")
+             log(WARNING, "room_rename_refused", "Читательский зал с названием '%s' уже существует.", new_name, room=self.name)
              return False
+        old_name = self.name
         self.name = new_name.strip()
-        print(f"Название зала '{self.name}' изменено на '{new_name}'.")
+        emit("rename_room", obj=self, old_name=old_name)
+        log(INFO, "room_renamed", "Название зала '%s' изменено на '%s'.", self.name, new_name, room=self.name)
         return True
 
     def delete(self) -> bool:
-        now = datetime.now()
-        has_future_booking = any(
-            dt >= now for times in self.seats.values() for dt in times.keys()
-        )
-        if has_future_booking:
-            print(f"Невозможно удалить зал '{self.name}', так как в нём есть бронирования на будущее.")
+        if self.has_future_bookings():
+            log(WARNING, "room_delete_refused", "Невозможно удалить зал '%s', так как в нём есть бронирования на будущее.", self.name, room=self.name)
             return False
         if self in rooms:
             rooms.remove(self)
-            print(f"Читательский зал '{self.name}' удалён из списка.")
+            emit("remove_room", obj=self)
+            log(INFO, "room_deleted", "Читательский зал '%s' удалён из списка.", self.name, room=self.name)
             return True
         else:
-            print(f"Читательский зал '{self.name}' не найден в списке для удаления.")
+            log(WARNING, "room_delete_missing", "Читательский зал '%s' не найден в списке для удаления.", self.name, room=self.name)
             return False
 
 
 # Читательский клуб
 class Club:
+    # Название — постоянный ключ клуба (журнал, снимки); None у клубов из старых снимков
+    name: Optional[str]
     members: List[Reader]
     meetings: List[datetime]
     current_book: Optional[Book]
 
-    def __init__(self):
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
         self.members = []
         self.meetings = []
         self.current_book = None
 
+    @staticmethod
+    def default_name(position: int) -> str:
+        return f"Клуб №{position + 1}"
+
+    def key(self) -> str:
+        # Безымянный клуб получает название по месту в списке и дальше хранит его
+        if self.name is None:
+            self.name = Club.default_name(clubs.index(self) if self in clubs else len(clubs))
+        return self.name
+
     def join(self, reader: Reader) -> None:
-        if reader not in self.members:
-            self.members.append(reader)
-            reader.in_club = True
+        with club_locks.hold(club_key(self)):
+            if reader not in self.members:
+                self.members.append(reader)
+                reader.in_club = True
+                emit("join_club", club=self, reader=reader)
 
     def leave(self, reader: Reader) -> None:
-        if reader in self.members:
-            self.members.remove(reader)
-            reader.in_club = False
+        with club_locks.hold(club_key(self)):
+            if reader in self.members:
+                self.members.remove(reader)
+                reader.in_club = False
+                emit("leave_club", club=self, reader=reader)
 
     def add_meeting(self, dt: datetime) -> None:
         self.meetings.append(dt)
+        emit("add_meeting", club=self, dt=dt)
 
     def set_current_book(self, book: Book) -> None:
         self.current_book = book
+        emit("update_club", obj=self)
 
     def save(self) -> bool:
         if self not in clubs:
             clubs.append(self)
-            print(f"Читательский клуб '{id(self)}' создан и добавлен в список.")
+            emit("add_club", obj=self)
+            log(INFO, "club_created", "Читательский клуб '%s' создан и добавлен в список.", id(self), club=id(self))
             return True
         else:
-            print(f"Читательский клуб '{id(self)}' уже существует в списке.")
+            log(INFO, "club_exists", "Читательский клуб '%s' уже существует в списке.", id(self), club=id(self))
             return True
 
     def find_by_index(cls, index: int) -> Optional['Club']:
         if 0 <= index < len(clubs):
             club = clubs[index]
-            print(f"Найден клуб: {id(club)}")
+            log(DEBUG, "club_found", "Найден клуб: %s", id(club), club=index)
             return club
-        print(f"Читательский клуб с индексом {index} не найден.")
+        log(DEBUG, "club_not_found", "Читательский клуб с индексом %s не найден.", index, club=index)
         return None
 
     def set_current_book_crud(self, new_book: Book) -> bool:
         self.set_current_book(new_book)
-        print(f"Текущая книга клуба '{id(self)}' обновлена на '{new_book}'.")
+        log(INFO, "club_updated", "Текущая книга клуба '%s' обновлена на '%s'.", id(self), new_book, club=id(self))
         return True
 
     def delete(self) -> bool:
         if len(self.members) > 0:
-            print(f"Невозможно удалить клуб '{id(self)}', так как в нём есть члены.")
+            log(WARNING, "club_delete_refused", "Невозможно удалить клуб '%s', так как в нём есть члены.", id(self), club=id(self))
             return False
         if self in clubs:
+            self.key()  # название нужно журналу, пока место клуба в списке известно
             clubs.remove(self)
-            print(f"Читательский клуб '{id(self)}' удалён из списка.")
+            emit("remove_club", obj=self)
+            log(INFO, "club_deleted", "Читательский клуб '%s' удалён из списка.", id(self), club=id(self))
             return True
         else:
-            print(f"Читательский клуб '{id(self)}' не найден в списке для удаления.")
+            log(WARNING, "club_delete_missing", "Читательский клуб '%s' не найден в списке для удаления.", id(self), club=id(self))
             return False
-
-from main import books, readers, librarians, rooms, clubs # Импортглобальных списков из main для хранения данных
@@ -17,6 +17,13 @@ class BookNotFoundError(LibraryError):
         super().__init__(f"Книга с ISBN '{isbn}' не найдена в каталоге.")
 
 
+class ReaderNotFoundError(LibraryError):
+    def __init__(self, first_name: str, last_name: str):
+        self.first_name = first_name
+        self.last_name = last_name
+        super().__init__(f"Читатель '{first_name} {last_name}' не найден.")
+
+
 class ReaderHasBooksError(LibraryError):
     def __init__(self, first_name: str, last_name: str, book_count: int):
         self.first_name = first_name
@@ -31,4 +38,14 @@ class ReaderHasBooksError(LibraryError):
 class DuplicateBookError(LibraryError):
     def __init__(self, isbn: str):
         self.isbn = isbn
-        super().__init__(f"Книга с ISBN '{isbn}' уже существует в каталоге.")
\ No newline at end of file
+        super().__init__(f"Книга с ISBN '{isbn}' уже существует в каталоге.")
+
+
+class ValidationError(LibraryError, ValueError):
+    # Все ошибки пачки записей сразу: список (номер записи, поле, сообщение)
+    def __init__(self, errors: list):
+        self.errors = errors
+        index, field, message = errors[0]
+        super().__init__(
+            f"Найдено ошибок: {len(errors)}. Первая — запись №{index}, поле {field}: {message}"
+        )
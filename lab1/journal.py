@@ -0,0 +1,364 @@
+# Журнал операций (write-ahead log): каждое изменение дописывается в конец файла
+# одной строкой JSON, а полный снимок data.json/data.xml пишется только при уплотнении.
+# Записываются все события stores.emit: выдачи, книги, читатели (и их отзывы),
+# библиотекари, залы с бронированиями и клубы с участниками и встречами
+
+import json
+import os
+import threading
+from datetime import datetime, date
+
+import stores
+from stores import catalog, reader_registry, librarian_registry
+from classes import Author, Location, Review, Room, Club
+from records import reader_from_dict, reader_to_dict, book_from_dict, book_to_dict
+from exceptions import LibraryError
+from snapshot import atomic_write
+from logs import log, WARNING
+
+COMPACT_EVERY = 1000
+
+
+def _name(person) -> list:
+    return [person.first_name, person.last_name]
+
+
+def _encode(op: str, data: dict) -> dict | None:
+    # Ссылки на объекты сохраняются ключами: ISBN, имя читателя, название зала и клуба
+    if op == "lend":
+        due = data["book"].due_date
+        return {
+            "op": op,
+            "isbn": data["book"].isbn,
+            "reader": _name(data["reader"]),
+            "due": due.isoformat() if due else None
+        }
+    if op == "return":
+        return {"op": op, "isbn": data["book"].isbn, "reader": _name(data["reader"])}
+    if op == "add_book":
+        return {"op": op, "book": book_to_dict(data["obj"])}
+    if op == "remove_book":
+        return {"op": op, "isbn": data["obj"].isbn}
+    if op == "add_reader":
+        return {"op": op, "reader": reader_to_dict(data["obj"])}
+    if op == "remove_reader":
+        return {"op": op, "reader": _name(data["obj"])}
+    if op == "reserve_seat":
+        return {
+            "op": op,
+            "room": data["room"].name,
+            "seat": data["seat"],
+            "datetime": data["dt"].isoformat(),
+            "reader": _name(data["reader"])
+        }
+    if op == "reserve_seats":
+        return {
+            "op": op,
+            "room": data["room"].name,
+            "bookings": [
+                [seat, dt.isoformat(), _name(reader)] for seat, dt, reader in data["bookings"]
+            ]
+        }
+    if op in ("join_club", "leave_club"):
+        club = data["club"]
+        if club not in stores.clubs:
+            return None
+        return {"op": op, "club": club.key(), "reader": _name(data["reader"])}
+    if op == "update_book":
+        book = data["obj"]
+        return {
+            "op": op,
+            "isbn": book.isbn,
+            "title": book.title,
+            "author": [book.author.first_name, book.author.last_name, book.author.bio],
+            "location": [book.location.rack, book.location.shelf]
+        }
+    if op == "review":
+        review = data["reader"].review
+        return {
+            "op": op,
+            "reader": _name(data["reader"]),
+            "text": review.text,
+            "rating": review.rating,
+            "date": review.date.isoformat()
+        }
+    if op == "update_reader":
+        r = data["obj"]
+        return {
+            "op": op,
+            "reader": _name(r),
+            "phone": r.phone,
+            "email": r.email,
+            "reader_type": r.reader_type,
+            "education_place": r.education_place
+        }
+    if op == "update_librarian":
+        return {"op": op, "librarian": _name(data["obj"]), "phone": data["obj"].phone}
+    if op == "add_room":
+        return {"op": op, "room": data["obj"].name, "seats": len(data["obj"].seats)}
+    if op == "rename_room":
+        return {"op": op, "room": data["old_name"], "name": data["obj"].name}
+    if op == "remove_room":
+        return {"op": op, "room": data["obj"].name}
+    if op in ("add_club", "update_club"):
+        club = data["obj"]
+        if club not in stores.clubs:
+            return None
+        return {
+            "op": op,
+            "club": club.key(),
+            "isbn": club.current_book.isbn if club.current_book else None
+        }
+    if op == "add_meeting":
+        club = data["club"]
+        if club not in stores.clubs:
+            return None
+        return {"op": op, "club": club.key(), "datetime": data["dt"].isoformat()}
+    if op == "remove_club":
+        # Club.delete фиксирует название до удаления из списка
+        return {"op": op, "club": data["obj"].key()}
+    return None
+
+
+def _club(key):
+    # Журналы до появления названий клубов хранят номер клуба в списке
+    if isinstance(key, int):
+        return stores.clubs[key] if 0 <= key < len(stores.clubs) else None
+    return next((c for c in stores.clubs if c.key() == key), None)
+
+
+def _apply(entry: dict) -> None:
+    op = entry["op"]
+    if op in ("lend", "return"):
+        book = catalog.get(entry["isbn"])
+        reader = reader_registry.get(*entry["reader"])
+        if book and reader:
+            if op == "lend":
+                reader.take_book(book)
+                if entry.get("due"):
+                    book.due_date = date.fromisoformat(entry["due"])
+            else:
+                reader.return_borrowed_book(book)
+    elif op == "add_book":
+        if catalog.get(entry["book"]["isbn"]) is None:
+            catalog.add(book_from_dict(entry["book"]))
+    elif op == "remove_book":
+        book = catalog.get(entry["isbn"])
+        if book:
+            catalog.remove(book)
+    elif op == "add_reader":
+        # Читатель мог попасть и в снимок, если тот снимался во время записи в журнал
+        r = entry["reader"]
+        if reader_registry.get(r["first_name"], r["last_name"]) is None:
+            reader_registry.add(reader_from_dict(r, trusted=True))
+    elif op == "remove_reader":
+        reader = reader_registry.get(*entry["reader"])
+        if reader:
+            reader_registry.remove(reader)
+    elif op == "reserve_seat":
+        room = next((r for r in stores.rooms if r.name == entry["room"]), None)
+        reader = reader_registry.get(*entry["reader"])
+        if room and reader:
+            room.reserve_seat(entry["seat"], datetime.fromisoformat(entry["datetime"]), reader)
+    elif op == "reserve_seats":
+        room = next((r for r in stores.rooms if r.name == entry["room"]), None)
+        if room:
+            requests = []
+            for seat, dt, name in entry["bookings"]:
+                reader = reader_registry.get(*name)
+                if reader:
+                    requests.append((seat, datetime.fromisoformat(dt), reader))
+            room.reserve_many(requests)
+    elif op in ("join_club", "leave_club"):
+        reader = reader_registry.get(*entry["reader"])
+        club = _club(entry["club"])
+        if reader and club:
+            if op == "join_club":
+                club.join(reader)
+            else:
+                club.leave(reader)
+    elif op == "update_book":
+        book = catalog.get(entry["isbn"])
+        if book:
+            book.title = entry["title"]
+            book.author = Author.get_or_create(*entry["author"])
+            book.location = Location.get_or_create(*entry["location"])
+            catalog.refresh(book)
+    elif op == "review":
+        reader = reader_registry.get(*entry["reader"])
+        if reader:
+            review = Review(entry["text"], entry["rating"], reader)
+            review.date = datetime.fromisoformat(entry["date"])
+            reader.review = review
+    elif op == "update_reader":
+        reader = reader_registry.get(*entry["reader"])
+        if reader:
+            reader.phone = entry["phone"]
+            reader.email = entry["email"]
+            reader.reader_type = entry["reader_type"]
+            reader.education_place = entry["education_place"]
+    elif op == "update_librarian":
+        librarian = librarian_registry.get(*entry["librarian"])
+        if librarian:
+            librarian.phone = entry["phone"]
+    elif op == "add_room":
+        if not any(r.name == entry["room"] for r in stores.rooms):
+            stores.rooms.append(Room(entry["room"], entry["seats"]))
+    elif op == "rename_room":
+        room = next((r for r in stores.rooms if r.name == entry["room"]), None)
+        if room:
+            room.name = entry["name"]
+    elif op == "remove_room":
+        room = next((r for r in stores.rooms if r.name == entry["room"]), None)
+        if room:
+            stores.rooms.remove(room)
+    elif op in ("add_club", "update_club"):
+        club = _club(entry["club"])
+        if club is None and op == "add_club":
+            club = Club(entry["club"])
+            stores.clubs.append(club)
+        if club:
+            club.current_book = catalog.get(entry["isbn"]) if entry["isbn"] else None
+    elif op == "add_meeting":
+        club = _club(entry["club"])
+        dt = datetime.fromisoformat(entry["datetime"])
+        if club and dt not in club.meetings:
+            club.meetings.append(dt)
+    elif op == "remove_club":
+        club = _club(entry["club"])
+        if club:
+            stores.clubs.remove(club)
+
+
+class Journal:
+    path: str
+    compact_every: int
+    fsync: bool
+    entries: int
+
+    def __init__(
+        self,
+        path: str,
+        snapshot=None,
+        compact_every: int = COMPACT_EVERY,
+        fsync: bool = True
+    ):
+        self.path = path
+        self.snapshot = snapshot
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.entries = 0
+        self._file = None
+        self._replaying = False
+        # Записи из разных потоков не должны перемежаться внутри строки
+        self._lock = threading.RLock()
+
+    def open(self) -> None:
+        self._file = open(self.path, 'a', encoding='utf-8')
+        stores.subscribe(self.record)
+
+    def close(self) -> None:
+        stores.unsubscribe(self.record)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def record(self, op: str, data: dict) -> None:
+        if self._replaying or self._file is None:
+            return
+        entry = _encode(op, data)
+        if entry is None:
+            return
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.entries += 1
+            if self.snapshot is not None and self.entries >= self.compact_every:
+                self.compact()
+
+    def sync(self) -> None:
+        # Групповая фиксация: при fsync=False записи копятся в кэше ОС, и один
+        # вызов sync() надёжно сохраняет сразу всю пачку
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def mark(self) -> tuple:
+        # Отметка текущего конца журнала: (размер файла в байтах, число записей)
+        with self._lock:
+            if self._file is None:
+                return (0, 0)
+            self._file.flush()
+            return (os.fstat(self._file.fileno()).st_size, self.entries)
+
+    def drop_until(self, mark: tuple) -> None:
+        # Удаляет записи до отметки (они уже в снимке), дописанные после неё сохраняются
+        size, entries = mark
+        with self._lock:
+            if self._file is None or size == 0:
+                return
+            self._file.flush()
+            with open(self.path, 'rb') as f:
+                f.seek(size)
+                tail = f.read()
+            # Хвост пишется в новый файл и подменяет журнал одним rename, как снимки:
+            # при сбое на диске остаётся либо старый журнал целиком, либо новый
+            atomic_write(self.path, lambda out: out.write(tail), binary=True)
+            self._file.close()
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self.entries = max(0, self.entries - entries)
+
+    def _truncate(self) -> None:
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.truncate()
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        elif os.path.exists(self.path):
+            open(self.path, 'w').close()
+        self.entries = 0
+
+    def compact(self) -> None:
+        # Снимок уже содержит все операции журнала, после него журнал обнуляется
+        with self._lock:
+            if self.snapshot is not None:
+                self.snapshot()
+            self._truncate()
+
+    def discard(self) -> None:
+        # Отказ от несохранённых операций (выход без сохранения)
+        self._truncate()
+
+    def replay(self) -> int:
+        # Применяет журнал поверх загруженного снимка; недописанная последняя строка
+        # (сбой во время записи) пропускается
+        if not os.path.exists(self.path):
+            return 0
+        count = 0
+        self._replaying = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    try:
+                        _apply(entry)
+                    except (LibraryError, ValueError, KeyError, IndexError, TypeError) as e:
+                        log(WARNING, "journal_entry_skipped", "Пропущена запись журнала %s: %s",
+                            entry, e, op=entry.get("op"), error=type(e).__name__)
+                    count += 1
+        finally:
+            self._replaying = False
+        self.entries = count
+        return count
@@ -0,0 +1,661 @@
+# Загрузка data.json по требованию для больших снимков.
+# При запуске читается только индекс: ISBN -> (смещение, длина) записи книги и
+# (имя, фамилия) -> (смещение, длина) записи читателя. Индекс хранится рядом со
+# снимком (data.json.idx) и перестраивается одним проходом по файлу, только если
+# снимок изменился. Книга или читатель собираются из своей записи при первом
+# обращении через catalog.get / reader_registry.get и остаются в памяти, пока
+# их не вытеснят другие (ObjectCache на CAPACITY групп, LRU или LFU). В индексе
+# также лежат сроки выдач и билетов — по ним планировщик строит напоминания,
+# не загружая книги и читателей, — и названия с авторами для поиска по названию.
+#
+# Группа — читатель вместе с выданными ему книгами или невыданная книга: они
+# загружаются и выгружаются целиком, чтобы ссылки книга <-> читатель всегда
+# указывали на одни и те же объекты. Не выгружаются изменённые, но ещё не
+# сохранённые объекты, а также участники клубов и их текущие книги. Записать
+# одну группу обратно в data.json при вытеснении нельзя (файл переписывается
+# только целиком), поэтому изменённые группы ждут save() сверх capacity; их
+# число показывает stats.held — по нему подбирают capacity и частоту сохранений.
+#
+# Сохранение не собирает снимок из памяти (там лишь часть данных): новый data.json
+# копирует неизменённые записи из старого файла кусками, а изменённые, новые и
+# удалённые записи подставляет из памяти. Библиотекари, залы и клубы невелики —
+# они загружаются и сохраняются целиком. Новый снимок можно писать в другой файл
+# (target), например в подготовленный data.json.staged. data.xml в этом режиме
+# не обновляется; списки main.books/main.readers видят только загруженные в память записи
+
+import json
+import os
+import threading
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from classes import Book, Reader, Librarian, Room, Club
+import stores
+from stores import catalog, reader_registry, librarian_registry, NameRegistry
+from streaming import iter_json_spans
+from records import (
+    reader_from_dict, reader_to_dict, book_from_dict, book_to_dict,
+    librarian_to_dict, room_to_dict, club_to_dict
+)
+from snapshot import atomic_write
+from cache import ObjectCache, CacheStats, LRU
+from scheduler import scheduler, LOAN, TICKET
+from search import search_index
+from logs import log, WARNING
+
+CAPACITY = 10_000
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 3
+COPY_CHUNK = 1 << 20
+SMALL_SECTIONS = ("librarians", "rooms", "clubs")
+
+# (смещение, длина) записи в файле, в байтах
+Span = Tuple[int, int]
+
+
+def _utf8(s: str) -> str:
+    # Строка, прочитанная как latin-1 (байт = символ), обратно в текст
+    return s.encode("latin-1").decode("utf-8")
+
+
+def _dumps(item: dict) -> bytes:
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loan_due(book: dict) -> Optional[str]:
+    return None if book["is_available"] else book.get("due_date")
+
+
+def _ticket_due(reader: dict) -> str:
+    return reader["ticket"]["expiry_date"]
+
+
+def _book_text(book: dict) -> tuple:
+    author = book["author"]
+    return (book["title"], author["first_name"], author["last_name"], author.get("bio", ""))
+
+
+def _carry(spans: dict, old: dict, changed: dict, field) -> dict:
+    # Поле записей нового снимка: у неизменённых берётся из старого индекса, у остальных — из записи
+    result = {}
+    for key in spans:
+        value = field(changed[key]) if key in changed else old.get(key)
+        if value:
+            result[key] = value
+    return result
+
+
+# Читатель брони в зале: брони нужны только имена, а загрузка всех читателей
+# со старыми бронями свела бы на нет смысл ленивого режима
+class ReaderRef(NamedTuple):
+    first_name: str
+    last_name: str
+
+
+class SnapshotIndex:
+    books: Dict[str, Span]
+    readers: Dict[Tuple[str, str], Span]
+    sections: Dict[str, List[Span]]
+    # Сроки в формате ISO: ISBN выданной книги -> срок возврата, имя читателя -> конец билета
+    loans: Dict[str, str]
+    tickets: Dict[Tuple[str, str], str]
+    # ISBN -> (название, имя автора, фамилия автора, биография) для поиска
+    texts: Dict[str, tuple]
+    size: int
+    mtime_ns: int
+
+    def __init__(self):
+        # Порядок ключей совпадает с порядком записей в файле
+        self.books = {}
+        self.readers = {}
+        self.sections = {name: [] for name in SMALL_SECTIONS}
+        self.loans = {}
+        self.tickets = {}
+        self.texts = {}
+        self.size = 0
+        self.mtime_ns = 0
+
+    def stamp(self, path: str) -> None:
+        st = os.stat(path)
+        self.size, self.mtime_ns = st.st_size, st.st_mtime_ns
+
+    def matches(self, path: str) -> bool:
+        st = os.stat(path)
+        return (self.size, self.mtime_ns) == (st.st_size, st.st_mtime_ns)
+
+    @classmethod
+    def build(cls, path: str) -> 'SnapshotIndex':
+        # latin-1: один символ на байт, поэтому позиции разбора — смещения в файле.
+        # Повторы ключей пропускаются, как и при обычной загрузке (побеждает первый)
+        index = cls()
+        with open(path, 'r', encoding="latin-1", newline="") as f:
+            for section, item, start, end in iter_json_spans(f):
+                span = (start, end - start)
+                if section == "books":
+                    isbn = _utf8(item["isbn"])
+                    if isbn not in index.books:
+                        index.books[isbn] = span
+                        index.texts[isbn] = tuple(map(_utf8, _book_text(item)))
+                        if _loan_due(item):
+                            index.loans[isbn] = _loan_due(item)
+                elif section == "readers":
+                    key = (_utf8(item["first_name"]), _utf8(item["last_name"]))
+                    if key not in index.readers:
+                        index.readers[key] = span
+                        index.tickets[key] = _ticket_due(item)
+                else:
+                    index.sections[section].append(span)
+        index.stamp(path)
+        return index
+
+    @classmethod
+    def load(cls, path: str) -> Optional['SnapshotIndex']:
+        # Индекс из файла path + INDEX_SUFFIX, если он есть и снимок с тех пор не менялся
+        try:
+            with open(path + INDEX_SUFFIX, 'r', encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        index = cls()
+        index.size, index.mtime_ns = data["size"], data["mtime_ns"]
+        if not index.matches(path):
+            return None
+        index.books = {isbn: (off, n) for isbn, off, n in data["books"]}
+        index.readers = {(first, last): (off, n) for first, last, off, n in data["readers"]}
+        index.sections = {name: [tuple(span) for span in data[name]] for name in SMALL_SECTIONS}
+        index.loans = dict(data["loans"])
+        index.tickets = {(first, last): when for first, last, when in data["tickets"]}
+        index.texts = {isbn: tuple(text) for isbn, *text in data["texts"]}
+        return index
+
+    def save(self, path: str) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "books": [[isbn, off, n] for isbn, (off, n) in self.books.items()],
+            "readers": [[first, last, off, n] for (first, last), (off, n) in self.readers.items()],
+            "loans": [[isbn, when] for isbn, when in self.loans.items()],
+            "tickets": [[first, last, when] for (first, last), when in self.tickets.items()],
+            "texts": [[isbn, *text] for isbn, text in self.texts.items()],
+            **{name: [list(span) for span in self.sections[name]] for name in SMALL_SECTIONS},
+        }
+        atomic_write(path + INDEX_SUFFIX, lambda f: json.dump(data, f, ensure_ascii=False, separators=(",", ":")))
+
+
+def open_index(path: str) -> SnapshotIndex:
+    index = SnapshotIndex.load(path)
+    if index is None:
+        index = SnapshotIndex.build(path)
+        try:
+            index.save(path)
+        except OSError as e:
+            log(WARNING, "snapshot_index_failed", "Не удалось сохранить индекс снимка: %s", e, path=path)
+    return index
+
+
+class _Merge:
+    # Запись нового data.json: неизменённые записи копируются из старого файла
+    # непрерывными кусками, остальные подставляются из памяти
+    def __init__(self, out, src, index: SnapshotIndex):
+        self.out = out
+        self.src = src
+        self.old = index
+        self.new = SnapshotIndex()
+        self.pos = 0
+
+    def put(self, data: bytes) -> None:
+        self.out.write(data)
+        self.pos += len(data)
+
+    def copy(self, start: int, end: int) -> None:
+        self.src.seek(start)
+        remaining = end - start
+        while remaining:
+            chunk = self.src.read(min(COPY_CHUNK, remaining))
+            if not chunk:
+                raise ValueError("Снимок изменился во время сохранения.")
+            self.put(chunk)
+            remaining -= len(chunk)
+
+    def items(self, items: List[dict]) -> List[Span]:
+        spans = []
+        for i, item in enumerate(items):
+            if i:
+                self.put(b",")
+            start = self.pos
+            self.put(_dumps(item))
+            spans.append((start, self.pos - start))
+        return spans
+
+    def section(self, old: dict, new: dict, changed: dict, removed: set) -> None:
+        first = True
+        run: List[tuple] = []
+
+        def flush() -> None:
+            nonlocal first, run
+            if not run:
+                return
+            if not first:
+                self.put(b",")
+            first = False
+            start = run[0][1]
+            base = self.pos
+            end = run[-1][1] + run[-1][2]
+            self.copy(start, end)
+            for key, off, n in run:
+                new[key] = (base + off - start, n)
+            run = []
+
+        for key, (off, n) in old.items():
+            if key in removed or key in changed:
+                flush()
+                if key in removed:
+                    continue
+                if not first:
+                    self.put(b",")
+                first = False
+                start = self.pos
+                self.put(_dumps(changed[key]))
+                new[key] = (start, self.pos - start)
+            else:
+                run.append((key, off, n))
+        flush()
+        # Записи, которых не было в старом снимке
+        for key, item in changed.items():
+            if key not in old and key not in removed:
+                if not first:
+                    self.put(b",")
+                first = False
+                start = self.pos
+                self.put(_dumps(item))
+                new[key] = (start, self.pos - start)
+
+    def write(self, state: dict) -> SnapshotIndex:
+        self.put(b'{"librarians":[')
+        self.new.sections["librarians"] = self.items(state["librarians"])
+        self.put(b'],"readers":[')
+        self.section(self.old.readers, self.new.readers, state["readers"], state["removed_readers"])
+        self.put(b'],"books":[')
+        self.section(self.old.books, self.new.books, state["books"], state["removed_books"])
+        self.put(b'],"rooms":[')
+        self.new.sections["rooms"] = self.items(state["rooms"])
+        self.put(b'],"clubs":[')
+        self.new.sections["clubs"] = self.items(state["clubs"])
+        self.put(b']}')
+        self.new.loans = _carry(self.new.books, self.old.loans, state["books"], _loan_due)
+        self.new.tickets = _carry(self.new.readers, self.old.tickets, state["readers"], _ticket_due)
+        self.new.texts = _carry(self.new.books, self.old.texts, state["books"], _book_text)
+        return self.new
+
+
+class LazyLibrary:
+    path: str
+    target: str
+    capacity: int
+    index: SnapshotIndex
+    saves: int
+
+    def __init__(self, path: str, capacity: int = CAPACITY, policy: str = LRU, target: Optional[str] = None):
+        # path — снимок, из которого читаются записи; target — куда пишется новый снимок.
+        # После первого сохранения записи читаются уже из target
+        self.path = path
+        self.target = target or path
+        self.capacity = capacity
+        self.saves = 0
+        self.index = SnapshotIndex()
+        self._file = None
+        self._lock = threading.RLock()
+        self._folded: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        # Загруженные объекты по ключу и кэш групп. Записать одну группу в data.json
+        # нельзя, поэтому изменённые группы не вытесняются до сохранения
+        self._books: Dict[str, Book] = {}
+        self._readers: Dict[Tuple[str, str], Reader] = {}
+        self.cache = ObjectCache(capacity, policy, on_evict=self._evict)
+        # Изменённые объекты: ключ -> (объект, номер изменения); удалённые ключи снимка
+        self._version = 0
+        self._dirty_books: Dict[str, Tuple[Book, int]] = {}
+        self._dirty_readers: Dict[Tuple[str, str], Tuple[Reader, int]] = {}
+        self._removed_books: Set[str] = set()
+        self._removed_readers: Set[Tuple[str, str]] = set()
+        # Участники клубов и книги клубов не выгружаются
+        self._pinned_books: Set[str] = set()
+        self._pinned_readers: Set[Tuple[str, str]] = set()
+
+    @property
+    def resident(self) -> int:
+        return len(self._books) + len(self._readers)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.cache.stats
+
+    # --- Открытие и закрытие ---
+
+    def open(self) -> None:
+        self.index = open_index(self.path)
+        self._folded = {}
+        for key in self.index.readers:
+            self._folded.setdefault(NameRegistry.fold(*key), key)
+        self._file = open(self.path, 'rb')
+        self.cache.clear()
+        librarian_registry.clear()
+        reader_registry.clear()
+        catalog.clear()
+        stores.rooms.clear()
+        stores.clubs.clear()
+        # Поиск по названию и автору охватывает весь снимок, а не только книги в памяти
+        search_index.fill(self.index.texts)
+        catalog.loader = self.book
+        reader_registry.loader = self.reader
+        stores.subscribe(self.on_event)
+        scheduler.source = self.due_dates
+        with self._lock:
+            self._load_small()
+
+    def close(self) -> None:
+        stores.unsubscribe(self.on_event)
+        scheduler.source = None
+        catalog.loader = None
+        reader_registry.loader = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def due_dates(self) -> list:
+        # Сроки для планировщика из индекса сохранённого снимка
+        index = self.index
+        return ([(date.fromisoformat(when), LOAN, isbn) for isbn, when in index.loans.items()]
+                + [(date.fromisoformat(when), TICKET, key) for key, when in index.tickets.items()])
+
+    def _read(self, span: Span) -> dict:
+        self._file.seek(span[0])
+        return json.loads(self._file.read(span[1]))
+
+    def _load_small(self) -> None:
+        for span in self.index.sections["librarians"]:
+            l = self._read(span)
+            librarian_registry.adopt(Librarian(l["last_name"], l["first_name"], l["phone"]))
+        for span in self.index.sections["rooms"]:
+            data = self._read(span)
+            room = Room(data["name"])
+            for booking in data.get("bookings", []):
+                key = self._split_name(booking["reader"])
+                seat = booking["seat_number"]
+                if key is not None and seat in room.seats:
+                    room.seats[seat][datetime.fromisoformat(booking["datetime"])] = ReaderRef(*key)
+            stores.rooms.append(room)
+        for span in self.index.sections["clubs"]:
+            data = self._read(span)
+            club = Club(data.get("name"))
+            for name in data.get("members", []):
+                member = self._reader_by_full_name(name)
+                if member is not None:
+                    club.members.append(member)
+                    member.in_club = True
+                    self._pinned_readers.add((member.first_name, member.last_name))
+                    self._touch(self._cluster(member))
+            club.meetings.extend(datetime.fromisoformat(dt) for dt in data.get("meetings", []))
+            isbn = data.get("current_book_isbn")
+            if isbn:
+                club.current_book = self._books.get(isbn) or self._load_book(isbn)
+                if club.current_book is not None:
+                    self._pinned_books.add(isbn)
+                    self._touch(self._cluster(club.current_book))
+            stores.clubs.append(club)
+
+    # --- Загрузка по требованию (catalog.loader и reader_registry.loader) ---
+
+    def book(self, isbn: str, resident: Optional[Book] = None) -> Optional[Book]:
+        with self._lock:
+            book = resident or self._books.get(isbn) or self._load_book(isbn)
+            if book is not None:
+                self._touch(self._cluster(book))
+            return book
+
+    def reader(self, first_name: str, last_name: str, casefold: bool = False,
+               resident: Optional[Reader] = None) -> Optional[Reader]:
+        with self._lock:
+            reader = resident
+            if reader is None:
+                if casefold:
+                    key = self._folded.get(NameRegistry.fold(first_name, last_name))
+                else:
+                    key = (first_name, last_name)
+                if key is None:
+                    return None
+                reader = self._readers.get(key) or self._load_reader(key)
+            if reader is not None:
+                self._touch(self._cluster(reader))
+            return reader
+
+    def _load_book(self, isbn: str, link: bool = True) -> Optional[Book]:
+        span = self.index.books.get(isbn)
+        if span is None or isbn in self._removed_books:
+            return None
+        data = self._read(span)
+        book = book_from_dict(data)
+        self._books[isbn] = book
+        catalog.adopt(book)
+        borrower = data.get("current_borrower")
+        if link and borrower and not book.is_available:
+            # Заёмщик загружается вместе со всеми своими книгами, в том числе этой
+            reader = self._reader_by_full_name(borrower)
+            if reader is not None and book.current_borrower is None:
+                book.current_borrower = reader
+                reader.borrowed_books.append(book)
+        return book
+
+    def _load_reader(self, key: Tuple[str, str]) -> Optional[Reader]:
+        span = self.index.readers.get(key)
+        if span is None or key in self._removed_readers:
+            return None
+        data = self._read(span)
+        reader = reader_from_dict(data, trusted=True)
+        self._readers[key] = reader
+        reader_registry.adopt(reader)
+        for isbn in data.get("borrowed_books_isbn", []):
+            book = self._books.get(isbn) or self._load_book(isbn, link=False)
+            if book is not None and not book.is_available and book.current_borrower is None:
+                book.current_borrower = reader
+                reader.borrowed_books.append(book)
+                # Книга теперь в группе читателя
+                self.cache.pop(("book", isbn))
+        return reader
+
+    def _split_name(self, name: str) -> Optional[Tuple[str, str]]:
+        # "Имя Фамилия" -> ключ известного читателя; имя или фамилия сами могут содержать пробел
+        i = name.find(" ")
+        while i != -1:
+            key = (name[:i], name[i + 1:])
+            if key in self._readers or key in self.index.readers:
+                return key
+            i = name.find(" ", i + 1)
+        return None
+
+    def _reader_by_full_name(self, name: str) -> Optional[Reader]:
+        key = self._split_name(name)
+        if key is None:
+            return None
+        return self._readers.get(key) or self._load_reader(key)
+
+    # --- Вытеснение ---
+
+    @staticmethod
+    def _cluster(obj) -> tuple:
+        if isinstance(obj, Book):
+            if obj.current_borrower is None:
+                return ("book", obj.isbn)
+            obj = obj.current_borrower
+        return ("reader", (obj.first_name, obj.last_name))
+
+    def _root(self, key: tuple):
+        kind, k = key
+        return self._books.get(k) if kind == "book" else self._readers.get(k)
+
+    def _flags(self, key: tuple) -> Tuple[bool, bool]:
+        # (изменена, закреплена) для группы: считается по её книгам и читателю
+        kind, k = key
+        if kind == "book":
+            return k in self._dirty_books, k in self._pinned_books
+        reader = self._readers.get(k)
+        books = reader.borrowed_books if reader is not None else ()
+        dirty = k in self._dirty_readers or any(b.isbn in self._dirty_books for b in books)
+        pinned = k in self._pinned_readers or any(b.isbn in self._pinned_books for b in books)
+        return dirty, pinned
+
+    def _touch(self, key: tuple) -> None:
+        # Обращение к группе: попадание, если она в кэше, иначе она только что загружена
+        if self.cache.get(key) is None:
+            dirty, pinned = self._flags(key)
+            self.cache.put(key, self._root(key), dirty=dirty, pinned=pinned)
+
+    def _refresh(self, key: tuple) -> None:
+        # Группа изменилась или сохранена — обновляем её отметки в кэше
+        dirty, pinned = self._flags(key)
+        if key not in self.cache:
+            self.cache.put(key, self._root(key), dirty=dirty, pinned=pinned)
+            return
+        if dirty:
+            self.cache.mark_dirty(key)
+        if pinned:
+            self.cache.pin(key)
+        else:
+            self.cache.unpin(key)
+        if not dirty:
+            self.cache.mark_clean(key)
+
+    def _evict(self, key: tuple, root) -> None:
+        kind, k = key
+        if kind == "book":
+            book = self._books.pop(k, None)
+            if book is not None:
+                catalog.evict(book)
+            return
+        reader = self._readers.pop(k, None)
+        if reader is None:
+            return
+        reader_registry.evict(reader)
+        for book in reader.borrowed_books:
+            if self._books.get(book.isbn) is book:
+                del self._books[book.isbn]
+                catalog.evict(book)
+
+    # --- Изменения ---
+
+    def _mark_book(self, book: Book) -> None:
+        self._version += 1
+        self._dirty_books[book.isbn] = (book, self._version)
+        if self._books.get(book.isbn) is not book:
+            # Вызывающий код держал уже вытесненный объект — возвращаем его в память
+            self._books[book.isbn] = book
+            catalog.adopt(book)
+        self._removed_books.discard(book.isbn)
+        if book.current_borrower is not None:
+            # Выданная книга входит в группу читателя
+            self.cache.pop(("book", book.isbn))
+        self._refresh(self._cluster(book))
+
+    def _mark_reader(self, reader: Reader) -> None:
+        key = (reader.first_name, reader.last_name)
+        self._version += 1
+        self._dirty_readers[key] = (reader, self._version)
+        if self._readers.get(key) is not reader:
+            self._readers[key] = reader
+            reader_registry.adopt(reader)
+        self._removed_readers.discard(key)
+        self._refresh(("reader", key))
+
+    def on_event(self, op: str, data: dict) -> None:
+        with self._lock:
+            if op in ("lend", "return"):
+                self._mark_book(data["book"])
+                self._mark_reader(data["reader"])
+            elif op in ("add_book", "update_book"):
+                self._mark_book(data["obj"])
+            elif op in ("add_reader", "update_reader"):
+                self._mark_reader(data["obj"])
+            elif op == "review":
+                self._mark_reader(data["reader"])
+            elif op in ("join_club", "leave_club"):
+                reader = data["reader"]
+                key = (reader.first_name, reader.last_name)
+                if op == "join_club":
+                    self._pinned_readers.add(key)
+                else:
+                    self._pinned_readers.discard(key)
+                self._mark_reader(reader)
+            elif op == "remove_book":
+                isbn = data["obj"].isbn
+                self._dirty_books.pop(isbn, None)
+                self._books.pop(isbn, None)
+                self.cache.pop(("book", isbn))
+                self._removed_books.add(isbn)
+            elif op == "remove_reader":
+                key = (data["obj"].first_name, data["obj"].last_name)
+                self._dirty_readers.pop(key, None)
+                self._readers.pop(key, None)
+                self.cache.pop(("reader", key))
+                self._removed_readers.add(key)
+
+    # --- Сохранение ---
+
+    def snapshot_jobs(self) -> list:
+        # Задания для Persister / write_snapshot вместо main.snapshot_jobs
+        return [self.prepare]
+
+    def prepare(self):
+        # Изменённые записи превращаются в словари сразу; копирование файла — в записи
+        with self._lock:
+            version = self._version
+            state = {
+                "books": {isbn: book_to_dict(b) for isbn, (b, _) in self._dirty_books.items()},
+                "readers": {key: reader_to_dict(r) for key, (r, _) in self._dirty_readers.items()},
+                "removed_books": set(self._removed_books),
+                "removed_readers": set(self._removed_readers),
+                "librarians": [librarian_to_dict(l) for l in librarian_registry],
+                "rooms": [room_to_dict(room) for room in stores.rooms],
+                "clubs": [club_to_dict(club) for club in stores.clubs],
+            }
+            index = self.index
+
+        def write() -> None:
+            box = {}
+            with open(self.path, 'rb') as src:
+                atomic_write(self.target, lambda out: box.setdefault("index", _Merge(out, src, index).write(state)), binary=True)
+            new_index = box["index"]
+            new_index.stamp(self.target)
+            try:
+                new_index.save(self.target)
+            except OSError as e:
+                log(WARNING, "snapshot_index_failed", "Не удалось сохранить индекс снимка: %s", e, path=self.target)
+            self._saved(new_index, version, state)
+
+        return write
+
+    def save(self) -> None:
+        self.prepare()()
+
+    def _saved(self, index: SnapshotIndex, version: int, state: dict) -> None:
+        # Записанные изменения больше не держат объекты в памяти
+        with self._lock:
+            self.index = index
+            self.path = self.target
+            old, self._file = self._file, open(self.path, 'rb')
+            if old is not None:
+                old.close()
+            self._removed_books -= state["removed_books"]
+            self._removed_readers -= state["removed_readers"]
+            saved = []
+            for dirty in (self._dirty_books, self._dirty_readers):
+                for key, (obj, v) in list(dirty.items()):
+                    if v <= version:
+                        del dirty[key]
+                        saved.append(obj)
+            for key in index.readers:
+                self._folded.setdefault(NameRegistry.fold(*key), key)
+            for obj in saved:
+                self._refresh(self._cluster(obj))
+            self.saves += 1
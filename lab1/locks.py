@@ -0,0 +1,57 @@
+# Блокировки для одновременной работы нескольких терминалов в одном процессе.
+# Общей блокировки нет: каждая книга, место в зале и клуб защищены своей
+# блокировкой из набора «полос» (lock striping) — объект по хешу ключа попадает
+# в одну из STRIPES блокировок, поэтому память не растёт с числом объектов, а
+# операции над разными книгами почти никогда не ждут друг друга
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+STRIPES = 256
+
+
+class LockStripes:
+    _locks: list
+
+    def __init__(self, stripes: int = STRIPES):
+        if not isinstance(stripes, int) or stripes < 1:
+            raise ValueError("stripes должен быть целым числом >= 1.")
+        # RLock: операция может вложенно взять ту же блокировку (библиотекарь -> читатель)
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def _index(self, key) -> int:
+        return hash(key) % len(self._locks)
+
+    def lock_for(self, key) -> threading.RLock:
+        return self._locks[self._index(key)]
+
+    @contextmanager
+    def hold(self, *keys) -> Iterator[None]:
+        # Несколько ключей берутся всегда в порядке номеров полос — без взаимных блокировок
+        locks = [self._locks[i] for i in sorted({self._index(k) for k in keys})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+
+book_locks = LockStripes()
+seat_locks = LockStripes()
+club_locks = LockStripes()
+
+
+def book_key(book) -> tuple:
+    # Книгу определяет ISBN: Book.save может прислать другой объект с тем же ISBN
+    return ("book", book.isbn)
+
+
+def seat_key(room, seat_num: int) -> tuple:
+    return ("seat", id(room), seat_num)
+
+
+def club_key(club) -> tuple:
+    return ("club", id(club))
@@ -0,0 +1,44 @@
+# Сообщения классов библиотеки (поиск, создание, изменение, удаление) идут через
+# logging, а не print. Текст собирается, только если уровень включён: аргументы
+# передаются отдельно и форматируются (вызов __str__) лишь при выводе, поэтому
+# выключенные сообщения в частых поисках почти ничего не стоят.
+# У каждого сообщения есть имя события и поля (isbn, читатель, зал...): их видят
+# обработчики logging, а в режиме structured запись выводится строкой JSON.
+# Уровни: поиск — DEBUG, создание/изменение/удаление — INFO, отказ — WARNING
+
+import json
+import logging
+import sys
+from logging import DEBUG, INFO, WARNING
+from typing import Optional, TextIO
+
+logger = logging.getLogger("library")
+# Пока configure() не вызван, сообщения никуда не выводятся
+logger.addHandler(logging.NullHandler())
+logger.propagate = False
+logger.setLevel(WARNING)
+
+_handler: Optional[logging.Handler] = None
+
+
+def log(level: int, event: str, message: str, *args, **fields) -> None:
+    if logger.isEnabledFor(level):
+        fields["event"] = event
+        logger.log(level, message, *args, extra={"fields": fields})
+
+
+class StructuredFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {"level": record.levelname, **getattr(record, "fields", {}), "message": record.getMessage()}
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def configure(level: int = INFO, stream: Optional[TextIO] = None, structured: bool = False) -> None:
+    # Вывод сообщений с уровня level; повторный вызов заменяет прежний обработчик
+    global _handler
+    if _handler is not None:
+        logger.removeHandler(_handler)
+    _handler = logging.StreamHandler(stream or sys.stdout)
+    _handler.setFormatter(StructuredFormatter() if structured else logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(level)
@@ -2,384 +2,497 @@ from classes import (
     Author, Location, Book, Reader, Librarian,
     School, Student, Room, Ticket, Review, Club
 )
-# Глобальные списки
-books: list[Book] = []
-readers: list[Reader] = []
-librarians: list[Librarian] = []
-rooms: list[Room] = []
-clubs: list[Club] = []
+import stores
+from stores import catalog, reader_registry, librarian_registry
+
+# Глобальные списки (данными владеют хранилища, списки доступны для чтения)
+books: list[Book] = catalog.books
+readers: list[Reader] = reader_registry.items
+librarians: list[Librarian] = librarian_registry.items
+rooms: list[Room] = stores.rooms
+clubs: list[Club] = stores.clubs
 
 import json
+import os
 import xml.etree.ElementTree as ET
-from datetime import datetime
+from datetime import datetime, date
 from exceptions import (
-    BookNotAvailableError
+    BookNotAvailableError, DuplicateBookError
+)
+from streaming import iter_json_items, iter_xml_items
+from search import search_books
+from scheduler import scheduler, LOAN
+from records import (
+    reader_from_dict, reader_to_dict, book_from_dict, book_to_dict,
+    librarian_to_dict, room_to_dict, club_to_dict
 )
+from journal import Journal
+from persister import Persister, write_snapshot
+import logs
+import metrics
+from snapshot import atomic_write, STAGED_SUFFIX, promote_staged, discard_staged
+import binsnap
+from backends import SQLiteBackend, CachedSQLiteBackend
+from lazy import LazyLibrary, INDEX_SUFFIX
 
 
 # Файлы находятся в той же папке
 JSON_FILE = "data.json"
 XML_FILE = "data.xml"
+BIN_FILE = "data.bin"
+DB_FILE = "library.db"
+JOURNAL_FILE = "journal.log"
 
 
 def find_book_by_isbn(isbn: str) -> Book | None:
-    return next((b for b in books if b.isbn == isbn), None)
+    return catalog.get(isbn)
 
 
-def find_reader_by_name(first: str, last: str) -> Reader | None:
-    return next((r for r in readers if r.first_name == first and r.last_name == last), None)
+def find_books_by_author(first: str, last: str) -> list[Book]:
+    return catalog.by_author(first, last)
 
 
-# Загрузка из JSON
+def find_books_by_location(rack: str, shelf: str | None = None) -> list[Book]:
+    return catalog.by_location(rack, shelf)
 
-def load_from_json():
-    global books, readers, librarians, rooms, clubs
 
-    with open(JSON_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def find_available_books() -> list[Book]:
+    return catalog.by_availability(True)
 
-    # Библиотекари
-    librarians = [
-        Librarian(l["last_name"], l["first_name"], l["phone"])
-        for l in data["librarians"]
-    ]
 
-    # Читатели
-    readers = []
-    reader_map = {}
-    for r in data["readers"]:
-        reader_type = r["reader_type"]
-        if reader_type == "school":
-            reader = School(
-                r["first_name"], r["last_name"], r["phone"], r["email"],
-                r["school_name"], r["grade"]
-            )
-        elif reader_type == "student":
-            reader = Student(
-                r["first_name"], r["last_name"], r["phone"], r["email"],
-                r["university"], r["course"]
-            )
+def find_checked_out_books() -> list[Book]:
+    return catalog.by_availability(False)
+
+
+def find_books(
+    author: tuple[str, str] | None = None,
+    rack: str | None = None,
+    shelf: str | None = None,
+    available: bool | None = None
+) -> list[Book]:
+    return catalog.find(author, rack, shelf, available)
+
+
+def find_reader_by_name(first: str, last: str, casefold: bool = False) -> Reader | None:
+    return reader_registry.get(first, last, casefold)
+
+
+# Загрузка из JSON
+
+# Отложенные связи: ссылки на читателей и книги, которые ещё не встретились в потоке
+class _FixUps:
+    def __init__(self):
+        self.reader_map: dict[str, Reader] = {}
+        self.pending_readers: dict[str, list] = {}
+        self.pending_books: dict[str, list] = {}
+
+    def on_reader(self, full_name: str, action) -> None:
+        reader = self.reader_map.get(full_name)
+        if reader:
+            action(reader)
         else:
-            reader = Reader(r["first_name"], r["last_name"], r["phone"], r["email"], reader_type)
-
-        reader.education_place = r.get("education_place", "")
-        reader.in_club = r.get("in_club", False)
-
-        ticket_data = r["ticket"]  
-        ticket = Ticket(reader)
-        ticket.ticket_id = ticket_data["ticket_id"]
-        ticket.issue_date = datetime.fromisoformat(ticket_data["issue_date"]).date()
-        ticket.expiry_date = datetime.fromisoformat(ticket_data["expiry_date"]).date()
-        reader.ticket = ticket
-
-        rev = r.get("review")
-        if rev:
-            review = Review(rev["text"], rev["rating"], reader)
-            review.date = datetime.fromisoformat(rev["date"])
-            reader.review = review
+            self.pending_readers.setdefault(full_name, []).append(action)
 
-        full_name = f"{r['first_name']} {r['last_name']}"
-        reader_map[full_name] = reader
-        readers.append(reader)
+    def on_book(self, isbn: str, action) -> None:
+        book = catalog.get(isbn)
+        if book:
+            action(book)
+        else:
+            self.pending_books.setdefault(isbn, []).append(action)
+
+    def reader_added(self, full_name: str, reader: Reader) -> None:
+        self.reader_map[full_name] = reader
+        for action in self.pending_readers.pop(full_name, ()):
+            action(reader)
+
+    def book_added(self, book: Book) -> None:
+        for action in self.pending_books.pop(book.isbn, ()):
+            action(book)
+
+
+def _full_name(value) -> str | None:
+    # Сейчас имя пишется строкой "Имя Фамилия"; старые файлы хранили объект
+    if isinstance(value, dict):
+        return f"{value['first_name']} {value['last_name']}"
+    return value or None
+
+
+def load_from_json():
+    # Разделы файла разбираются потоково, по одному элементу за раз
+    librarian_registry.clear()
+    reader_registry.clear()
+    catalog.clear()
+    rooms.clear()
+    clubs.clear()
+    fixups = _FixUps()
+
+    def add_librarian(l: dict) -> None:
+        librarian_registry.add(Librarian(l["last_name"], l["first_name"], l["phone"]))
+
+    def add_reader(r: dict) -> None:
+        reader = reader_from_dict(r, trusted=True)
+        reader_registry.add(reader)
+        fixups.reader_added(f"{r['first_name']} {r['last_name']}", reader)
 
     # Книги + восстановление заёмщиков
-    author_cache = {}
-    books = []
-    for b in data["books"]:
-        key = (b["author"]["first_name"], b["author"]["last_name"])
-        if key not in author_cache:
-            author_cache[key] = Author(
-                b["author"]["first_name"],
-                b["author"]["last_name"],
-                b["author"].get("bio", "")
-            )
-        author = author_cache[key]
-        location = Location(b["location"]["rack"], b["location"]["shelf"])
-        book = Book(b["title"], author, b["isbn"], location)
-        book.is_available = b["is_available"]
-
-        borrower_data = b.get("current_borrower_name")
-        if borrower_data and not book.is_available:
-            borrower_full_name = f"{borrower_data['first_name']} {borrower_data['last_name']}"
-            borrower = reader_map.get(borrower_full_name)
-            if borrower:
+    def add_book(b: dict) -> None:
+        book = book_from_dict(b)
+
+        borrower_name = _full_name(b.get("current_borrower") or b.get("current_borrower_name"))
+        if borrower_name and not book.is_available:
+            def set_borrower(borrower: Reader) -> None:
                 book.current_borrower = borrower
                 borrower.borrowed_books.append(book)
+            fixups.on_reader(borrower_name, set_borrower)
 
-        books.append(book)
+        catalog.add(book)
+        fixups.book_added(book)
 
     # Читальные залы
-    rooms = []
-    for room_data in data["rooms"]:
+    def add_room(room_data: dict) -> None:
         room = Room(room_data["name"])
         for booking in room_data.get("bookings", []):
             try:
                 dt = datetime.fromisoformat(booking["datetime"])
                 seat_num = booking["seat_number"]
-                # Обработка reader_name как объекта
-                rn = booking.get("reader_name")
+                if seat_num not in room.seats:
+                    raise KeyError(seat_num)
+                rn = _full_name(booking.get("reader") or booking.get("reader_name"))
                 if rn:
-                    reader_full_name = f"{rn['first_name']} {rn['last_name']}"
-                    reader = reader_map.get(reader_full_name)
-                    if reader:
+                    def book_seat(reader: Reader, seat_num=seat_num, dt=dt) -> None:
                         room.seats[seat_num][dt] = reader
+                    fixups.on_reader(rn, book_seat)
             except (KeyError, ValueError) as e:
-                print(f"Пропущено бронирование: {booking}")
+                logs.log(logs.WARNING, "booking_skipped", "Пропущено бронирование: %s", booking,
+                         room=room.name, error=type(e).__name__)
                 continue
         rooms.append(room)
 
     # Клубы
-    clubs = []
-    for club_data in data["clubs"]:
-        club = Club()
-        # Обработка members_names как одного участника (объект)
-        member_data = club_data.get("members_names")
-        if member_data:
-            member_name = f"{member_data['first_name']} {member_data['last_name']}"
-            member = reader_map.get(member_name)
-            if member:
-                club.members.append(member)
-                member.in_club = True
+    def add_club(club_data: dict) -> None:
+        club = Club(club_data.get("name"))
+        # Старые файлы хранили одного участника объектом в members_names
+        member_names = club_data.get("members")
+        if member_names is None:
+            member_names = [club_data["members_names"]] if club_data.get("members_names") else []
+
+        def add_member(member: Reader) -> None:
+            club.members.append(member)
+            member.in_club = True
+        for name in member_names:
+            fixups.on_reader(_full_name(name), add_member)
 
         for dt_str in club_data.get("meetings", []):
             club.meetings.append(datetime.fromisoformat(dt_str))
-        
+
         isbn = club_data.get("current_book_isbn")
         if isbn:
-            book = find_book_by_isbn(isbn)
-            if book:
+            def set_book(book: Book) -> None:
                 club.current_book = book
+            fixups.on_book(isbn, set_book)
         clubs.append(club)
 
-def load_from_xml():
-    global books, readers, librarians, rooms, clubs
+    handlers = {
+        "librarians": add_librarian,
+        "readers": add_reader,
+        "books": add_book,
+        "rooms": add_room,
+        "clubs": add_club,
+    }
+    with open(JSON_FILE, 'r', encoding='utf-8') as f:
+        for section, item in iter_json_items(f):
+            handlers[section](item)
+
+def _librarian_from_xml(lib) -> Librarian:
+    first = lib.find("FirstName").text
+    last = lib.find("LastName").text
+    phone = lib.find("Phone").text
+    return Librarian(last, first, phone)
+
+
+def _reader_from_xml(reader_el, trusted: bool = True) -> Reader:
+    r_type = reader_el.get("ReaderType", "regular")
+    first = reader_el.find("FirstName").text
+    last = reader_el.find("LastName").text
+    phone = reader_el.find("Phone").text
+    email = reader_el.find("Email").text
+
+    ticket_el = reader_el.find("Ticket")
+    record = {
+        "first_name": first, "last_name": last, "phone": phone, "email": email, "reader_type": r_type,
+        "ticket": {
+            "ticket_id": ticket_el.find("TicketId").text,
+            "issue_date": ticket_el.find("IssueDate").text,
+            "expiry_date": ticket_el.find("ExpiryDate").text
+        }
+    }
+    if r_type == "school":
+        record["school_name"] = reader_el.find("SchoolName").text
+        record["grade"] = reader_el.find("Grade").text
+    elif r_type == "student":
+        record["university"] = reader_el.find("University").text
+        record["course"] = int(reader_el.find("Course").text)
+    reader = Reader.from_records([record], trusted=trusted)[0]
+
+    reader.education_place = reader_el.find("EducationPlace").text
+    reader.in_club = reader_el.find("InClub").text.lower() == "true"
+
+    # Отзыв
+    review_el = reader_el.find("Review")
+    if review_el is not None and review_el.find("Text") is not None:
+        text = review_el.find("Text").text or ""
+        rating = int(review_el.find("Rating").text)
+        date_str = review_el.find("Date").text
+        if text and rating and date_str:
+            review = Review(text, rating, reader)
+            review.date = datetime.fromisoformat(date_str)
+            reader.review = review
+    return reader
+
+
+def _book_from_xml(book_el) -> tuple[Book, str | None]:
+    # Возвращает книгу и имя заёмщика (связывание делает вызывающий код)
+    title = book_el.find("Title").text
+    author_el = book_el.find("Author")
+    author = Author.get_or_create(
+        author_el.find("FirstName").text,
+        author_el.find("LastName").text,
+        author_el.find("Bio").text or ""
+    )
+
+    isbn = book_el.find("ISBN").text
+    loc_el = book_el.find("Location")
+    location = Location.get_or_create(loc_el.find("Rack").text, loc_el.find("Shelf").text)
+    is_avail = book_el.find("IsAvailable").text.lower() == "true"
+
+    book = Book(title, author, isbn, location)
+    book.is_available = is_avail
+    due_el = book_el.find("DueDate")
+    if due_el is not None and due_el.text:
+        book.due_date = date.fromisoformat(due_el.text)
+
+    curr_borrower_el = book_el.find("CurrentBorrower")
+    if curr_borrower_el is not None and curr_borrower_el.text:
+        return book, curr_borrower_el.text
+    return book, None
+
+
+def _room_from_xml(room_el) -> tuple[Room, list]:
+    # Возвращает зал и бронирования вида (место, время, имя читателя)
+    name = room_el.find("Name").text
+    room = Room(name)
+    bookings = []
+    bookings_el = room_el.find("Bookings")
+    if bookings_el is not None:
+        for booking in bookings_el:
+            seat_num = int(booking.find("SeatNumber").text)
+            # save_to_xml пишет DateTime; Datetime — написание старых файлов
+            dt_el = booking.find("DateTime")
+            if dt_el is None:
+                dt_el = booking.find("Datetime")
+            dt = datetime.fromisoformat(dt_el.text)
+            bookings.append((seat_num, dt, booking.find("Reader").text))
+    return room, bookings
+
+
+def _club_from_xml(club_el) -> tuple[Club, list, str | None]:
+    # Возвращает клуб, имена участников и ISBN текущей книги
+    name_el = club_el.find("Name")
+    club = Club(name_el.text if name_el is not None else None)
+    member_names = []
+    members_el = club_el.find("Members")
+    if members_el is not None:
+        for member_el in members_el:
+            member_names.append(member_el.text)
+
+    meetings_el = club_el.find("Meetings")
+    if meetings_el is not None:
+        for meeting_el in meetings_el:
+            dt = datetime.fromisoformat(meeting_el.text)
+            club.meetings.append(dt)
+
+    isbn_el = club_el.find("CurrentBookIsbn")
+    isbn = isbn_el.text if isbn_el is not None and isbn_el.text else None
+    return club, member_names, isbn
+
+
+def _set_borrower(book: Book, borrower: Reader) -> None:
+    book.current_borrower = borrower
+    borrower.borrowed_books.append(book)
+
+
+def _add_member(club: Club, member: Reader) -> None:
+    club.members.append(member)
+    member.in_club = True
 
+
+def load_from_xml():
     tree = ET.parse(XML_FILE)
     root = tree.getroot()
 
     # Библиотекари
-    librarians = []
+    librarian_registry.clear()
     for lib in root.find("Librarians"):
-        first = lib.find("FirstName").text
-        last = lib.find("LastName").text
-        phone = lib.find("Phone").text
-        librarians.append(Librarian(last, first, phone))
+        librarian_registry.add(_librarian_from_xml(lib))
 
     # Собираем авторов и книги
-    author_cache = {}
-    books = []
+    catalog.clear()
     reader_map = {}
 
     # Сначала читаем всех читателей, чтобы потом связать книги
-    readers = []
+    reader_registry.clear()
     for reader_el in root.find("Readers"):
-        r_type = reader_el.get("ReaderType", "regular")
-        first = reader_el.find("FirstName").text
-        last = reader_el.find("LastName").text
-        phone = reader_el.find("Phone").text
-        email = reader_el.find("Email").text
-
-        if r_type == "school":
-            school_name = reader_el.find("SchoolName").text
-            grade = reader_el.find("Grade").text
-            reader = School(first, last, phone, email, school_name, grade)
-        elif r_type == "student":
-            university = reader_el.find("University").text
-            course = int(reader_el.find("Course").text)
-            reader = Student(first, last, phone, email, university, course)
-        else:
-            reader = Reader(first, last, phone, email, r_type)
-
-        reader.education_place = reader_el.find("EducationPlace").text
-        reader.in_club = reader_el.find("InClub").text.lower() == "true"
-
-        # Билет
-        ticket_el = reader_el.find("Ticket")
-        ticket = Ticket(reader)
-        ticket.ticket_id = ticket_el.find("TicketId").text
-        ticket.issue_date = datetime.fromisoformat(ticket_el.find("IssueDate").text).date()
-        ticket.expiry_date = datetime.fromisoformat(ticket_el.find("ExpiryDate").text).date()
-        reader.ticket = ticket
-
-        # Отзыв
-        review_el = reader_el.find("Review")
-        if review_el is not None and review_el.find("Text") is not None:
-            text = review_el.find("Text").text or ""
-            rating = int(review_el.find("Rating").text)
-            date_str = review_el.find("Date").text
-            if text and rating and date_str:
-                review = Review(text, rating, reader)
-                review.date = datetime.fromisoformat(date_str)
-                reader.review = review
-
-        full_name = f"{first} {last}"
+        reader = _reader_from_xml(reader_el)
+        full_name = f"{reader_el.find('FirstName').text} {reader_el.find('LastName').text}"
         reader_map[full_name] = reader
-        readers.append(reader)
+        reader_registry.add(reader)
 
     # Теперь книги
     for book_el in root.find("Books"):
-        title = book_el.find("Title").text
-        author_el = book_el.find("Author")
-        author_key = (author_el.find("FirstName").text, author_el.find("LastName").text)
-        if author_key not in author_cache:
-            bio = author_el.find("Bio").text or ""
-            author_cache[author_key] = Author(*author_key, bio)
-        author = author_cache[author_key]
-
-        isbn = book_el.find("ISBN").text
-        loc_el = book_el.find("Location")
-        location = Location(loc_el.find("Rack").text, loc_el.find("Shelf").text)
-        is_avail = book_el.find("IsAvailable").text.lower() == "true"
-
-        book = Book(title, author, isbn, location)
-        book.is_available = is_avail
-
-        curr_borrower_el = book_el.find("CurrentBorrower")
-        if curr_borrower_el is not None and curr_borrower_el.text:
-            borrower_name = curr_borrower_el.text
+        book, borrower_name = _book_from_xml(book_el)
+        if borrower_name:
             borrower = reader_map.get(borrower_name)
             if borrower:
-                book.current_borrower = borrower
-                borrower.borrowed_books.append(book)
-
-        books.append(book)
+                _set_borrower(book, borrower)
+        catalog.add(book)
 
     # Читальные залы
-    rooms = []
+    rooms.clear()
     for room_el in root.find("Rooms"):
-        name = room_el.find("Name").text
-        room = Room(name)
-        bookings_el = room_el.find("Bookings")
-        if bookings_el is not None:
-            for booking in bookings_el:
-                seat_num = int(booking.find("SeatNumber").text)
-                dt = datetime.fromisoformat(booking.find("Datetime").text)
-                reader_name = booking.find("Reader").text
-                reader = reader_map.get(reader_name)
-                if reader:
-                    room.seats[seat_num][dt] = reader
+        room, bookings = _room_from_xml(room_el)
+        for seat_num, dt, reader_name in bookings:
+            reader = reader_map.get(reader_name)
+            if reader:
+                room.seats[seat_num][dt] = reader
         rooms.append(room)
 
     # Клубы
-    clubs = []
+    clubs.clear()
     for club_el in root.find("Clubs"):
-        club = Club()
-        members_el = club_el.find("Members")
-        if members_el is not None:
-            for member_el in members_el:
-                name = member_el.text
-                member = reader_map.get(name)
-                if member:
-                    club.members.append(member)
-                    member.in_club = True
-
-        meetings_el = club_el.find("Meetings")
-        if meetings_el is not None:
-            for meeting_el in meetings_el:
-                dt = datetime.fromisoformat(meeting_el.text)
-                club.meetings.append(dt)
-
-        isbn_el = club_el.find("CurrentBookIsbn")
-        if isbn_el is not None and isbn_el.text:
-            book = find_book_by_isbn(isbn_el.text)
+        club, member_names, isbn = _club_from_xml(club_el)
+        for name in member_names:
+            member = reader_map.get(name)
+            if member:
+                _add_member(club, member)
+        if isbn:
+            book = find_book_by_isbn(isbn)
             if book:
                 club.current_book = book
-
         clubs.append(club)
 
+
+def load_from_xml_incremental(source=None):
+    # Вариант load_from_xml на iterparse: каждый элемент превращается в объект
+    # сразу после закрытия тега и удаляется из дерева, память не растёт с файлом
+    librarian_registry.clear()
+    reader_registry.clear()
+    catalog.clear()
+    rooms.clear()
+    clubs.clear()
+    fixups = _FixUps()
+
+    for section, el in iter_xml_items(source or XML_FILE):
+        if section == "Librarians":
+            librarian_registry.add(_librarian_from_xml(el))
+
+        elif section == "Readers":
+            reader = _reader_from_xml(el)
+            reader_registry.add(reader)
+            fixups.reader_added(f"{el.find('FirstName').text} {el.find('LastName').text}", reader)
+
+        elif section == "Books":
+            book, borrower_name = _book_from_xml(el)
+            if borrower_name:
+                fixups.on_reader(borrower_name, lambda r, book=book: _set_borrower(book, r))
+            catalog.add(book)
+            fixups.book_added(book)
+
+        elif section == "Rooms":
+            room, bookings = _room_from_xml(el)
+            for seat_num, dt, reader_name in bookings:
+                def book_seat(reader: Reader, room=room, seat_num=seat_num, dt=dt) -> None:
+                    room.seats[seat_num][dt] = reader
+                fixups.on_reader(reader_name, book_seat)
+            rooms.append(room)
+
+        elif section == "Clubs":
+            club, member_names, isbn = _club_from_xml(el)
+            for name in member_names:
+                fixups.on_reader(name, lambda r, club=club: _add_member(club, r))
+            if isbn:
+                def set_book(book: Book, club=club) -> None:
+                    club.current_book = book
+                fixups.on_book(isbn, set_book)
+            clubs.append(club)
+
 # Сохранение в JSON и XML
 
-def save_data():
-    save_to_json()
-    save_to_xml()
+def save_data(pretty: bool = False):
+    # JSON и XML пишутся параллельно; состояние снимается заранее, до записи файлов
+    write_snapshot(snapshot_jobs(pretty))
 
 
-def save_to_json():
-    data = {
-        "librarians": [
-            {"first_name": l.first_name, "last_name": l.last_name, "phone": l.phone}
-            for l in librarians
-        ],
-        "readers": [],
-        "books": [],
-        "rooms": [],
-        "clubs": []
-    }
+def snapshot_jobs(pretty: bool = False, suffix: str = "") -> list:
+    # suffix=STAGED_SUFFIX — запись в подготовленные файлы рядом со снимками
+    jobs = [lambda: prepare_json(pretty, JSON_FILE + suffix), lambda: prepare_xml(pretty, XML_FILE + suffix)]
+    # Бинарный снимок обновляется, только если им уже пользуются
+    if os.path.exists(BIN_FILE):
+        jobs.append(lambda: binsnap.prepare_binary(BIN_FILE + suffix))
+    return jobs
 
-    for r in readers:
-        rd = {
-            "first_name": r.first_name,
-            "last_name": r.last_name,
-            "phone": r.phone,
-            "email": r.email,
-            "reader_type": r.reader_type,
-            "education_place": r.education_place,
-            "in_club": r.in_club,
-            "borrowed_books_isbn": [b.isbn for b in r.borrowed_books],
-            "ticket": {
-                "ticket_id": r.ticket.ticket_id,
-                "issue_date": r.ticket.issue_date.isoformat(),
-                "expiry_date": r.ticket.expiry_date.isoformat()
-            }
-        }
-        if r.reader_type == "school":
-            rd["school_name"] = r.school_name
-            rd["grade"] = r.grade
-        elif r.reader_type == "student":
-            rd["university"] = r.university
-            rd["course"] = r.course
 
-        if r.review:
-            rd["review"] = {
-                "text": r.review.text,
-                "rating": r.review.rating,
-                "date": r.review.date.isoformat()
-            }
-        else:
-            rd["review"] = None
+def staged_jobs() -> list:
+    return snapshot_jobs(suffix=STAGED_SUFFIX)
 
-        data["readers"].append(rd)
 
-    for b in books:
-        data["books"].append({
-            "title": b.title,
-            "author": {
-                "first_name": b.author.first_name,
-                "last_name": b.author.last_name,
-                "bio": b.author.bio
-            },
-            "isbn": b.isbn,
-            "location": {"rack": b.location.rack, "shelf": b.location.shelf},
-            "is_available": b.is_available,
-            "current_borrower": (
-                f"{b.current_borrower.first_name} {b.current_borrower.last_name}"
-                if b.current_borrower else None
-            )
-        })
+def staged_files() -> list:
+    # (подготовленный файл, файл снимка); индекс ленивого режима лежит рядом со своим data.json
+    json_staged = JSON_FILE + STAGED_SUFFIX
+    return [
+        (json_staged, JSON_FILE),
+        (json_staged + INDEX_SUFFIX, JSON_FILE + INDEX_SUFFIX),
+        (XML_FILE + STAGED_SUFFIX, XML_FILE),
+        (BIN_FILE + STAGED_SUFFIX, BIN_FILE),
+    ]
 
-    for room in rooms:
-        bookings = []
-        for seat_num, times in room.seats.items():
-            for dt, reader in times.items():
-                bookings.append({
-                    "seat_number": seat_num,
-                    "datetime": dt.isoformat(),
-                    "reader": f"{reader.first_name} {reader.last_name}"
-                })
-        data["rooms"].append({"name": room.name, "bookings": bookings})
 
-    for club in clubs:
-        data["clubs"].append({
-            "members": [f"{m.first_name} {m.last_name}" for m in club.members],
-            "meetings": [dt.isoformat() for dt in club.meetings],
-            "current_book_isbn": club.current_book.isbn if club.current_book else None
-        })
+def load_from_binary():
+    binsnap.load_binary(BIN_FILE)
+
+
+def save_to_binary():
+    binsnap.save_binary(BIN_FILE)
+
 
-    with open(JSON_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def save_to_json(pretty: bool = False):
+    prepare_json(pretty)()
 
 
-def save_to_xml():
+def prepare_json(pretty: bool = False, path: str | None = None):
+    # Сбор данных в памяти; возвращает функцию, которая запишет файл
+    data = {
+        "librarians": [librarian_to_dict(l) for l in librarians],
+        "readers": [reader_to_dict(r) for r in readers],
+        "books": [book_to_dict(b) for b in books],
+        "rooms": [room_to_dict(room) for room in rooms],
+        "clubs": [club_to_dict(club) for club in clubs]
+    }
+
+    # Компактная запись по умолчанию, с отступами — по запросу
+    if pretty:
+        write = lambda f: json.dump(data, f, ensure_ascii=False, indent=2)
+    else:
+        write = lambda f: json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    path = path or JSON_FILE
+    return lambda: atomic_write(path, write)
+
+
+def save_to_xml(pretty: bool = False):
+    prepare_xml(pretty)()
+
+
+def prepare_xml(pretty: bool = False, path: str | None = None):
+    # Дерево собирается сразу, а отступы и запись выполняет возвращённая функция
     root = ET.Element("Library")
 
     # Librarians
@@ -406,6 +519,8 @@ def save_to_xml():
         ET.SubElement(book, "IsAvailable").text = str(b.is_available)
         if b.current_borrower:
             ET.SubElement(book, "CurrentBorrower").text = f"{b.current_borrower.first_name} {b.current_borrower.last_name}"
+        if b.due_date:
+            ET.SubElement(book, "DueDate").text = b.due_date.isoformat()
 
     # Readers
     readers_el = ET.SubElement(root, "Readers")
@@ -457,6 +572,7 @@ def save_to_xml():
     clubs_el = ET.SubElement(root, "Clubs")
     for club in clubs:
         c = ET.SubElement(clubs_el, "Club")
+        ET.SubElement(c, "Name").text = club.key()
         members = ET.SubElement(c, "Members")
         for m in club.members:
             ET.SubElement(members, "Member").text = f"{m.first_name} {m.last_name}"
@@ -467,8 +583,28 @@ def save_to_xml():
             ET.SubElement(c, "CurrentBookISBN").text = club.current_book.isbn
 
     tree = ET.ElementTree(root)
-    ET.indent(tree, space="  ", level=0)
-    tree.write(XML_FILE, encoding="utf-8", xml_declaration=True)
+    path = path or XML_FILE
+
+    def write() -> None:
+        if pretty:
+            ET.indent(tree, space="  ", level=0)
+        atomic_write(path, lambda f: tree.write(f, encoding="utf-8", xml_declaration=True), binary=True)
+
+    return write
+
+# Напоминания: книги с истёкшим сроком возврата и просроченные билеты.
+# Берутся из планировщика, а не перебором всех читателей
+def send_reminders(today: date | None = None) -> list:
+    due = scheduler.pop_due(today or date.today())
+    for item in due:
+        if item.kind == LOAN:
+            borrower = item.obj.current_borrower
+            who = f"читатель {borrower.first_name} {borrower.last_name}" if borrower else "читатель неизвестен"
+            print(f"Напоминание: срок возврата книги '{item.obj.title}' истёк {item.when} ({who}).")
+        else:
+            print(f"Напоминание: билет читателя {item.obj.first_name} {item.obj.last_name} "
+                  f"истёк {item.when}.")
+    return due
 
 # Рабочая область (мб меню)?
 
@@ -481,6 +617,7 @@ def reader_menu(reader: Reader):
         print("4. Забронировать место в читальном зале")
         print("5. Читательский клуб")
         print("6. Изменить данные профиля")
+        print("7. Найти книгу")
         print("0. Выйти")
         choice = input("Выберите действие: ").strip()
 
@@ -560,6 +697,14 @@ def reader_menu(reader: Reader):
         elif choice == "6":
             print("Место учёбы/работы (только библиотекарь может изменить):", reader.education_place)
 
+        elif choice == "7":
+            query = input("Название или автор: ").strip()
+            found = search_books(query)
+            if not found:
+                print("Ничего не найдено.")
+            for b in found:
+                print(f"{b.isbn}: {b}")
+
         elif choice == "0":
             break
 
@@ -576,6 +721,7 @@ def librarian_menu(librarian: Librarian):
         print("7. Удалить книгу")
         print("8. Зарегистрировать нового читателя")
         print("9. Удалить читателя")
+        print("10. Напоминания о просрочках")
         print("0. Выйти")
         choice = input("Выберите действие: ").strip()
 
@@ -632,14 +778,13 @@ def librarian_menu(librarian: Librarian):
                 rack = input("Стеллаж: ").strip()
                 shelf = input("Полка: ").strip()
 
-                if find_book_by_isbn(isbn):
-                    print("Книга с таким ISBN уже существует!")
-                else:
-                    author = Author(author_first, author_last)
-                    location = Location(rack, shelf)
-                    new_book = Book(title, author, isbn, location)
-                    books.append(new_book)
-                    print("Книга успешно добавлена!")
+                author = Author.get_or_create(author_first, author_last)
+                location = Location.get_or_create(rack, shelf)
+                new_book = Book(title, author, isbn, location)
+                catalog.add(new_book)
+                print("Книга успешно добавлена!")
+            except DuplicateBookError:
+                print("Книга с таким ISBN уже существует!")
             except (ValueError, TypeError) as e:
                 print(f"Ошибка при добавлении книги: {e}")
 
@@ -650,7 +795,7 @@ def librarian_menu(librarian: Librarian):
                 print(f"Текущее местоположение: {book.location}")
                 rack = input("Новый стеллаж: ").strip()
                 shelf = input("Новая полка: ").strip()
-                book.location = Location(rack, shelf)
+                book.update_location(Location.get_or_create(rack, shelf))
                 print("Местоположение обновлено.")
             else:
                 print("Книга не найдена.")
@@ -660,7 +805,7 @@ def librarian_menu(librarian: Librarian):
             book = find_book_by_isbn(isbn)
             if book:
                 if book.is_available:
-                    books.remove(book)
+                    catalog.remove(book)
                     print("Книга удалена из каталога.")
                 else:
                     print("Нельзя удалить: книга сейчас выдана читателю.")
@@ -693,7 +838,7 @@ def librarian_menu(librarian: Librarian):
                     print("Неверный тип.")
                     continue
 
-                readers.append(new_reader)
+                reader_registry.add(new_reader)
                 print(f"Читатель {new_reader} успешно зарегистрирован!")
 
             except (ValueError, TypeError) as e:
@@ -705,23 +850,43 @@ def librarian_menu(librarian: Librarian):
             reader = find_reader_by_name(first, last)
             if reader:
                 if len(reader.borrowed_books) == 0:
-                    readers.remove(reader)
+                    reader_registry.remove(reader)
                     print("Читатель удалён из системы.")
                 else:
                     print("Нельзя удалить: читатель не вернул все книги.")
             else:
                 print("Читатель не найден.")
 
+        elif choice == "10":
+            if not send_reminders():
+                print("Просрочек нет.")
+
         elif choice == "0":
             break
 
 # Запуск программы
 
 def main():
+    # В меню сообщения о создании, изменении и удалении видны, сообщения поиска — нет
+    logs.configure(logs.INFO)
+    # Метрики включаются только по запросу: LIBRARY_METRICS=metrics.prom python main.py
+    exporter = None
+    if os.environ.get("LIBRARY_METRICS"):
+        exporter = metrics.enable(os.environ["LIBRARY_METRICS"])
     print("Выберите формат для загрузки данных:")
     print("1. JSON (data.json)")
     print("2. XML (data.xml)")
-    choice = input("Ваш выбор (1 или 2): ").strip()
+    print("3. Бинарный снимок (data.bin)")
+    print("4. База данных SQLite (library.db)")
+    print("5. JSON с загрузкой по требованию (для больших data.json)")
+    print("6. База данных SQLite с загрузкой по требованию (для больших library.db)")
+    choice = input("Ваш выбор (1-6): ").strip()
+
+    backend = None
+    library = None
+    # Снимки, подготовленные до сбоя, уже содержат операции, отброшенные из журнала
+    if choice not in ("4", "6") and promote_staged(staged_files()):
+        print("Восстановлены снимки, сохранённые до сбоя.")
 
     if choice == "1":
         try:
@@ -733,10 +898,51 @@ def main():
     elif choice == "2":
         print("Загрузка данных из data.xml...")
         load_from_xml()
+    elif choice == "3":
+        if os.path.exists(BIN_FILE):
+            print("Загрузка данных из data.bin...")
+            load_from_binary()
+        else:
+            print("Файл data.bin не найден. Загружаем из JSON и создаём его.")
+            load_from_json()
+            save_to_binary()
+    elif choice in ("4", "6"):
+        # В режиме 6 в памяти держится только рабочий набор, изменения пишутся при вытеснении
+        backend = SQLiteBackend(DB_FILE) if choice == "4" else CachedSQLiteBackend(DB_FILE)
+        if backend.is_empty():
+            print("База пуста. Импортируем данные из data.json...")
+            load_from_json()
+            backend.import_current()
+        else:
+            print("Загрузка данных из library.db...")
+            backend.load()
+    elif choice == "5":
+        # Читается только индекс, книги и читатели — при первом обращении
+        print("Чтение индекса data.json...")
+        library = LazyLibrary(JSON_FILE, target=JSON_FILE + STAGED_SUFFIX)
+        library.open()
     else:
         print("Ошибка загрузки XML. Загружаем из JSON")
         load_from_json()
 
+    if backend is not None:
+        # Каждое изменение сразу записывается в базу отдельной транзакцией
+        backend.attach()
+        journal = persister = None
+    else:
+        # Операции, не попавшие в снимок до сбоя, восстанавливаются из журнала.
+        # Снимки пишет фоновый поток в подготовленные файлы, он же отбрасывает
+        # уже сохранённую часть журнала; на место снимков они встают при выходе с сохранением
+        journal = Journal(JOURNAL_FILE)
+        replayed = journal.replay()
+        if replayed:
+            print(f"Восстановлено операций из журнала: {replayed}")
+        journal.open()
+        # В ленивом режиме снимок — только data.json, переписанный с изменёнными записями
+        persister = Persister(library.snapshot_jobs if library else staged_jobs, journal=journal)
+        persister.start()
+    scheduler.attach()
+
     # Основное меню
     while True:
         print("\n=== Библиотека ===")
@@ -759,21 +965,42 @@ def main():
         elif choice == "2":
             first = input("Имя: ").strip()
             last = input("Фамилия: ").strip()
-            reader = find_reader_by_name(first, last)
+            reader = find_reader_by_name(first, last, casefold=True)
             if reader:
                 reader_menu(reader)
             else:
                 print("Читатель не найден.")
 
         elif choice == "0":
-            print("Сохранение данных в data.json и data.xml...")
-            save_data()
+            if backend is not None:
+                backend.close()
+                print("Данные сохранены в library.db. До свидания!")
+                break
+            print("Сохранение данных в data.json..." if library else "Сохранение данных в data.json и data.xml...")
+            persister.close()
+            if library is not None:
+                library.close()
+            promote_staged(staged_files())
+            journal.close()
             print("Данные сохранены. До свидания!")
             break
 
         elif choice == "9":
             confirm = input("Вы уверены, что хотите выйти без сохранения? (y/n): ").strip().lower()
             if confirm == "y":
+                if backend is not None:
+                    # В базе каждое изменение фиксируется сразу (в режиме 6 — при закрытии), отменять нечего
+                    backend.close()
+                    print("Выход. Изменения уже записаны в library.db.")
+                    break
+                # Фоновые снимки лежат в подготовленных файлах: снимки на диске не тронуты
+                persister.close(flush=False)
+                if library is not None:
+                    library.close()
+                # Сначала журнал: при сбое между шагами останется согласованный подготовленный снимок
+                journal.discard()
+                journal.close()
+                discard_staged(staged_files())
                 print("Выход без сохранения. Все изменения отменены.")
                 break
             else:
@@ -782,6 +1009,15 @@ def main():
         else:
             print("Неверный выбор. Попробуйте снова.")
 
+    cached = backend if isinstance(backend, CachedSQLiteBackend) else library
+    if cached is not None:
+        # По статистике кэша подбирается его размер под рабочий набор
+        print(f"Кэш объектов: {cached.stats}")
+
+    if exporter is not None:
+        # Последняя выгрузка метрик, включая время сохранения при выходе
+        exporter.stop()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,257 @@
+# Метрики операций библиотеки: число вызовов, число ошибок и гистограмма времени
+# для выдачи, возврата, бронирования, загрузки и сохранения.
+# Включаются по запросу (enable): только тогда отслеживаемые функции заменяются
+# обёртками с замером времени, а disable возвращает исходные функции — выключенные
+# метрики не стоят ничего. Снимок метрик выгружается в файл в текстовом формате
+# Prometheus (для textfile-сборщика) или в JSON.
+# В main(): переменная окружения LIBRARY_METRICS=путь включает метрики и выгрузку
+
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+import stores
+from snapshot import atomic_write
+from logs import log, WARNING
+
+# Верхние границы корзин гистограммы: от 1 мкс до ~16 с, каждая вдвое больше предыдущей
+BUCKETS: Tuple[float, ...] = tuple(1e-6 * 2 ** k for k in range(25))
+EXPORT_INTERVAL = 10.0
+
+
+# Без блокировок: замер — это пара операций над списком и полем под GIL. При
+# одновременной записи из нескольких потоков изредка теряется единица счёта, зато
+# замер не удлиняет саму операцию; для наблюдения за задержками этого достаточно
+class Histogram:
+    __slots__ = ("counts", "total", "errors")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.errors = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, seconds: float, failed: bool = False) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        if failed:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        # Оценка сверху: граница корзины, в которую попадает q-я доля замеров
+        counts = list(self.counts)
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            seen += n
+            if seen >= rank and n:
+                return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "sum": self.total,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Registry:
+    enabled: bool
+
+    def __init__(self):
+        self.enabled = False
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # (владелец, имя атрибута, имя метрики) и исходные функции на время включения
+        self._targets: List[Tuple[object, str, str]] = []
+        self._originals: Dict[Tuple[int, str], Callable] = {}
+
+    def histogram(self, name: str) -> Histogram:
+        h = self._histograms.get(name)
+        if h is None:
+            with self._lock:
+                h = self._histograms.setdefault(name, Histogram())
+        return h
+
+    def inc(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + n
+
+    def track(self, owner, attr: str, name: Optional[str] = None) -> None:
+        # Функция owner.attr (метод класса или функция модуля) будет замеряться после enable()
+        name = name or f"{getattr(owner, '__name__', owner)}.{attr}"
+        self._targets.append((owner, attr, name))
+        if self.enabled:
+            self._wrap(owner, attr, name)
+
+    def _wrap(self, owner, attr: str, name: str) -> None:
+        key = (id(owner), attr)
+        if key in self._originals:
+            return
+        original = getattr(owner, attr)
+        h = self.histogram(name)
+        counts = h.counts
+        clock = time.perf_counter
+
+        # Замер встроен прямо в обёртку: лишний вызов observe() заметен на коротких операциях
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                result = original(*args, **kwargs)
+            except BaseException:
+                h.observe(clock() - start, True)
+                raise
+            elapsed = clock() - start
+            counts[bisect_left(BUCKETS, elapsed)] += 1
+            h.total += elapsed
+            return result
+
+        self._originals[key] = original
+        setattr(owner, attr, timed)
+
+    def enable(self) -> None:
+        self.enabled = True
+        for owner, attr, name in self._targets:
+            self._wrap(owner, attr, name)
+
+    def disable(self) -> None:
+        self.enabled = False
+        for owner, attr, _ in self._targets:
+            original = self._originals.pop((id(owner), attr), None)
+            if original is not None:
+                setattr(owner, attr, original)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+        # Обёртки держат ссылки на старые гистограммы — пересоздаём их
+        if self.enabled:
+            self.disable()
+            self.enable()
+
+    def snapshot(self) -> dict:
+        return {
+            "timestamp": time.time(),
+            "operations": {name: h.to_dict() for name, h in sorted(self._histograms.items())},
+            "counters": dict(sorted(self._counters.items())),
+        }
+
+    def render_text(self) -> str:
+        # Текстовый формат Prometheus: гистограмма library_op_seconds и счётчики
+        lines = [
+            "# HELP library_op_seconds Время операций библиотеки.",
+            "# TYPE library_op_seconds histogram",
+        ]
+        for name, h in sorted(self._histograms.items()):
+            counts, total, errors = list(h.counts), h.total, h.errors
+            count = sum(counts)
+            seen = 0
+            for bound, n in zip(BUCKETS, counts):
+                seen += n
+                lines.append(f'library_op_seconds_bucket{{op="{name}",le="{bound:g}"}} {seen}')
+            lines.append(f'library_op_seconds_bucket{{op="{name}",le="+Inf"}} {count}')
+            lines.append(f'library_op_seconds_sum{{op="{name}"}} {total:.9f}')
+            lines.append(f'library_op_seconds_count{{op="{name}"}} {count}')
+            lines.append(f'library_op_errors_total{{op="{name}"}} {errors}')
+        if self._counters:
+            lines.append("# TYPE library_events_total counter")
+            for name, value in sorted(self._counters.items()):
+                lines.append(f'library_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> None:
+        # Файл заменяется атомарно: сборщик никогда не читает половину снимка
+        if path.endswith(".json"):
+            text = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        else:
+            text = self.render_text()
+        atomic_write(path, lambda f: f.write(text))
+
+
+class FileExporter:
+    # Фоновая выгрузка метрик в файл раз в interval секунд
+    def __init__(self, registry: Registry, path: str, interval: float = EXPORT_INTERVAL):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.registry.export(self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.registry.export(self.path)
+            except OSError as e:
+                log(WARNING, "metrics_export_failed", "Не удалось выгрузить метрики: %s", e, path=self.path)
+
+
+registry = Registry()
+
+
+def _on_event(op: str, data: dict) -> None:
+    registry.inc(op)
+
+
+def track_library() -> None:
+    # Отслеживаемые операции; main импортируется здесь, чтобы не было цикла импортов
+    import main
+    import persister
+    from classes import Librarian, Reader, Room
+    if registry._targets:
+        return
+    for owner, attr in (
+        (Librarian, "lend_book_to_reader"),
+        (Librarian, "accept_book_return"),
+        (Reader, "take_book"),
+        (Reader, "return_borrowed_book"),
+        (Room, "reserve_seat"),
+        (Room, "reserve_many"),
+        (main, "load_from_json"),
+        (main, "load_from_xml"),
+        (main, "save_data"),
+        (main, "save_to_json"),
+        (main, "save_to_xml"),
+        (persister, "write_snapshot"),
+    ):
+        registry.track(owner, attr)
+
+
+def enable(path: Optional[str] = None, interval: float = EXPORT_INTERVAL) -> Optional[FileExporter]:
+    track_library()
+    registry.enable()
+    # Счётчики событий хранилища (lend, return, add_book...) идут через подписку
+    stores.subscribe(_on_event)
+    if path is None:
+        return None
+    exporter = FileExporter(registry, path, interval)
+    exporter.start()
+    return exporter
+
+
+def disable() -> None:
+    stores.unsubscribe(_on_event)
+    registry.disable()
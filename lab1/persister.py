@@ -0,0 +1,181 @@
+# Фоновое сохранение снимков (group commit): изменения данных только отмечаются,
+# а снимок data.json/data.xml пишет отдельный поток — раз в INTERVAL секунд или
+# после MAX_CHANGES изменений, одной записью за всю накопленную пачку.
+# Оператор не ждёт json.dump, ET.indent и tree.write; между снимками изменения
+# сохраняет журнал операций, а после снимка его записанная часть отбрасывается.
+#
+# Снимок задаётся списком «заданий»: prepare() собирает состояние в памяти и
+# возвращает функцию записи. Все prepare() выполняются по очереди, записи файлов —
+# параллельно (JSON и XML одновременно)
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import stores
+from journal import Journal
+from logs import log, WARNING
+
+INTERVAL = 5.0
+MAX_CHANGES = 100
+RETRIES = 3
+
+
+def write_snapshot(jobs: List[Callable[[], Callable[[], None]]], pool: Optional[ThreadPoolExecutor] = None) -> None:
+    writers = [prepare() for prepare in jobs]
+    if len(writers) == 1:
+        writers[0]()
+        return
+    own = pool is None
+    if own:
+        pool = ThreadPoolExecutor(max_workers=len(writers))
+    try:
+        # result() пробрасывает ошибку записи любого из файлов
+        for future in [pool.submit(write) for write in writers]:
+            future.result()
+    finally:
+        if own:
+            pool.shutdown()
+
+
+class Persister:
+    interval: float
+    max_changes: int
+    journal: Optional[Journal]
+    snapshots: int
+
+    def __init__(
+        self,
+        jobs: Callable[[], list],
+        interval: float = INTERVAL,
+        max_changes: int = MAX_CHANGES,
+        journal: Optional[Journal] = None
+    ):
+        if interval <= 0 or max_changes < 1:
+            raise ValueError("interval должен быть > 0, max_changes >= 1.")
+        self.jobs = jobs
+        self.interval = interval
+        self.max_changes = max_changes
+        self.journal = journal
+        self.snapshots = 0
+        self.error: Optional[Exception] = None
+        self._cond = threading.Condition()
+        self._changes = 0
+        self._since = 0.0
+        # Номера запросов flush(): выполненный снимок закрывает все запросы до него
+        self._requested = 0
+        self._done = 0
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        return self._changes
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="snapshot")
+        self._thread = threading.Thread(target=self._run, name="persister", daemon=True)
+        self._thread.start()
+        stores.subscribe(self.on_change)
+
+    def on_change(self, op: str, data: dict) -> None:
+        # Вызывается в потоке оператора: только счётчик, без ввода-вывода
+        with self._cond:
+            self._changes += 1
+            if self._changes == 1:
+                # Первое изменение пачки запускает отсчёт интервала
+                self._since = time.monotonic()
+                self._cond.notify()
+            elif self._changes >= self.max_changes:
+                self._cond.notify()
+
+    def flush(self) -> None:
+        # Барьер: возвращается, когда на диске снимок со всеми изменениями до вызова
+        if self._thread is None:
+            self._commit()
+            return
+        with self._cond:
+            self._requested += 1
+            ticket = self._requested
+            self._cond.notify()
+            while self._done < ticket and self._thread.is_alive():
+                self._cond.wait()
+            if self.error is not None:
+                error, self.error = self.error, None
+                raise error
+
+    def close(self, flush: bool = True) -> None:
+        # flush=False — выход без сохранения: накопленные изменения не пишутся
+        if self._thread is None:
+            return
+        stores.unsubscribe(self.on_change)
+        if flush:
+            self.flush()
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join()
+        self._thread = None
+        self._pool.shutdown()
+        self._pool = None
+
+    def _due(self) -> bool:
+        if self._requested > self._done:
+            return True
+        if self._changes == 0:
+            return False
+        return self._changes >= self.max_changes or time.monotonic() - self._since >= self.interval
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopping and not self._due():
+                    timeout = None
+                    if self._changes:
+                        timeout = max(0.0, self._since + self.interval - time.monotonic())
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+                ticket = self._requested
+            error = None
+            try:
+                self._commit()
+            except Exception as e:
+                # Ошибка не должна останавливать поток; её получит ближайший flush()
+                log(WARNING, "snapshot_failed", "Ошибка фонового сохранения: %s", e, error=type(e).__name__)
+                error = e
+            with self._cond:
+                self.error = error
+                self._done = max(self._done, ticket)
+                self._cond.notify_all()
+
+    def _commit(self) -> None:
+        with self._cond:
+            changes, self._changes = self._changes, 0
+        mark = self.journal.mark() if self.journal is not None else None
+        try:
+            for attempt in range(RETRIES):
+                try:
+                    write_snapshot(self.jobs(), self._pool)
+                    break
+                except RuntimeError:
+                    # Состояние изменилось прямо во время сбора (другой поток
+                    # добавил бронь или книгу) — собираем заново
+                    if attempt == RETRIES - 1:
+                        raise
+        except Exception:
+            # Снимок не записан: изменения остаются в журнале и ждут следующей попытки
+            with self._cond:
+                if self._changes == 0:
+                    self._since = time.monotonic()
+                self._changes += changes
+            raise
+        # Записи журнала до отметки уже есть в снимке
+        if mark is not None:
+            self.journal.drop_until(mark)
+        self.snapshots += 1
@@ -0,0 +1,119 @@
+# Преобразование объектов библиотеки в словари формата data.json и обратно
+
+from datetime import datetime, date
+from typing import List
+
+from classes import Author, Location, Book, Reader, Review, Librarian, Room, Club
+
+
+def reader_from_dict(r: dict, trusted: bool = False) -> Reader:
+    return readers_from_dicts([r], trusted)[0]
+
+
+def readers_from_dicts(items: list, trusted: bool = False) -> List[Reader]:
+    # Проверка всей пачки сразу (Reader.from_records), затем отзыв и прочие поля.
+    # trusted=True — для наших собственных снимков и журнала
+    readers = Reader.from_records(items, trusted)
+    for reader, r in zip(readers, items):
+        reader.education_place = r.get("education_place", "")
+        reader.in_club = r.get("in_club", False)
+
+        rev = r.get("review")
+        if rev:
+            review = Review(rev["text"], rev["rating"], reader)
+            review.date = datetime.fromisoformat(rev["date"])
+            reader.review = review
+    return readers
+
+
+def reader_to_dict(r: Reader) -> dict:
+    rd = {
+        "first_name": r.first_name,
+        "last_name": r.last_name,
+        "phone": r.phone,
+        "email": r.email,
+        "reader_type": r.reader_type,
+        "education_place": r.education_place,
+        "in_club": r.in_club,
+        "borrowed_books_isbn": [b.isbn for b in r.borrowed_books],
+        "ticket": {
+            "ticket_id": r.ticket.ticket_id,
+            "issue_date": r.ticket.issue_date.isoformat(),
+            "expiry_date": r.ticket.expiry_date.isoformat()
+        }
+    }
+    if r.reader_type == "school":
+        rd["school_name"] = r.school_name
+        rd["grade"] = r.grade
+    elif r.reader_type == "student":
+        rd["university"] = r.university
+        rd["course"] = r.course
+
+    if r.review:
+        rd["review"] = {
+            "text": r.review.text,
+            "rating": r.review.rating,
+            "date": r.review.date.isoformat()
+        }
+    else:
+        rd["review"] = None
+    return rd
+
+
+def book_from_dict(b: dict) -> Book:
+    # Заёмщика связывает вызывающий код: читатель может быть ещё не загружен
+    author = Author.get_or_create(
+        b["author"]["first_name"],
+        b["author"]["last_name"],
+        b["author"].get("bio", "")
+    )
+    location = Location.get_or_create(b["location"]["rack"], b["location"]["shelf"])
+    book = Book(b["title"], author, b["isbn"], location)
+    book.is_available = b["is_available"]
+    if b.get("due_date"):
+        book.due_date = date.fromisoformat(b["due_date"])
+    return book
+
+
+def book_to_dict(b: Book) -> dict:
+    return {
+        "title": b.title,
+        "author": {
+            "first_name": b.author.first_name,
+            "last_name": b.author.last_name,
+            "bio": b.author.bio
+        },
+        "isbn": b.isbn,
+        "location": {"rack": b.location.rack, "shelf": b.location.shelf},
+        "is_available": b.is_available,
+        "current_borrower": (
+            f"{b.current_borrower.first_name} {b.current_borrower.last_name}"
+            if b.current_borrower else None
+        ),
+        "due_date": b.due_date.isoformat() if b.due_date else None
+    }
+
+
+def librarian_to_dict(l: Librarian) -> dict:
+    return {"first_name": l.first_name, "last_name": l.last_name, "phone": l.phone}
+
+
+def room_to_dict(room: Room) -> dict:
+    bookings = []
+    for seat_num, times in room.seats.items():
+        for dt, reader in times.items():
+            bookings.append({
+                "seat_number": seat_num,
+                "datetime": dt.isoformat(),
+                "reader": f"{reader.first_name} {reader.last_name}"
+            })
+    return {"name": room.name, "bookings": bookings}
+
+
+def club_to_dict(club: Club) -> dict:
+    return {
+        "name": club.key(),
+        "members": [f"{m.first_name} {m.last_name}" for m in club.members],
+        "meetings": [dt.isoformat() for dt in club.meetings],
+        "current_book_isbn": club.current_book.isbn if club.current_book else None
+    }
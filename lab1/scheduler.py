@@ -0,0 +1,155 @@
+# Планировщик сроков: окончание выдачи книг и истечение читательских билетов.
+# Все сроки лежат в одной куче (min-heap), поэтому «всё, что истекло до даты X»
+# достаётся за O(k log n), без обхода всех читателей и книг.
+# Изменения приходят через события хранилища; устаревшие записи в куче не
+# удаляются сразу, а отбрасываются при извлечении (ленивое удаление).
+#
+# Записи хранят ключ объекта (ISBN книги, имя и фамилию читателя), а не сам объект:
+# в ленивом режиме и в режиме кэша SQLite объект может быть выгружен и загружен
+# заново. Там же в памяти лежит лишь часть данных, поэтому сроки берутся из
+# source — индекса снимка или запроса к базе; объект загружается только при извлечении
+
+import heapq
+import threading
+from datetime import date
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union, TYPE_CHECKING
+
+import stores
+from stores import catalog, reader_registry
+
+if TYPE_CHECKING:
+    from classes import Book, Reader
+
+LOAN = "loan"       # срок возврата книги
+TICKET = "ticket"   # окончание действия читательского билета
+
+
+class Due(NamedTuple):
+    when: date
+    kind: str
+    obj: Union['Book', 'Reader']
+
+
+def _key(kind: str, obj):
+    return obj.isbn if kind == LOAN else (obj.first_name, obj.last_name)
+
+
+def _resolve(kind: str, key):
+    # Через хранилище: в ленивом режиме объект загружается по требованию
+    return catalog.get(key) if kind == LOAN else reader_registry.get(*key)
+
+
+class Scheduler:
+    _heap: List[Tuple[date, int, str, object]]
+    # (вид, ключ объекта) -> актуальная дата; запись в куче действительна, только если совпадает
+    _current: Dict[Tuple[str, object], date]
+    _seq: int
+    attached: bool
+    # Все сроки хранилища (дата, вид, ключ), включая не загруженные в память объекты
+    source: Optional[Callable[[], Iterable[Tuple[date, str, object]]]]
+
+    def __init__(self):
+        self._heap = []
+        self._current = {}
+        self._seq = 0
+        self.attached = False
+        self.source = None
+        # События выдачи и возврата могут приходить из разных потоков
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def attach(self) -> None:
+        self.rebuild()
+        stores.subscribe(self.on_event)
+        self.attached = True
+
+    def detach(self) -> None:
+        stores.unsubscribe(self.on_event)
+        self.attached = False
+
+    def rebuild(self) -> None:
+        # Полное заполнение по текущим данным (после загрузки снимка)
+        with self._lock:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._current.clear()
+        if self.source is not None:
+            for when, kind, key in self.source():
+                self._current[(kind, key)] = when
+        # Объекты в памяти новее источника (восстановлены из журнала, ещё не сохранены)
+        for book in catalog:
+            if not book.is_available and book.due_date:
+                self._current[(LOAN, book.isbn)] = book.due_date
+            else:
+                self._current.pop((LOAN, book.isbn), None)
+        for reader in reader_registry:
+            self._current[(TICKET, _key(TICKET, reader))] = reader.ticket.expiry_date
+        self._heap = [(when, i, kind, key) for i, ((kind, key), when) in enumerate(self._current.items())]
+        heapq.heapify(self._heap)
+        self._seq = len(self._heap)
+
+    def schedule(self, kind: str, obj, when: date) -> None:
+        # seq разводит равные даты, чтобы куча не сравнивала сами объекты
+        key = _key(kind, obj)
+        with self._lock:
+            self._current[(kind, key)] = when
+            self._seq += 1
+            heapq.heappush(self._heap, (when, self._seq, kind, key))
+
+    def cancel(self, kind: str, obj) -> None:
+        with self._lock:
+            self._current.pop((kind, _key(kind, obj)), None)
+
+    def on_event(self, op: str, data: dict) -> None:
+        if op == "lend" and data["book"].due_date:
+            self.schedule(LOAN, data["book"], data["book"].due_date)
+        elif op == "return":
+            self.cancel(LOAN, data["book"])
+        elif op == "add_book" and not data["obj"].is_available and data["obj"].due_date:
+            self.schedule(LOAN, data["obj"], data["obj"].due_date)
+        elif op == "remove_book":
+            self.cancel(LOAN, data["obj"])
+        elif op == "add_reader":
+            self.schedule(TICKET, data["obj"], data["obj"].ticket.expiry_date)
+        elif op == "remove_reader":
+            self.cancel(TICKET, data["obj"])
+
+    def _valid(self, when: date, kind: str, key) -> Optional[Union['Book', 'Reader']]:
+        # Объект записи или None, если запись устарела
+        if self._current.get((kind, key)) != when:
+            return None
+        # Хранилища могли очистить в обход событий (загрузка другого снимка)
+        obj = _resolve(kind, key)
+        if obj is None:
+            return None
+        if kind == LOAN:
+            return obj if not obj.is_available and obj.due_date == when else None
+        return obj if obj.ticket.expiry_date == when else None
+
+    def peek(self) -> Due | None:
+        with self._lock:
+            while self._heap:
+                when, _, kind, key = self._heap[0]
+                obj = self._valid(when, kind, key)
+                if obj is not None:
+                    return Due(when, kind, obj)
+                heapq.heappop(self._heap)
+            return None
+
+    def pop_due(self, before: date) -> List[Due]:
+        # Всё, что истекает раньше before, в порядке дат; извлечённое снимается с учёта
+        result = []
+        with self._lock:
+            while self._heap and self._heap[0][0] < before:
+                when, _, kind, key = heapq.heappop(self._heap)
+                obj = self._valid(when, kind, key)
+                if obj is not None:
+                    del self._current[(kind, key)]
+                    result.append(Due(when, kind, obj))
+        return result
+
+
+scheduler = Scheduler()
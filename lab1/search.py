@@ -0,0 +1,269 @@
+# Полнотекстовый поиск книг по названию, автору и биографии автора.
+# Обратный индекс «слово -> книги» обновляется вместе с каталогом (через
+# catalog.attach_index), поэтому каждая новая книга сразу находится поиском.
+# Поддерживаются поиск по началу слова (подсказки при вводе) и нечёткий поиск
+# по триграммам (опечатки).
+# Книги в индексе различаются по ISBN. В ленивом режиме индекс заполняется текстами
+# всех книг снимка (fill), а выгрузка книги из памяти её из поиска не убирает:
+# найденная книга загружается через catalog.get.
+# Индекс каталога меняется под catalog.lock, под той же блокировкой идут и запросы
+
+import bisect
+import heapq
+import re
+import threading
+from itertools import islice
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from stores import catalog
+
+if TYPE_CHECKING:
+    from classes import Book
+
+# Веса полей: совпадение в названии важнее совпадения в имени автора или биографии
+TITLE = 4
+AUTHOR = 2
+BIO = 1
+
+PREFIX_EXPANSION = 64   # сколько слов словаря максимум подставляется вместо префикса
+FUZZY_THRESHOLD = 0.4   # минимальное сходство по триграммам (коэффициент Жаккара)
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(normalize(text))
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    # слово -> {ISBN -> вес лучшего поля, где встретилось слово}
+    _postings: Dict[str, Dict[str, int]]
+    # Книги в памяти по ISBN
+    _books: Dict[str, 'Book']
+    # ISBN -> (проиндексированный текст, слова), чтобы удалять старые записи
+    _indexed: Dict[str, Tuple[tuple, Set[str]]]
+    # Отсортированный словарь для поиска по префиксу; новые слова копятся в _pending
+    _sorted: List[str]
+    _pending: List[str]
+    _trigrams: Dict[str, Set[str]]
+    # Индекс заполнен из снимка: remove только забывает объект книги
+    backed: bool
+    lock: threading.RLock
+
+    def __init__(self, lock: Optional[threading.RLock] = None):
+        self.lock = lock or threading.RLock()
+        self._postings = {}
+        self._books = {}
+        self._indexed = {}
+        self._sorted = []
+        self._pending = []
+        self._trigrams = {}
+        self.backed = False
+
+    def __len__(self) -> int:
+        return len(self._indexed)
+
+    @staticmethod
+    def _fields(book: 'Book') -> tuple:
+        return (book.title, book.author.first_name, book.author.last_name, book.author.bio)
+
+    def add(self, book: 'Book') -> None:
+        with self.lock:
+            self._books[book.isbn] = book
+            self._index(book.isbn, self._fields(book))
+
+    def fill(self, texts: Dict[str, tuple]) -> None:
+        # Тексты книг снимка: ISBN -> (название, имя автора, фамилия автора, биография)
+        with self.lock:
+            self.backed = True
+            for isbn, fields in texts.items():
+                self._index(isbn, tuple(fields))
+
+    def _index(self, isbn: str, fields: tuple) -> None:
+        # Повторный вызов для той же книги переиндексирует её, только если текст изменился
+        old = self._indexed.get(isbn)
+        if old is not None:
+            if old[0] == fields:
+                return
+            self._unindex(isbn)
+        title, first_name, last_name, bio = fields
+        weights: Dict[str, int] = {}
+        for text, weight in ((title, TITLE), (first_name, AUTHOR), (last_name, AUTHOR), (bio, BIO)):
+            for token in tokenize(text):
+                if weight > weights.get(token, 0):
+                    weights[token] = weight
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._pending.append(token)
+                for gram in trigrams(token):
+                    self._trigrams.setdefault(gram, set()).add(token)
+            postings[isbn] = weight
+        self._indexed[isbn] = (fields, set(weights))
+
+    def remove(self, book: 'Book') -> None:
+        with self.lock:
+            if self._books.get(book.isbn) is not book:
+                return
+            del self._books[book.isbn]
+            # Удалённая из снимка книга остаётся в словаре, но при выдаче результатов
+            # catalog.get её не находит
+            if not self.backed:
+                self._unindex(book.isbn)
+
+    def _unindex(self, isbn: str) -> None:
+        entry = self._indexed.pop(isbn, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(isbn, None)
+            if not postings:
+                # Из отсортированного словаря слово уходит при следующей пересборке
+                del self._postings[token]
+                for gram in trigrams(token):
+                    tokens = self._trigrams.get(gram)
+                    if tokens is not None:
+                        tokens.discard(token)
+                        if not tokens:
+                            del self._trigrams[gram]
+
+    def clear(self) -> None:
+        with self.lock:
+            self._postings.clear()
+            self._books.clear()
+            self._indexed.clear()
+            self._sorted.clear()
+            self._pending.clear()
+            self._trigrams.clear()
+            self.backed = False
+
+    def _vocabulary(self) -> List[str]:
+        # Словарь пересобирается лениво, при первом запросе после добавлений: новые
+        # слова сортируются отдельно (k log k) и сливаются с готовым словарём за
+        # один линейный проход; заодно выбрасываются удалённые слова и повторы.
+        # Массовая загрузка без запросов словарь не сортирует вовсе
+        if self._pending:
+            self._pending.sort()
+            vocab = []
+            for t in heapq.merge(self._sorted, self._pending):
+                if t in self._postings and (not vocab or vocab[-1] != t):
+                    vocab.append(t)
+            self._pending.clear()
+            self._sorted = vocab
+        return self._sorted
+
+    def complete(self, prefix: str, limit: int = PREFIX_EXPANSION) -> List[str]:
+        # Слова словаря, начинающиеся с prefix (в алфавитном порядке)
+        prefix = normalize(prefix)
+        with self.lock:
+            vocab = self._vocabulary()
+            result = []
+            i = bisect.bisect_left(vocab, prefix)
+            while i < len(vocab) and len(result) < limit and vocab[i].startswith(prefix):
+                if vocab[i] in self._postings:
+                    result.append(vocab[i])
+                i += 1
+        return result
+
+    def similar(self, word: str, limit: int = PREFIX_EXPANSION, threshold: float = FUZZY_THRESHOLD) -> List[str]:
+        # Слова словаря, похожие на word по набору триграмм
+        word = normalize(word)
+        grams = trigrams(word)
+        shared: Dict[str, int] = {}
+        with self.lock:
+            for gram in grams:
+                for token in self._trigrams.get(gram, ()):
+                    shared[token] = shared.get(token, 0) + 1
+        scored = []
+        for token, count in shared.items():
+            score = count / (len(grams) + len(trigrams(token)) - count)
+            if score >= threshold:
+                scored.append((score, token))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [token for _, token in scored[:limit]]
+
+    def _matches(self, term: str, prefix: bool, fuzzy: bool) -> Dict[str, int]:
+        # Книги, подходящие под одно слово запроса: ISBN -> лучший вес поля
+        tokens = [term] if term in self._postings else []
+        if prefix:
+            tokens += [t for t in self.complete(term) if t != term]
+        if not tokens and fuzzy:
+            tokens = self.similar(term)
+        if len(tokens) == 1:
+            # Список книг слова отдаётся как есть, без копирования
+            return self._postings[tokens[0]]
+        found: Dict[str, int] = {}
+        for token in tokens:
+            for isbn, weight in self._postings[token].items():
+                if weight > found.get(isbn, 0):
+                    found[isbn] = weight
+        return found
+
+    @staticmethod
+    def _intersect(per_term: List[Dict[str, int]]) -> Dict[str, int]:
+        # Перебираем самый короткий список, остальные проверяем по принадлежности
+        scores = {}
+        for isbn, weight in per_term[0].items():
+            total = weight
+            for other in per_term[1:]:
+                w = other.get(isbn)
+                if w is None:
+                    break
+                total += w
+            else:
+                scores[isbn] = total
+        return scores
+
+    def _book(self, isbn: str) -> Optional['Book']:
+        book = self._books.get(isbn)
+        if book is None and self.backed:
+            book = catalog.get(isbn)
+        return book
+
+    def search(self, query: str, limit: Optional[int] = 20, prefix: bool = True, fuzzy: bool = True) -> List['Book']:
+        # Все слова запроса должны найтись; последнее слово считается началом слова
+        # (ввод ещё не закончен). Слова, которых нет в словаре, ищутся нечётко
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self.lock:
+            per_term = [
+                self._matches(term, prefix and i == len(terms) - 1, fuzzy)
+                for i, term in enumerate(terms)
+            ]
+            per_term.sort(key=len)
+            if len(per_term) == 1:
+                scores = per_term[0]
+            else:
+                scores = self._intersect(per_term)
+            # Весов немного, поэтому вместо сортировки раскладываем книги по корзинам
+            # веса; внутри корзины — порядок добавления в каталог
+            by_score: Dict[int, List[str]] = {}
+            for isbn, total in scores.items():
+                by_score.setdefault(total, []).append(isbn)
+        # Книги собираются уже без блокировки: в ленивом режиме catalog.get читает снимок
+        ranked = (isbn for total in sorted(by_score, reverse=True) for isbn in by_score[total])
+        found = (book for book in map(self._book, ranked) if book is not None)
+        return list(islice(found, limit))
+
+
+search_index = SearchIndex(catalog.lock)
+catalog.attach_index(search_index)
+
+
+def search_books(query: str, limit: Optional[int] = 20) -> List['Book']:
+    catalog.sync()
+    return search_index.search(query, limit)
@@ -0,0 +1,260 @@
+# Сетевой доступ к библиотеке: asyncio-сервер с построчным JSON-протоколом.
+# Каждая строка запроса — JSON-объект с полем "op", на каждую строку приходит
+# одна строка ответа {"ok": true, ...} или {"ok": false, "error": ..., "type": ...}.
+# Запросы независимы: клиент называет читателя в каждом запросе, сессий нет.
+# Изменяющие операции выполняются в пуле потоков, чтобы блокировки хранилищ и запись
+# журнала не останавливали цикл событий. Журнал сбрасывается на диск фоновой задачей
+# раз в FLUSH_INTERVAL секунд (групповая фиксация вместо fsync на каждую запись), и
+# ответ на изменение уходит клиенту только после fsync его партии.
+#
+# Пример:  {"op": "lend", "isbn": "978-5-699123-45-6", "reader": ["Василиса", "Петрова"]}
+# Запуск:  python server.py [порт]
+
+import asyncio
+import json
+import sys
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import main
+import stores
+from stores import catalog, reader_registry
+from classes import Book, Reader
+from exceptions import LibraryError, BookNotFoundError, ReaderNotFoundError
+from journal import Journal
+from persister import Persister
+from search import search_books
+
+HOST = "127.0.0.1"
+PORT = 8765
+FLUSH_INTERVAL = 0.05
+MAX_LINE = 64 * 1024
+
+
+def _book(request: dict) -> Book:
+    book = catalog.get(request["isbn"])
+    if book is None:
+        raise BookNotFoundError(request["isbn"])
+    return book
+
+
+def _reader(request: dict) -> Reader:
+    first, last = request["reader"]
+    reader = reader_registry.get(first, last, casefold=True)
+    if reader is None:
+        raise ReaderNotFoundError(first, last)
+    return reader
+
+
+def _book_info(book: Book) -> dict:
+    return {
+        "isbn": book.isbn,
+        "title": book.title,
+        "author": str(book.author),
+        "is_available": book.is_available,
+        "due_date": book.due_date.isoformat() if book.due_date else None
+    }
+
+
+# --- Операции протокола: запрос -> поля ответа ---
+
+def _ping(request: dict) -> dict:
+    return {}
+
+
+def _find(request: dict) -> dict:
+    return {"book": _book_info(_book(request))}
+
+
+def _search(request: dict) -> dict:
+    return {"books": [_book_info(b) for b in search_books(request["query"], request.get("limit", 20))]}
+
+
+def _lend(request: dict) -> dict:
+    book = _book(request)
+    _reader(request).take_book(book)
+    return {"due_date": book.due_date.isoformat()}
+
+
+def _return(request: dict) -> dict:
+    _reader(request).return_borrowed_book(_book(request))
+    return {}
+
+
+def _reserve(request: dict) -> dict:
+    room = next((r for r in stores.rooms if r.name == request["room"]), None)
+    if room is None:
+        raise LibraryError(f"Читательский зал '{request['room']}' не найден.")
+    dt = datetime.fromisoformat(request["datetime"])
+    return {"reserved": room.reserve_seat(request["seat"], dt, _reader(request))}
+
+
+def _review(request: dict) -> dict:
+    _reader(request).set_review(request["text"], request["rating"])
+    return {}
+
+
+def _club(request: dict):
+    index = request.get("club", 0)
+    if not 0 <= index < len(stores.clubs):
+        raise LibraryError(f"Клуб №{index} не найден.")
+    return stores.clubs[index]
+
+
+def _join(request: dict) -> dict:
+    _club(request).join(_reader(request))
+    return {}
+
+
+def _leave(request: dict) -> dict:
+    _club(request).leave(_reader(request))
+    return {}
+
+
+# Операции, которые пишут в журнал: выполняются вне цикла событий и ждут fsync
+MUTATING = frozenset({"lend", "return", "reserve", "review", "join", "leave"})
+
+OPERATIONS: Dict[str, Callable[[dict], dict]] = {
+    "ping": _ping,
+    "find": _find,
+    "search": _search,
+    "lend": _lend,
+    "return": _return,
+    "reserve": _reserve,
+    "review": _review,
+    "join": _join,
+    "leave": _leave,
+}
+
+
+def handle_request(request: dict) -> dict:
+    # Ошибки предметной области и неверные запросы возвращаются клиенту, а не роняют сервер
+    try:
+        operation = OPERATIONS.get(request.get("op"))
+        if operation is None:
+            raise LibraryError(f"Неизвестная операция: {request.get('op')!r}.")
+        return {"ok": True, **operation(request)}
+    except (LibraryError, ValueError, TypeError, KeyError) as e:
+        message = f"Не хватает поля {e}." if isinstance(e, KeyError) else str(e)
+        return {"ok": False, "error": message, "type": type(e).__name__}
+
+
+class LibraryServer:
+    journal: Optional[Journal]
+    flush_interval: float
+
+    def __init__(self, journal: Optional[Journal] = None, flush_interval: float = FLUSH_INTERVAL):
+        self.journal = journal
+        self.flush_interval = flush_interval
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._dirty = False
+        self._closing = False
+        # Текущая партия: событие срабатывает после fsync всех записей, сделанных до его замены
+        self._batch = asyncio.Event()
+
+    async def start(self, host: str = HOST, port: int = PORT) -> asyncio.AbstractServer:
+        self._server = await asyncio.start_server(self._client, host, port, limit=MAX_LINE)
+        if self.journal is not None:
+            stores.subscribe(self._mark_dirty)
+            self._flusher = asyncio.create_task(self._flush_loop())
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._flusher is not None:
+            # Фиксация не прерывается на середине: ждущие ответа клиенты получат его
+            self._closing = True
+            await self._flusher
+            stores.unsubscribe(self._mark_dirty)
+            await self._flush()
+
+    def _mark_dirty(self, op: str, data: dict) -> None:
+        self._dirty = True
+
+    async def _flush(self) -> None:
+        if self._dirty:
+            self._dirty = False
+            batch, self._batch = self._batch, asyncio.Event()
+            # fsync блокирует, поэтому уходит в пул потоков и не задерживает клиентов
+            await asyncio.get_running_loop().run_in_executor(None, self.journal.sync)
+            batch.set()
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush()
+
+    async def _execute(self, request: dict) -> dict:
+        if request.get("op") not in MUTATING:
+            return handle_request(request)
+        response = await asyncio.get_running_loop().run_in_executor(None, handle_request, request)
+        if self.journal is not None and response["ok"]:
+            # Запись уже в журнале; партия и флаг берутся вместе в потоке цикла,
+            # поэтому ближайший _flush сбросит и её
+            self._dirty = True
+            await self._batch.wait()
+        return response
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Строка длиннее MAX_LINE
+                    writer.write(b'{"ok": false, "error": "request too long"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Запрос должен быть JSON-объектом.")
+                except ValueError as e:
+                    response = {"ok": False, "error": str(e), "type": "ValueError"}
+                else:
+                    response = await self._execute(request)
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def run(port: int = PORT) -> None:
+    main.load_from_json()
+    journal = Journal(main.JOURNAL_FILE, fsync=False)
+    replayed = journal.replay()
+    if replayed:
+        print(f"Восстановлено операций из журнала: {replayed}")
+    journal.open()
+    # Снимки пишутся в фоновом потоке и не останавливают цикл событий
+    persister = Persister(main.snapshot_jobs, journal=journal)
+    persister.start()
+    main.scheduler.attach()
+    server = LibraryServer(journal)
+    await server.start(port=port)
+    print(f"Сервер библиотеки слушает {HOST}:{server.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        persister.close()
+        journal.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else PORT))
+    except KeyboardInterrupt:
+        print("Сервер остановлен.")
@@ -0,0 +1,72 @@
+# Атомарная запись снимков: данные пишутся во временный файл в той же папке,
+# сбрасываются на диск (fsync) и подменяют старый файл одним rename.
+# При сбое на диске остаётся либо старая, либо новая версия, но не обрезанная
+
+import os
+import tempfile
+
+BUFFER_SIZE = 1 << 20
+
+
+def _fsync_dir(directory: str) -> None:
+    # На POSIX rename становится надёжным только после fsync каталога
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, write, binary: bool = False, encoding: str = "utf-8") -> None:
+    # write(f) получает буферизованный файл и записывает в него содержимое
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        if binary:
+            f = os.fdopen(fd, "wb", buffering=BUFFER_SIZE)
+        else:
+            f = os.fdopen(fd, "w", buffering=BUFFER_SIZE, encoding=encoding, newline="")
+        with f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+# Подготовленные снимки: фоновое сохранение пишет в path + STAGED_SUFFIX, а на место
+# настоящих файлов они переносятся только при сохранении на выходе. Так выход без
+# сохранения может отменить всё, что записал фоновый поток
+STAGED_SUFFIX = ".staged"
+
+
+def promote_staged(pairs) -> list:
+    # pairs: (подготовленный файл, файл снимка); возвращает перенесённые снимки
+    promoted = []
+    for staged, path in pairs:
+        if os.path.exists(staged):
+            os.replace(staged, path)
+            promoted.append(path)
+    for directory in {os.path.dirname(os.path.abspath(path)) for path in promoted}:
+        _fsync_dir(directory)
+    return promoted
+
+
+def discard_staged(pairs) -> None:
+    for staged, _ in pairs:
+        try:
+            os.remove(staged)
+        except FileNotFoundError:
+            pass
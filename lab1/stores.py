@@ -0,0 +1,409 @@
+# Хранилища объектов библиотеки с индексами для быстрого поиска
+
+import threading
+import weakref
+from typing import Callable, Dict, List, Optional, Iterator, Tuple, TYPE_CHECKING
+
+from exceptions import DuplicateBookError
+
+if TYPE_CHECKING:
+    from classes import Author, Location, Book, Room, Club
+
+
+# Подписчики на изменения данных (журнал операций и т.п.): listener(op, data)
+_listeners: list = []
+
+
+def subscribe(listener) -> None:
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def emit(op: str, **data) -> None:
+    for listener in _listeners:
+        listener(op, data)
+
+
+# Список хранилища со счётчиком изменений. Его отдают наружу (main.books), и код может
+# менять его в обход хранилища: присваивание по индексу или срезу, clear, sort...
+# Каждое такое изменение увеличивает version, и хранилище перестраивает индексы
+# при следующем обращении. Само хранилище меняет список через методы list: его
+# изменения не считаются, индексы оно обновляет сразу
+class TrackedList(list):
+    __slots__ = ("version",)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.version = 0
+
+
+def _counted(name: str):
+    method = getattr(list, name)
+
+    def counted(self, *args):
+        self.version += 1
+        return method(self, *args)
+    counted.__name__ = name
+    return counted
+
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+              "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(TrackedList, _name, _counted(_name))
+
+
+# Список объектов с удалением за O(1) и индексами, которые ведут наследники.
+# Если задан kind, добавление и удаление публикуются как события add_<kind>/remove_<kind>.
+# Изменения индексов идут под короткой блокировкой хранилища: выдачи разных книг
+# из разных потоков обновляют общие корзины индексов.
+# loader — необязательная подгрузка по требованию (lazy.py): get() передаёт ему ключ
+# и найденный в памяти объект (или None), а загрузчик при необходимости читает его из снимка
+class IndexedList:
+    kind: str
+    items: TrackedList
+    _pos: Dict[int, int]
+    _synced_version: int
+    lock: threading.RLock
+    loader: Optional[Callable]
+
+    def __init__(self, kind: str = ""):
+        self.kind = kind
+        self.items = TrackedList()
+        self._pos = {}
+        self._synced_version = 0
+        self.lock = threading.RLock()
+        self.loader = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.items)
+
+    def _index_add(self, obj) -> None:
+        raise NotImplementedError
+
+    def _index_remove(self, obj) -> None:
+        raise NotImplementedError
+
+    def _index_clear(self) -> None:
+        raise NotImplementedError
+
+    def _sync(self) -> None:
+        # Список могли изменить в обход хранилища (например, main.books.clear()
+        # или main.books[0] = другая_книга)
+        if self.items.version != self._synced_version:
+            with self.lock:
+                if self.items.version != self._synced_version:
+                    self.reindex()
+
+    def sync(self) -> None:
+        # Для подключённых индексов, которые отвечают на запросы без обращения к хранилищу
+        self._sync()
+
+    def contains(self, obj) -> bool:
+        # Проверка по самому объекту (а не по ключу) за O(1)
+        self._sync()
+        return id(obj) in self._pos
+
+    def reindex(self) -> None:
+        self._index_clear()
+        self._pos = {}
+        for i, obj in enumerate(self.items):
+            self._pos[id(obj)] = i
+            self._index_add(obj)
+        self._synced_version = self.items.version
+
+    def _append(self, obj, notify: bool = True) -> None:
+        with self.lock:
+            self._pos[id(obj)] = len(self.items)
+            list.append(self.items, obj)
+            self._index_add(obj)
+        if notify and self.kind:
+            emit(f"add_{self.kind}", obj=obj)
+
+    def remove(self, obj, notify: bool = True) -> bool:
+        self._sync()
+        with self.lock:
+            i = self._pos.pop(id(obj), None)
+            if i is None:
+                return False
+            self._index_remove(obj)
+            # Удаление за O(1): на место удаляемого объекта ставим последний
+            last = list.pop(self.items)
+            if last is not obj:
+                list.__setitem__(self.items, i, last)
+                self._pos[id(last)] = i
+        if notify and self.kind:
+            emit(f"remove_{self.kind}", obj=obj)
+        return True
+
+    def adopt(self, obj) -> None:
+        # Объект, прочитанный из снимка по требованию: он уже сохранён, поэтому
+        # добавление не публикуется (журналу и фоновому сохранению писать нечего)
+        self._sync()
+        with self.lock:
+            if id(obj) not in self._pos:
+                self._append(obj, notify=False)
+
+    def evict(self, obj) -> bool:
+        # Выгрузка из памяти без события: из снимка объект не удаляется
+        return self.remove(obj, notify=False)
+
+    def clear(self) -> None:
+        # Очищаем на месте, чтобы ссылки вида main.books оставались живыми
+        with self.lock:
+            list.clear(self.items)
+            self._pos.clear()
+            self._index_clear()
+            self._synced_version = self.items.version
+
+
+# Реестр общих экземпляров (авторы, места на полках): по одному объекту на ключ.
+# Ссылки слабые — объект, на который больше не ссылается ни одна книга, уходит сам
+class Flyweights:
+    _items: 'weakref.WeakValueDictionary'
+
+    def __init__(self):
+        self._items = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: tuple):
+        return self._items.get(key)
+
+    def add(self, key: tuple, obj) -> None:
+        self._items[key] = obj
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+# Каталог книг: владеет списком книг и поддерживает индекс ISBN -> Book,
+# а также вторичные индексы по автору, стеллажу/полке и доступности
+class Catalog(IndexedList):
+    _by_isbn: Dict[str, 'Book']
+    _by_author: Dict[Tuple[str, str], Dict[int, 'Book']]
+    _by_location: Dict[Tuple[str, str], Dict[int, 'Book']]
+    _by_rack: Dict[str, Dict[int, 'Book']]
+    _by_available: Dict[bool, Dict[int, 'Book']]
+    # Ключи, под которыми книга лежит во вторичных индексах (на случай их смены)
+    _keys: Dict[int, Tuple[Tuple[str, str], Tuple[str, str], bool]]
+    # Подключаемые индексы (например, полнотекстовый поиск) с методами add/remove/clear
+    _attached: list
+
+    def __init__(self, kind: str = ""):
+        self._by_isbn = {}
+        self._by_author = {}
+        self._by_location = {}
+        self._by_rack = {}
+        self._by_available = {True: {}, False: {}}
+        self._keys = {}
+        self._attached = []
+        super().__init__(kind)
+
+    @property
+    def books(self) -> List['Book']:
+        return self.items
+
+    def __contains__(self, isbn: str) -> bool:
+        return self.get(isbn) is not None
+
+    def _index_add(self, book: 'Book') -> None:
+        self._by_isbn.setdefault(book.isbn, book)
+        self._link(book)
+        for index in self._attached:
+            index.add(book)
+
+    def _index_remove(self, book: 'Book') -> None:
+        if self._by_isbn.get(book.isbn) is book:
+            del self._by_isbn[book.isbn]
+        self._unlink(book)
+        for index in self._attached:
+            index.remove(book)
+
+    def _index_clear(self) -> None:
+        self._by_isbn.clear()
+        self._by_author.clear()
+        self._by_location.clear()
+        self._by_rack.clear()
+        self._by_available[True].clear()
+        self._by_available[False].clear()
+        self._keys.clear()
+        for index in self._attached:
+            index.clear()
+
+    def _link(self, book: 'Book') -> None:
+        author = (book.author.first_name, book.author.last_name)
+        location = (book.location.rack, book.location.shelf)
+        available = bool(book.is_available)
+        self._keys[id(book)] = (author, location, available)
+        self._by_author.setdefault(author, {})[id(book)] = book
+        self._by_location.setdefault(location, {})[id(book)] = book
+        self._by_rack.setdefault(location[0], {})[id(book)] = book
+        self._by_available[available][id(book)] = book
+
+    def _unlink(self, book: 'Book') -> None:
+        keys = self._keys.pop(id(book), None)
+        if keys is None:
+            return
+        author, location, available = keys
+        self._by_available[available].pop(id(book), None)
+        for index, key in ((self._by_author, author), (self._by_location, location), (self._by_rack, location[0])):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(id(book), None)
+                if not bucket:
+                    del index[key]
+
+    def refresh(self, book: 'Book') -> None:
+        # Вызывается после смены автора, места или доступности у книги из каталога
+        self._sync()
+        with self.lock:
+            if id(book) in self._pos:
+                self._unlink(book)
+                self._link(book)
+                for index in self._attached:
+                    index.add(book)
+
+    def attach_index(self, index) -> None:
+        # Индекс сразу заполняется книгами, которые уже есть в каталоге
+        self._sync()
+        if index not in self._attached:
+            self._attached.append(index)
+            for book in self.items:
+                index.add(book)
+
+    def detach_index(self, index) -> None:
+        if index in self._attached:
+            self._attached.remove(index)
+
+    def by_author(self, first_name: str, last_name: str) -> List['Book']:
+        self._sync()
+        with self.lock:
+            return list(self._by_author.get((first_name, last_name), {}).values())
+
+    def by_location(self, rack: str, shelf: Optional[str] = None) -> List['Book']:
+        # Без shelf — все книги стеллажа
+        self._sync()
+        with self.lock:
+            if shelf is None:
+                return list(self._by_rack.get(rack, {}).values())
+            return list(self._by_location.get((rack, shelf), {}).values())
+
+    def by_availability(self, available: bool = True) -> List['Book']:
+        self._sync()
+        with self.lock:
+            return list(self._by_available[bool(available)].values())
+
+    def find(
+        self,
+        author: Optional[Tuple[str, str]] = None,
+        rack: Optional[str] = None,
+        shelf: Optional[str] = None,
+        available: Optional[bool] = None
+    ) -> List['Book']:
+        # Пересечение индексов: перебирается только самый маленький из выбранных,
+        # остальные условия проверяются по принадлежности за O(1)
+        if shelf is not None and rack is None:
+            raise ValueError("shelf задаётся только вместе с rack.")
+        self._sync()
+        # Корзины выбираются под той же блокировкой, что и читаются: refresh и remove
+        # из других потоков не подменят и не удалят корзину посреди запроса
+        with self.lock:
+            buckets = []
+            if author is not None:
+                buckets.append(self._by_author.get(tuple(author), {}))
+            if rack is not None and shelf is not None:
+                buckets.append(self._by_location.get((rack, shelf), {}))
+            elif rack is not None:
+                buckets.append(self._by_rack.get(rack, {}))
+            if available is not None:
+                buckets.append(self._by_available[bool(available)])
+            if not buckets:
+                return list(self.items)
+            buckets.sort(key=len)
+            smallest, rest = buckets[0], buckets[1:]
+            return [book for key, book in smallest.items() if all(key in b for b in rest)]
+
+    def get(self, isbn: str) -> Optional['Book']:
+        self._sync()
+        book = self._by_isbn.get(isbn)
+        if self.loader is not None:
+            # Загрузчик и отмечает обращение к объекту в памяти (для вытеснения)
+            return self.loader(isbn, book)
+        return book
+
+    def add(self, book: 'Book') -> None:
+        self._sync()
+        with self.lock:
+            if book.isbn in self._by_isbn:
+                raise DuplicateBookError(book.isbn)
+            self._append(book)
+
+
+# Реестр людей (читателей или библиотекарей) с индексом по (имя, фамилия).
+# Однофамильцы допускаются: как и при линейном поиске, находится первый добавленный.
+class NameRegistry(IndexedList):
+    _by_name: Dict[Tuple[str, str], list]
+    _by_folded: Dict[Tuple[str, str], list]
+
+    def __init__(self, kind: str = ""):
+        self._by_name = {}
+        self._by_folded = {}
+        super().__init__(kind)
+
+    @staticmethod
+    def fold(first_name: str, last_name: str) -> Tuple[str, str]:
+        return first_name.strip().casefold(), last_name.strip().casefold()
+
+    def _index_add(self, person) -> None:
+        self._by_name.setdefault((person.first_name, person.last_name), []).append(person)
+        self._by_folded.setdefault(self.fold(person.first_name, person.last_name), []).append(person)
+
+    def _index_remove(self, person) -> None:
+        for index, key in (
+            (self._by_name, (person.first_name, person.last_name)),
+            (self._by_folded, self.fold(person.first_name, person.last_name)),
+        ):
+            bucket = index.get(key)
+            if bucket and person in bucket:
+                bucket.remove(person)
+                if not bucket:
+                    del index[key]
+
+    def _index_clear(self) -> None:
+        self._by_name.clear()
+        self._by_folded.clear()
+
+    def get(self, first_name: str, last_name: str, casefold: bool = False):
+        self._sync()
+        if casefold:
+            bucket = self._by_folded.get(self.fold(first_name, last_name))
+        else:
+            bucket = self._by_name.get((first_name, last_name))
+        person = bucket[0] if bucket else None
+        if self.loader is not None:
+            return self.loader(first_name, last_name, casefold, person)
+        return person
+
+    def add(self, person) -> None:
+        self._sync()
+        with self.lock:
+            if id(person) not in self._pos:
+                self._append(person)
+
+
+catalog = Catalog("book")
+author_registry = Flyweights()
+location_registry = Flyweights()
+reader_registry = NameRegistry("reader")
+librarian_registry = NameRegistry("librarian")
+rooms: List['Room'] = []
+clubs: List['Club'] = []
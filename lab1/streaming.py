@@ -0,0 +1,139 @@
+# Потоковое чтение снимков библиотеки (JSON и XML): элементы разбираются по одному,
+# и в памяти держится только буфер чтения, а не весь документ
+
+import json
+import xml.etree.ElementTree as ET
+from typing import Iterator, Tuple, Any, Iterable, TextIO
+
+SECTIONS = ("librarians", "readers", "books", "rooms", "clubs")
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class _JsonStream:
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        # Сколько символов файла уже отброшено из буфера: base + pos — позиция в файле
+        self.base = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Отбрасываем уже разобранную часть буфера
+        self.base += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Неожиданный конец JSON-файла.")
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"Ожидался символ '{ch}' в позиции {self.pos}.")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Число на границе буфера могло оказаться обрезанным
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_json_items(f: TextIO, sections: Iterable[str] = SECTIONS,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    # Выдаёт пары (раздел, элемент) для массивов верхнего уровня из sections
+    return _iter_json(f, sections, chunk_size, False)
+
+
+def iter_json_spans(f: TextIO, sections: Iterable[str] = SECTIONS,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Any, int, int]]:
+    # То же, но с границами элемента в файле: (раздел, элемент, начало, конец).
+    # Границы считаются в символах; файл, открытый в кодировке latin-1, даёт байты
+    return _iter_json(f, sections, chunk_size, True)
+
+
+def _iter_json(f: TextIO, sections: Iterable[str], chunk_size: int, spans: bool) -> Iterator[tuple]:
+    wanted = set(sections)
+    stream = _JsonStream(f, chunk_size)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key in wanted and stream.peek() == "[":
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.pos += 1
+            else:
+                while True:
+                    if spans:
+                        stream.peek()
+                        start = stream.base + stream.pos
+                        item = stream.value()
+                        yield key, item, start, stream.base + stream.pos
+                    else:
+                        yield key, stream.value()
+                    if stream.peek() == ",":
+                        stream.pos += 1
+                        continue
+                    stream.expect("]")
+                    break
+        else:
+            stream.value()
+        if stream.peek() == ",":
+            stream.pos += 1
+            continue
+        stream.expect("}")
+        return
+
+
+XML_SECTIONS = ("Librarians", "Readers", "Books", "Rooms", "Clubs")
+
+
+def iter_xml_items(source, sections: Iterable[str] = XML_SECTIONS) -> Iterator[Tuple[str, Any]]:
+    # Выдаёт пары (раздел, элемент) по мере закрытия тегов <Library><Раздел><Элемент>.
+    # После обработки элемент очищается и удаляется из родителя
+    wanted = set(sections)
+    depth = 0
+    section_el = None
+    for event, el in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 2:
+                section_el = el
+            continue
+        depth -= 1
+        if depth == 2 and section_el is not None:
+            if section_el.tag in wanted:
+                yield section_el.tag, el
+            el.clear()
+            section_el.remove(el)
+        elif depth == 1:
+            section_el = None
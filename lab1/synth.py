@@ -0,0 +1,152 @@
+# Генератор синтетической библиотеки для замеров производительности.
+# При одном и том же seed и размерах получаются одни и те же книги, читатели,
+# брони и клубы (билеты, даты и выдачи не зависят от текущего времени), так что
+# замеры разных версий кода идут на одинаковых данных.
+# Объекты кладутся прямо в хранилища, а файлы пишут обычные save_to_json/save_to_xml —
+# формат снимков всегда совпадает с тем, что читает программа.
+# Запуск: python synth.py книг [читателей] [броней] [клубов] [каталог]
+
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from classes import Author, Location, Book, Reader, Librarian, Room, Club
+import stores
+from stores import catalog, reader_registry, librarian_registry
+
+FIRST_NAMES = ("Иван", "Анна", "Пётр", "Мария", "Сергей", "Ольга", "Дмитрий", "Елена", "Алексей", "Наталья")
+LAST_NAMES = ("Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Волков", "Соколов")
+WORDS = (
+    "теория", "история", "мастер", "война", "мир", "химия", "физика", "сад", "море",
+    "город", "ночь", "звезда", "дорога", "время", "сказка", "песня", "остров", "зима"
+)
+RACKS = 40
+SHELVES = 8
+ROOM_SEATS = 20
+# Доля выданных книг
+LENT = 0.2
+# Все даты отсчитываются от фиксированного дня, а не от сегодняшнего
+EPOCH = date(2025, 9, 1)
+
+
+class Scale(NamedTuple):
+    books: int
+    readers: int
+    bookings: int = 0
+    clubs: int = 1
+
+    @classmethod
+    def of(cls, books: int) -> 'Scale':
+        # Типичные пропорции: читатель на десять книг, бронь на двадцать
+        return cls(books, max(1, books // 10), books // 20, max(1, books // 10_000))
+
+
+def book_isbn(i: int) -> str:
+    return f"978-5-{i // 1000:06d}-{i % 1000:03d}-{i % 10}"
+
+
+def reader_name(i: int) -> tuple:
+    # Имя уникально: к имени из списка добавляется номер
+    return f"{FIRST_NAMES[i % len(FIRST_NAMES)]}{i}", LAST_NAMES[i % len(LAST_NAMES)]
+
+
+def populate(scale: Scale, seed: int = 0) -> None:
+    # Заменяет содержимое хранилищ синтетическими данными
+    rng = random.Random(seed)
+    librarian_registry.clear()
+    reader_registry.clear()
+    catalog.clear()
+    stores.rooms.clear()
+    stores.clubs.clear()
+
+    librarian_registry.add(Librarian("Ивановна", "Галина", "+79986573821"))
+
+    records = []
+    for i in range(scale.readers):
+        first, last = reader_name(i)
+        issued = EPOCH - timedelta(days=rng.randrange(365))
+        record = {
+            "first_name": first, "last_name": last,
+            "phone": f"+7{9000000000 + i:010d}", "email": f"reader{i}@mail.ru",
+            "reader_type": "regular",
+            "ticket": {
+                "ticket_id": f"{rng.getrandbits(32):08X}",
+                "issue_date": issued, "expiry_date": issued + timedelta(days=365)
+            }
+        }
+        kind = i % 5
+        if kind == 3:
+            record.update(reader_type="school", school_name=f"Школа №{i % 200 + 1}", grade=f"{i % 11 + 1}")
+        elif kind == 4:
+            record.update(reader_type="student", university="МГУ", course=i % 6 + 1)
+        records.append(record)
+    readers = Reader.from_records(records, trusted=True)
+    for reader in readers:
+        reader_registry.add(reader)
+
+    authors = [
+        Author.get_or_create(FIRST_NAMES[i % len(FIRST_NAMES)], f"Автор{i}")
+        for i in range(max(1, scale.books // 20))
+    ]
+    locations = [
+        Location.get_or_create(f"R{rack}", str(shelf))
+        for rack in range(RACKS) for shelf in range(1, SHELVES + 1)
+    ]
+    for i in range(scale.books):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).capitalize()
+        book = Book(title, rng.choice(authors), book_isbn(i), rng.choice(locations))
+        if readers and rng.random() < LENT:
+            reader = rng.choice(readers)
+            book.is_available = False
+            book.current_borrower = reader
+            book.due_date = EPOCH + timedelta(days=rng.randrange(30))
+            reader.borrowed_books.append(book)
+        catalog.add(book)
+
+    room = Room("Читальный зал", ROOM_SEATS)
+    start = datetime.combine(EPOCH, datetime.min.time()).replace(hour=9)
+    for _ in range(scale.bookings if readers else 0):
+        # Слоты по полчаса с 9:00 до 21:00; занятые слоты просто пропускаются
+        slot = start + timedelta(days=rng.randrange(60), minutes=30 * rng.randrange(24))
+        room.seats[rng.randint(1, ROOM_SEATS)].setdefault(slot, rng.choice(readers))
+    stores.rooms.append(room)
+
+    books = catalog.books
+    for c in range(scale.clubs):
+        club = Club()
+        for reader in rng.sample(readers, min(len(readers), 10)):
+            club.members.append(reader)
+            reader.in_club = True
+        club.meetings.append(start + timedelta(days=7 * c, hours=9))
+        club.current_book = rng.choice(books) if books else None
+        stores.clubs.append(club)
+
+
+def generate(scale: Scale, directory: str, seed: int = 0) -> tuple:
+    # Пишет data.json и data.xml в directory; возвращает пути к ним
+    import main
+    populate(scale, seed)
+    old = main.JSON_FILE, main.XML_FILE
+    main.JSON_FILE = os.path.join(directory, "data.json")
+    main.XML_FILE = os.path.join(directory, "data.xml")
+    try:
+        main.save_to_json()
+        main.save_to_xml()
+        return main.JSON_FILE, main.XML_FILE
+    finally:
+        main.JSON_FILE, main.XML_FILE = old
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Использование: python synth.py книг [читателей] [броней] [клубов] [каталог]")
+        sys.exit(1)
+    n = int(sys.argv[1])
+    default = Scale.of(n)
+    numbers = [int(a) for a in sys.argv[2:5]]
+    scale = Scale(n, *numbers, *default[1 + len(numbers):])
+    paths = generate(scale, sys.argv[5] if len(sys.argv) > 5 else ".")
+    print(f"Книг: {scale.books}, читателей: {scale.readers}, броней: {scale.bookings}, клубов: {scale.clubs}")
+    print("Записано: " + ", ".join(paths))
@@ -0,0 +1,146 @@
+import os
+import pickle
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from availability import RESERVED, TAKEN, NO_SEAT, DUPLICATE, SKIPPED
+from classes import Reader, Room
+from journal import Journal
+
+
+def _reader():
+    return Reader("Тест", "Читатель", "+79999999999", "t@mail.ru", "regular")
+
+
+def test_range_queries():
+    print("тест расписания мест: интервалы и поиск свободных мест\n")
+    room = Room("Зал", 4)
+    reader = _reader()
+    day = datetime(2030, 5, 20)
+    assert room.reserve_seat(1, day.replace(hour=15), reader)
+    # Прямая запись в словарь (как в загрузчиках) тоже попадает в расписание
+    room.seats[2][day.replace(hour=16, minute=30)] = reader
+
+    start, end = day.replace(hour=14), day.replace(hour=17)
+    assert not room.is_seat_free_between(1, start, end)
+    assert room.is_seat_free_between(1, day.replace(hour=16), day.replace(hour=20))
+    assert room.free_seats(start, end) == [3, 4]
+    assert room.find_free_seats(2, start, end) == [3, 4]
+    assert room.find_free_seats(3, start, end) == []
+    assert room.find_free_seats(1, day.replace(hour=9), day.replace(hour=12)) == [1]
+
+    # Интервал через полночь
+    assert room.reserve_range(3, day.replace(hour=22), day + timedelta(days=1, hours=2), reader)
+    assert len(room.seats[3]) == 4
+    assert not room.is_seat_free_between(3, day + timedelta(days=1, hours=1), day + timedelta(days=1, hours=3))
+    # Всё или ничего: пересечение с уже занятым слотом
+    assert not room.reserve_range(1, day.replace(hour=13), day.replace(hour=16), reader)
+    assert day.replace(hour=13) not in room.seats[1]
+
+    # Отмена бронирования освобождает слот
+    del room.seats[2][day.replace(hour=16, minute=30)]
+    assert room.free_seats(start, end) == [2, 3, 4]
+
+
+def test_has_future_bookings():
+    print("тест быстрой проверки будущих бронирований\n")
+    room = Room("Зал", 3)
+    reader = _reader()
+    now = datetime(2030, 5, 20, 12, 0)
+    assert not room.has_future_bookings(now)
+    room.reserve_seat(1, now - timedelta(hours=1), reader)
+    assert not room.has_future_bookings(now)
+    room.reserve_seat(2, now + timedelta(days=3), reader)
+    assert room.has_future_bookings(now)
+    room.seats[2].pop(now + timedelta(days=3))
+    assert not room.has_future_bookings(now)
+    # Два бронирования в одном часовом слоте
+    room.reserve_seat(3, now.replace(minute=10), reader)
+    room.reserve_seat(3, now.replace(minute=40), reader)
+    room.seats[3].pop(now.replace(minute=10))
+    assert room.has_future_bookings(now)
+    assert not room.is_seat_free_between(3, now, now + timedelta(hours=1))
+
+    copy = pickle.loads(pickle.dumps(room))
+    assert copy.has_future_bookings(now)
+    assert list(copy.seats[3]) == list(room.seats[3])
+
+
+def test_reserve_many():
+    print("тест пакетного бронирования: всё или ничего\n")
+    room = Room("Зал", 10)
+    reader = _reader()
+    dt = datetime(2030, 5, 20, 10)
+    room.reserve_seat(4, dt, reader)
+
+    results = room.reserve_many([(1, dt, reader), (4, dt, reader), (11, dt, reader), (1, dt, reader)])
+    assert results == [SKIPPED, TAKEN, NO_SEAT, DUPLICATE]
+    assert dt not in room.seats[1]
+
+    results = room.reserve_many([(1, dt, reader), (2, dt, reader)])
+    assert results == [RESERVED, RESERVED]
+    assert room.seats[2][dt] is reader
+
+    # Соседние места: 1, 2 и 4 заняты, первый свободный ряд из трёх — 5, 6, 7
+    assert room.reserve_adjacent(3, dt, dt + timedelta(hours=2), reader) == [5, 6, 7]
+    assert dt + timedelta(hours=1) in room.seats[7]
+    assert room.reserve_adjacent(4, dt, dt + timedelta(hours=1), reader) == []
+    assert room.find_adjacent_seats(3, dt + timedelta(hours=2), dt + timedelta(hours=3)) == [1, 2, 3]
+
+
+def test_reserve_many_is_faster_than_loop():
+    print("тест скорости: пакетное бронирование против цикла reserve_seat (с журналом)\n")
+    reader = _reader()
+    start = datetime(2030, 1, 1)
+    requests = [(seat, start + timedelta(hours=h), reader) for seat in range(1, 101) for h in range(0, 60, 3)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = Journal(os.path.join(tmp, "journal.log"), fsync=False)
+        journal.open()
+        room = Room("Зал", 100)
+        t = time.perf_counter()
+        for seat, dt, r in requests:
+            room.reserve_seat(seat, dt, r)
+        loop = time.perf_counter() - t
+
+        room = Room("Зал", 100)
+        t = time.perf_counter()
+        results = room.reserve_many(requests)
+        batch = time.perf_counter() - t
+        journal.close()
+    assert all(r == RESERVED for r in results)
+    assert journal.entries == len(requests) + 1
+    print(f"Цикл: {loop * 1000:.1f} мс, пакет: {batch * 1000:.1f} мс")
+
+
+def test_large_room_queries_are_fast():
+    print("тест скорости: 2000 мест, 90 дней бронирований\n")
+    room = Room("Большой зал", 2000)
+    reader = _reader()
+    start = datetime(2030, 1, 1, 9)
+    for seat in range(1, 2001, 2):
+        for day in range(0, 90, 3):
+            room.seats[seat][start + timedelta(days=day, hours=seat % 10)] = reader
+
+    query_start = start + timedelta(days=45)
+    t = time.perf_counter()
+    free = room.find_free_seats(50, query_start, query_start + timedelta(hours=3))
+    elapsed = time.perf_counter() - t
+    assert len(free) == 50
+    print(f"Поиск 50 свободных мест: {elapsed * 1000:.3f} мс")
+
+    t = time.perf_counter()
+    all_free = room.free_seats(query_start, query_start + timedelta(hours=3))
+    elapsed = time.perf_counter() - t
+    assert len(all_free) >= 1000
+    print(f"Все свободные места: {elapsed * 1000:.3f} мс")
+    assert room.has_future_bookings(start)
+
+
+if __name__ == "__main__":
+    test_range_queries()
+    test_has_future_bookings()
+    test_reserve_many()
+    test_reserve_many_is_faster_than_loop()
+    test_large_room_queries_are_fast()
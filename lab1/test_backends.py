@@ -0,0 +1,82 @@
+import os
+import tempfile
+from datetime import datetime
+
+from classes import Author, Location, Book, Student, Room
+from backends import SQLiteBackend
+from test_streaming import _graph
+
+import main
+
+
+def test_sqlite_import_and_crud():
+    print("тест SQLite-бэкенда: импорт снимка и запись каждой операции\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SQLiteBackend(os.path.join(tmp, "library.db"))
+        assert backend.is_empty()
+        main.load_from_json()
+        backend.import_current()
+        backend.attach()
+
+        librarian = main.librarians[0]
+        vasilisa = main.find_reader_by_name("Василиса", "Петрова")
+        book = main.find_book_by_isbn("978-5-699123-45-6")
+        librarian.lend_book_to_reader(book, vasilisa)
+        book.update_location(Location("Z9", "1"))
+
+        new_book = Book("Новая книга", Author("Тест", "Автор"), "NEW-1", Location("C1", "1"))
+        new_book.save()
+        student = Student("Маша", "Иванова", "+72222222222", "masha@mail.ru", "МГУ", 2)
+        student.save()
+        student.set_review("хорошо", 4)
+        student.update_education_place("МГУ, физфак")
+        student.take_book(new_book)
+        librarian.update_phone("+77777777777")
+
+        main.rooms[0].reserve_seat(2, datetime(2030, 1, 1, 10, 0), student)
+        hall = Room("Малый зал", 5)
+        hall.save()
+        hall.reserve_seat(1, datetime(2030, 1, 2, 12, 0), vasilisa)
+        assert hall.reserve_adjacent(3, datetime(2030, 1, 2, 12, 0), datetime(2030, 1, 2, 14, 0), student) == [2, 3, 4]
+        main.clubs[0].join(student)
+        main.clubs[0].add_meeting(datetime(2030, 2, 1, 18, 0))
+        main.clubs[0].set_current_book(new_book)
+        main.find_book_by_isbn("978-0-123456-78-9").delete()
+        main.find_reader_by_name("сергей", "петров").delete()
+
+        expected = _graph()
+        backend.detach()
+        backend.load()
+        assert _graph() == expected
+        backend.close()
+
+        # Повторное открытие той же базы
+        backend = SQLiteBackend(os.path.join(tmp, "library.db"))
+        assert not backend.is_empty()
+        backend.load()
+        assert _graph() == expected
+        assert main.find_book_by_isbn("NEW-1").current_borrower.university == "МГУ"
+        backend.close()
+        print("Данные в базе совпадают с памятью.")
+
+
+def test_sqlite_import_xml():
+    print("тест SQLite-бэкенда: импорт data.xml\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SQLiteBackend(os.path.join(tmp, "library.db"))
+        main.load_from_xml()
+        expected = _graph()
+        backend.import_current()
+        backend.load()
+        assert _graph() == expected
+        backend.close()
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+if __name__ == "__main__":
+    test_sqlite_import_and_crud()
+    test_sqlite_import_xml()
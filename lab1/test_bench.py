@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+
+import bench
+import synth
+
+import main
+
+
+def test_synth_is_deterministic():
+    scale = synth.Scale(300, 40, 50, 2)
+    with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+        json_a, xml_a = synth.generate(scale, a)
+        json_b, xml_b = synth.generate(scale, b)
+        for x, y in ((json_a, json_b), (xml_a, xml_b)):
+            with open(x, "rb") as f1, open(y, "rb") as f2:
+                assert f1.read() == f2.read()
+        with open(json_a, encoding="utf-8") as f:
+            data = json.load(f)
+    print(f"Книг: {len(data['books'])}, читателей: {len(data['readers'])}, "
+          f"броней: {len(data['rooms'][0]['bookings'])}, клубов: {len(data['clubs'])}")
+    assert len(data["books"]) == 300 and len(data["readers"]) == 40 and len(data["clubs"]) == 2
+    # Занятые слоты при генерации пропускаются, поэтому броней может быть чуть меньше
+    assert 0 < len(data["rooms"][0]["bookings"]) <= 50
+    assert {r["reader_type"] for r in data["readers"]} == {"regular", "school", "student"}
+    assert any(not b["is_available"] for b in data["books"])
+
+
+def test_synth_files_load():
+    scale = synth.Scale(200, 20, 30, 1)
+    old = main.JSON_FILE, main.XML_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            main.JSON_FILE, main.XML_FILE = synth.generate(scale, tmp)
+            main.load_from_json()
+            assert len(main.books) == 200 and len(main.readers) == 20
+            main.load_from_xml()
+            assert len(main.books) == 200 and len(main.readers) == 20
+            assert len(main.rooms) == 1 and len(main.clubs) == 1
+        finally:
+            main.JSON_FILE, main.XML_FILE = old
+
+
+def test_bench_baseline_and_regressions():
+    old_lookups = bench.LOOKUPS, bench.CHURN, bench.RESERVATIONS
+    bench.LOOKUPS = bench.CHURN = bench.RESERVATIONS = 500
+    try:
+        results = bench.run(synth.Scale.of(500), repeat=1)
+    finally:
+        bench.LOOKUPS, bench.CHURN, bench.RESERVATIONS = old_lookups
+    bench.report(results)
+    assert [r.name for r in results] == [s.name for s in bench.scenarios(synth.Scale.of(500))]
+    assert all(r.seconds > 0 for r in results)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "baseline.json")
+        bench.save_baseline(results, synth.Scale.of(500), path)
+        baseline = bench.load_baseline(path)
+    assert baseline["scale"]["books"] == 500
+    assert bench.compare(results, baseline) == []
+
+    # Сценарий вдвое медленнее базового — регрессия; в пределах порога — нет
+    slower = [results[0]._replace(seconds=results[0].seconds * 2), results[1]._replace(seconds=results[1].seconds * 1.1)]
+    regressions = bench.compare(slower, baseline, threshold=0.2)
+    assert [r.name for r in regressions] == [results[0].name]
+    assert round(regressions[0].ratio, 2) == 2.0
+    assert bench.load_baseline(os.path.join(tmp, "нет.json")) is None
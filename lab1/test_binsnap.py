@@ -0,0 +1,83 @@
+import os
+import tempfile
+from datetime import datetime
+
+from classes import School, Student, Club
+from test_streaming import _graph
+
+import main
+import binsnap
+
+
+def _roundtrip(tmp):
+    path = os.path.join(tmp, "data.bin")
+    expected = _graph()
+    binsnap.save_binary(path)
+    binsnap.load_binary(path)
+    assert _graph() == expected
+    return path
+
+
+def test_binary_roundtrip_with_json_and_xml_loaders():
+    print("тест бинарного снимка: тот же граф, что и у загрузчиков JSON/XML\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        main.load_from_json()
+        _roundtrip(tmp)
+        main.load_from_xml()
+        _roundtrip(tmp)
+        # Книга, выданная читателю, восстанавливается со ссылками в обе стороны
+        book = main.find_book_by_isbn("978-0-123456-78-0")
+        assert book.current_borrower.borrowed_books == [book]
+        print("Графы совпадают.")
+
+
+def test_binary_roundtrip_full_graph():
+    print("тест бинарного снимка: школьники, студенты, бронирования и клубы\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        main.load_from_json()
+        school = School("Петя", "Васечкин", "+71111111111", "petya@mail.ru", "Школа 1", "7Б")
+        student = Student("Маша", "Иванова", "+72222222222", "masha@mail.ru", "МГУ", 2)
+        school.save()
+        student.save()
+        student.set_review("хорошо", 4)
+        student.take_book(main.find_book_by_isbn("978-5-699123-45-6"))
+        main.rooms[0].reserve_seat(5, datetime(2030, 1, 1, 10, 0), school)
+        main.rooms[0].reserve_seat(5, datetime(2030, 1, 1, 11, 0), student)
+        main.clubs[0].join(school)
+        main.clubs[0].set_current_book(main.books[0])
+        main.clubs.append(Club())
+
+        _roundtrip(tmp)
+        assert main.find_reader_by_name("Петя", "Васечкин").grade == "7Б"
+        assert main.find_reader_by_name("Маша", "Иванова").course == 2
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+def test_prepare_captures_state_before_write():
+    print("тест бинарного снимка: запись видит состояние на момент prepare\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        main.load_from_json()
+        path = os.path.join(tmp, "data.bin")
+        expected = _graph()
+        write = binsnap.prepare_binary(path)
+        # Изменения после prepare (другой поток) в этот снимок не попадают
+        book = next(b for b in main.books if b.is_available)
+        main.readers[0].take_book(book)
+        write()
+        binsnap.load_binary(path)
+        assert _graph() == expected
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+if __name__ == "__main__":
+    test_binary_roundtrip_with_json_and_xml_loaders()
+    test_binary_roundtrip_full_graph()
+    test_prepare_captures_state_before_write()
@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+
+from bulk_import import bulk_import, import_into_library
+from backends import SQLiteBackend
+import synth
+
+import main
+
+
+def _reset():
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+def _partner_catalog(path: str, books: int, readers: int) -> None:
+    data = {"readers": [], "books": []}
+    for i in range(readers):
+        data["readers"].append({
+            "first_name": f"Читатель{i}", "last_name": "Партнёров",
+            "phone": f"+7999{i:07d}", "email": f"p{i}@mail.ru",
+            "reader_type": ("regular", "school", "student")[i % 3],
+            "school_name": "Школа №1", "grade": "7", "university": "МГУ", "course": 2,
+            "education_place": "", "in_club": False,
+            "ticket": {"ticket_id": f"T{i:07d}", "issue_date": "2025-01-01", "expiry_date": "2026-01-01"},
+            "review": {"text": "Хорошо", "rating": 4, "date": "2025-02-01T10:00:00"} if i % 2 else None
+        })
+    # Повтор читателя и читатель с неверным телефоном
+    data["readers"].append(dict(data["readers"][0]))
+    data["readers"].append(dict(data["readers"][1], first_name="Ошибка", phone="12345"))
+    for i in range(books):
+        data["books"].append({
+            "title": f"Книга партнёра {i}",
+            "author": {"first_name": f"Имя{i % 50}", "last_name": f"Фамилия{i % 50}", "bio": ""},
+            "isbn": f"PARTNER-{i}",
+            "location": {"rack": f"P{i % 20}", "shelf": str(i % 6)},
+            "is_available": i % 10 != 0,
+            "current_borrower": f"Читатель{i % readers} Партнёров" if i % 10 == 0 else None,
+            "due_date": "2030-01-15" if i % 10 == 0 else None
+        })
+    # Книга с ISBN, который уже есть в нашем каталоге
+    data["books"].append({
+        "title": "Чужая копия", "author": {"first_name": "А", "last_name": "Б"},
+        "isbn": "978-5-699123-45-6", "location": {"rack": "A", "shelf": "1"}, "is_available": True
+    })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _check(report, books: int, readers: int) -> None:
+    assert report.books == books and report.readers == readers
+    assert report.duplicates == 2 and report.rejected == 1
+    book = main.find_book_by_isbn("PARTNER-10")
+    assert book.current_borrower is main.find_reader_by_name("Читатель10", "Партнёров")
+    assert book in book.current_borrower.borrowed_books
+    assert str(book.due_date) == "2030-01-15"
+    assert main.find_book_by_isbn("978-5-699123-45-6").title != "Чужая копия"
+    assert main.find_reader_by_name("Читатель2", "Партнёров").university == "МГУ"
+    assert main.find_reader_by_name("Читатель1", "Партнёров").review.rating == 4
+    assert len(main.find_books_by_author("Имя3", "Фамилия3")) == books // 50
+
+
+def test_bulk_import_json_and_xml():
+    print("тест массового импорта каталога в несколько процессов\n")
+    books, readers = 5000, 300
+    old_xml = main.XML_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "partner.json")
+        _partner_catalog(path, books, readers)
+        try:
+            for workers in (0, 2):
+                main.load_from_json()
+                report = bulk_import(path, workers=workers, chunk=500)
+                print(f"Процессов: {workers}, записей в секунду: {report.per_second:,.0f}")
+                _check(report, books, readers)
+
+            # Тот же каталог, сохранённый в XML и импортированный обратно
+            main.XML_FILE = os.path.join(tmp, "partner.xml")
+            _reset()
+            bulk_import(path, workers=0)
+            main.save_to_xml()
+            main.load_from_json()
+            report = bulk_import(main.XML_FILE, workers=2, chunk=500)
+            assert report.books == books and report.readers == readers and report.duplicates == 1
+            assert main.find_book_by_isbn("PARTNER-10").current_borrower is not None
+        finally:
+            main.XML_FILE = old_xml
+    _reset()
+
+
+def test_import_into_library_is_saved():
+    # Импорт из командной строки дополняет сохранённую библиотеку, а не пустые хранилища
+    old = main.JSON_FILE, main.XML_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        partner = os.path.join(tmp, "partner.json")
+        _partner_catalog(partner, 200, 30)
+        try:
+            main.JSON_FILE, main.XML_FILE = synth.generate(synth.Scale(100, 10, 0, 1), tmp)
+            report = import_into_library(partner)
+            # "Чужая копия" в синтетическом каталоге не повторяется
+            assert report.books == 201 and report.readers == 30
+            _reset()
+            with open(main.JSON_FILE, encoding="utf-8") as f:
+                data = json.load(f)
+            isbns = {b["isbn"] for b in data["books"]}
+            assert "PARTNER-10" in isbns and synth.book_isbn(5) in isbns
+            assert len(data["books"]) == 301 and len(data["readers"]) == 40
+            main.load_from_xml()
+            assert main.find_book_by_isbn("PARTNER-10") is not None
+
+            # База пуста — сначала берётся data.json, результат пишется в базу
+            fresh = os.path.join(tmp, "fresh")
+            os.mkdir(fresh)
+            main.JSON_FILE, main.XML_FILE = synth.generate(synth.Scale(100, 10, 0, 1), fresh)
+            db = os.path.join(tmp, "library.db")
+            _reset()
+            import_into_library(partner, db=db)
+            _reset()
+            backend = SQLiteBackend(db)
+            backend.load()
+            assert len(main.books) == 301 and len(main.readers) == 40
+            assert main.find_book_by_isbn("PARTNER-10").current_borrower is not None
+            backend.close()
+        finally:
+            main.JSON_FILE, main.XML_FILE = old
+    _reset()
+
+
+if __name__ == "__main__":
+    test_bulk_import_json_and_xml()
+    test_import_into_library_is_saved()
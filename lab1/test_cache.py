@@ -0,0 +1,186 @@
+import os
+import tempfile
+
+import pytest
+
+from classes import Location
+from backends import SQLiteBackend, CachedSQLiteBackend
+from cache import ObjectCache, LRU, LFU
+import lazy
+import synth
+from test_streaming import _graph
+
+import main
+
+
+def test_lru_and_lfu_eviction_order():
+    lru = ObjectCache(2, LRU)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1
+    lru.put("c", 3)
+    # Вытеснена давно не использованная "b"
+    assert "b" not in lru and "a" in lru and "c" in lru
+
+    lfu = ObjectCache(2, LFU)
+    lfu.put("a", 1)
+    lfu.put("b", 2)
+    for _ in range(3):
+        lfu.get("a")
+    lfu.get("b")
+    lfu.put("c", 3)
+    # Вытеснена реже использованная "b", а не новая "c"
+    assert "b" not in lfu and "a" in lfu and "c" in lfu
+    assert lfu.get("нет") is None
+    print(f"LFU: {lfu.stats}")
+    assert (lfu.stats.hits, lfu.stats.misses, lfu.stats.evictions) == (4, 1, 1)
+
+    # Закреплённые записи не вытесняются и в capacity не входят
+    lru.pin("a")
+    for key in "defg":
+        lru.put(key, 0)
+    assert "a" in lru and lru.evictable == 2
+
+    with pytest.raises(ValueError):
+        ObjectCache(0)
+    with pytest.raises(ValueError):
+        ObjectCache(10, "fifo")
+
+
+def test_write_back_on_eviction():
+    storage = {}
+    evicted = []
+    cache = ObjectCache(2, write_back=storage.__setitem__, on_evict=lambda k, v: evicted.append(k))
+    cache.put("a", "A1")
+    cache.put("b", "B1")
+    cache.put("a", "A2", dirty=True)
+    cache.put("c", "C1")
+    cache.put("d", "D1")
+    # "b" вытеснена без записи, изменённая "a" записана перед вытеснением
+    assert evicted == ["b", "a"] and storage == {"a": "A2"}
+    assert cache.stats.writebacks == 1
+
+    cache.mark_dirty("d")
+    assert cache.flush() == 1 and storage["d"] == "D1" and not cache.dirty
+
+    # Без write_back изменённые записи держатся до mark_clean
+    pinned = ObjectCache(1)
+    pinned.put("x", 1, dirty=True)
+    pinned.put("y", 2)
+    pinned.put("z", 3)
+    assert "x" in pinned and "y" not in pinned
+    pinned.mark_clean("x")
+    # Сохранённая "x" снова вытесняемая и теперь самая свежая
+    assert "x" in pinned and "z" not in pinned and pinned.evictable == 1
+
+
+def _lend_and_return() -> None:
+    # Одинаковая работа для обеих баз
+    librarian = main.librarians[0]
+    for i in range(0, 600, 7):
+        book = main.find_book_by_isbn(synth.book_isbn(i))
+        if book.is_available:
+            librarian.lend_book_to_reader(book, main.find_reader_by_name(*synth.reader_name(i % 60)))
+        else:
+            book.current_borrower.return_borrowed_book(book)
+    for i in range(0, 60, 9):
+        main.find_reader_by_name(*synth.reader_name(i)).set_review(f"Отзыв {i}", i % 5 + 1)
+    main.find_book_by_isbn(synth.book_isbn(3)).update_location(Location.get_or_create("Z1", "1"))
+    librarian.edit_reader_education(main.find_reader_by_name(*synth.reader_name(2)), "МГУ, физфак")
+
+
+def test_cached_sqlite_writes_back_what_write_through_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {name: os.path.join(tmp, name) for name in ("through.db", "cached.db")}
+        synth.populate(synth.Scale(600, 60, 30, 1))
+        for path in paths.values():
+            backend = SQLiteBackend(path)
+            backend.import_current()
+            backend.close()
+
+        backend = SQLiteBackend(paths["through.db"])
+        backend.load()
+        backend.attach()
+        _lend_and_return()
+        backend.close()
+
+        backend = CachedSQLiteBackend(paths["cached.db"], capacity=10)
+        backend.load()
+        backend.attach()
+        try:
+            # Читатель не из клуба: его группа вытесняется, и выдача пишется в базу при вытеснении
+            reader = next(
+                r for r in (main.find_reader_by_name(*synth.reader_name(i)) for i in range(60) if i % 9)
+                if not r.in_club and not r.borrowed_books
+            )
+            book = next(
+                b for b in (main.find_book_by_isbn(synth.book_isbn(i)) for i in range(1, 600, 2))
+                if b.is_available
+            )
+            main.librarians[0].lend_book_to_reader(book, reader)
+            row = "SELECT borrower_id FROM books WHERE isbn = ?"
+            assert backend.conn.execute(row, (book.isbn,)).fetchone()[0] is None
+            for i in range(0, 600, 3):
+                main.find_book_by_isbn(synth.book_isbn(i))
+            assert backend.conn.execute(row, (book.isbn,)).fetchone()[0] is not None
+            reader.return_borrowed_book(book)
+            # Объект, который держал вызывающий код, вытеснен — изменение всё равно попадает в базу
+            assert main.find_reader_by_name(reader.first_name, reader.last_name, casefold=True) is reader
+            for i in range(0, 600, 3):
+                main.find_book_by_isbn(synth.book_isbn(i))
+            reader.set_review("Держал объект всю сессию", 5)
+            kept = reader.first_name, reader.last_name
+
+            _lend_and_return()
+            stats = backend.stats
+            print(f"Кэш SQLite: {stats}; в памяти объектов: {backend.resident}")
+            assert stats.evictions > 0 and stats.writebacks > 0 and stats.hits > 0
+            assert backend.cache.evictable <= 10
+            assert len(main.books) < 600
+        finally:
+            backend.close()
+
+        graphs, reviews = [], []
+        for path in paths.values():
+            backend = SQLiteBackend(path)
+            backend.load()
+            # Отзыв держателя объекта — единственное различие двух баз
+            reader = main.find_reader_by_name(*kept)
+            reviews.append(reader.review and reader.review.text)
+            reader.review = None
+            graphs.append(_graph())
+            backend.close()
+        assert reviews == [None, "Держал объект всю сессию"]
+        assert graphs[0] == graphs[1]
+    print("Отложенная запись дала ту же базу, что и запись каждого изменения.")
+
+
+def test_lazy_library_reports_cache_stats():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = synth.generate(synth.Scale(1000, 100, 0, 1), tmp)
+        library = lazy.LazyLibrary(path, capacity=30, policy=LFU)
+        library.open()
+        try:
+            # Рабочий набор из 20 книг и редкие обращения к остальным
+            for i in range(1000):
+                main.find_book_by_isbn(synth.book_isbn(i % 20))
+                if i % 10 == 0:
+                    main.find_book_by_isbn(synth.book_isbn(20 + i))
+            print(f"Ленивый JSON, LFU: {library.stats}")
+            assert library.stats.hit_ratio > 0.8
+            assert library.cache.evictable <= 30
+            assert library.stats.held == 0
+
+            # Изменённые группы (книга или читатель с выданными книгами) не вытесняются
+            # до save() и видны в stats.held
+            for i in range(40):
+                main.find_book_by_isbn(synth.book_isbn(100 + i)).update_location(Location.get_or_create("H", "1"))
+            assert library.stats.held > 30
+            assert len(library.cache) >= library.stats.held
+            library.save()
+            assert library.stats.held == 0
+            assert library.cache.evictable <= 30
+        finally:
+            library.close()
+            for items in (main.books, main.readers, main.librarians, main.rooms, main.clubs):
+                items.clear()
@@ -0,0 +1,206 @@
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+
+import pytest
+
+from classes import Author, Location, Book, Reader, Room, Club
+from journal import Journal
+
+import logs
+import main
+import snapshot
+
+
+def _reset():
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+def test_journal_replay():
+    print("тест журнала: операции восстанавливаются поверх снимка\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.log")
+        main.load_from_json()
+        journal = Journal(path, fsync=False)
+        journal.open()
+
+        librarian = main.librarians[0]
+        vasilisa = main.find_reader_by_name("Василиса", "Петрова")
+        book = main.find_book_by_isbn("978-5-699123-45-6")
+        librarian.lend_book_to_reader(book, vasilisa)
+
+        new_book = Book("Новая книга", Author("Тест", "Автор"), "NEW-1", Location("C1", "1"))
+        new_book.save()
+        new_reader = Reader("Новый", "Читатель", "+79999999999", "new@mail.ru", "regular")
+        new_reader.save()
+        new_reader.take_book(new_book)
+        librarian.accept_book_return(new_book, new_reader)
+
+        dt = datetime(2030, 1, 1, 10, 0)
+        main.rooms[0].reserve_seat(3, dt, vasilisa)
+        main.clubs[0].join(new_reader)
+        group = main.rooms[0].reserve_adjacent(2, dt, dt.replace(hour=12), new_reader)
+        journal.close()
+        assert journal.entries == 8
+
+        # Имитация сбоя: последняя запись не дописана
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"op": "lend", "isbn": "NEW-1", "rea')
+
+        main.load_from_json()
+        assert main.find_book_by_isbn("NEW-1") is None
+        assert Journal(path).replay() == 8
+
+        vasilisa = main.find_reader_by_name("Василиса", "Петрова")
+        new_reader = main.find_reader_by_name("Новый", "Читатель")
+        book = main.find_book_by_isbn("978-5-699123-45-6")
+        new_book = main.find_book_by_isbn("NEW-1")
+        assert book.current_borrower is vasilisa and book in vasilisa.borrowed_books
+        assert new_book is not None and new_book.is_available
+        assert main.rooms[0].seats[3][dt] is vasilisa
+        assert new_reader in main.clubs[0].members
+        assert all(main.rooms[0].seats[seat][dt.replace(hour=11)] is new_reader for seat in group)
+        print("Журнал восстановлен.")
+    _reset()
+
+
+def test_journal_compaction():
+    print("тест журнала: уплотнение в снимок каждые N операций\n")
+    snapshots = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.log")
+        journal = Journal(path, snapshot=lambda: snapshots.append(len(main.books)),
+                          compact_every=3, fsync=False)
+        journal.open()
+        author = Author("Тест", "Автор")
+        for i in range(7):
+            Book(f"Книга {i}", author, f"C-{i}", Location("R", "1")).save()
+        journal.close()
+
+        assert snapshots == [3, 6]
+        assert journal.entries == 1
+        with open(path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 1
+    _reset()
+
+
+def test_drop_until_survives_crash(monkeypatch):
+    print("тест журнала: сбой при подрезке не теряет записей\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.log")
+        journal = Journal(path, fsync=False)
+        journal.open()
+        author = Author("Тест", "Автор")
+        Book("Книга 1", author, "D-1", Location("R", "1")).save()
+        mark = journal.mark()
+        Book("Книга 2", author, "D-2", Location("R", "1")).save()
+
+        # Сбой перед подменой файла: журнал на диске остаётся целым
+        def crash(src, dst):
+            raise OSError("сбой")
+        monkeypatch.setattr(snapshot.os, "replace", crash)
+        with pytest.raises(OSError):
+            journal.drop_until(mark)
+        assert _lines(path) == 2
+        assert os.listdir(tmp) == ["journal.log"]
+
+        monkeypatch.undo()
+        journal.drop_until(mark)
+        Book("Книга 3", author, "D-3", Location("R", "1")).save()
+        journal.close()
+        with open(path, encoding="utf-8") as f:
+            assert [json.loads(line)["book"]["isbn"] for line in f] == ["D-2", "D-3"]
+    _reset()
+
+
+def test_clubs_by_name_and_skipped_entries():
+    print("тест журнала: клубы по названию, пропуски записей — в лог\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.log")
+        main.load_from_json()
+        main.clubs.append(Club("Фантастика"))
+        reader = main.readers[0]
+        journal = Journal(path, fsync=False)
+        journal.open()
+        main.clubs[-1].join(reader)
+        journal.close()
+        with open(path, encoding="utf-8") as f:
+            assert json.loads(f.readline())["club"] == "Фантастика"
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "lend", "isbn": main.books[0].isbn, "reader": "без фамилии"}) + "\n")
+
+        # После загрузки порядок клубов другой: запись находит клуб по названию
+        main.load_from_json()
+        main.clubs.insert(0, Club("Поэзия"))
+        main.clubs.append(Club("Фантастика"))
+        out = io.StringIO()
+        logs.configure(logs.WARNING, stream=out, structured=True)
+        try:
+            assert Journal(path, fsync=False).replay() == 2
+        finally:
+            logs.configure(logs.WARNING)
+        reader = main.find_reader_by_name(reader.first_name, reader.last_name)
+        assert reader in main.clubs[-1].members and reader not in main.clubs[0].members
+        skipped = json.loads(out.getvalue())
+        assert skipped["event"] == "journal_entry_skipped" and skipped["op"] == "lend"
+    _reset()
+
+
+def test_journal_covers_all_mutations():
+    print("тест журнала: правки, отзывы, залы и клубы тоже переживают сбой\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.log")
+        main.load_from_json()
+        journal = Journal(path, fsync=False)
+        journal.open()
+
+        book = main.books[0]
+        book.update_location(Location.get_or_create("Z9", "7"))
+        reader = main.readers[0]
+        reader.set_review("Журнал работает", 5)
+        reader.update_education_place("Новое место")
+        main.librarians[0].update_phone("+71112223344")
+        Room("Новый зал", 5).save()
+        main.rooms[0].update_name("Переименованный зал")
+        club = Club("Детектив")
+        club.save()
+        club.add_meeting(datetime(2030, 5, 1, 18, 0))
+        club.set_current_book(book)
+        removed = Club("Временный")
+        removed.save()
+        removed.delete()
+        journal.close()
+
+        main.load_from_json()
+        Journal(path).replay()
+
+        book = main.find_book_by_isbn(book.isbn)
+        assert (book.location.rack, book.location.shelf) == ("Z9", "7")
+        reader = main.find_reader_by_name(reader.first_name, reader.last_name)
+        assert (reader.review.text, reader.review.rating) == ("Журнал работает", 5)
+        assert reader.education_place == "Новое место"
+        assert main.librarians[0].phone == "+71112223344"
+        assert [r.name for r in main.rooms][0] == "Переименованный зал"
+        assert len(Room.find_by_name("Новый зал").seats) == 5
+        assert [c.key() for c in main.clubs][-1:] == ["Детектив"]
+        assert main.clubs[-1].meetings == [datetime(2030, 5, 1, 18, 0)]
+        assert main.clubs[-1].current_book is book
+    _reset()
+
+
+def _lines(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        return len(f.readlines())
+
+
+if __name__ == "__main__":
+    test_journal_replay()
+    test_journal_compaction()
+    test_clubs_by_name_and_skipped_entries()
+    test_journal_covers_all_mutations()
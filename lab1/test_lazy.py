@@ -0,0 +1,214 @@
+import json
+import os
+import tempfile
+import time
+
+from classes import Author, Location, Book, Reader
+import lazy
+from snapshot import STAGED_SUFFIX, promote_staged
+import synth
+
+import main
+
+
+def _open(path: str, capacity: int = lazy.CAPACITY) -> lazy.LazyLibrary:
+    library = lazy.LazyLibrary(path, capacity)
+    library.open()
+    return library
+
+
+def _close(library: lazy.LazyLibrary) -> None:
+    # Загруженные объекты остаются в хранилищах — убираем их для следующих тестов
+    library.close()
+    for items in (main.books, main.readers, main.librarians, main.rooms, main.clubs):
+        items.clear()
+
+
+def test_index_is_cached_next_to_snapshot():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = synth.generate(synth.Scale(500, 50, 20, 1), tmp)
+        built = lazy.open_index(path)
+        assert os.path.exists(path + lazy.INDEX_SUFFIX)
+        cached = lazy.SnapshotIndex.load(path)
+        assert cached.books == built.books and cached.readers == built.readers
+        assert len(built.books) == 500 and len(built.readers) == 50
+
+        # Смещения указывают ровно на записи
+        isbn = synth.book_isbn(123)
+        off, n = built.books[isbn]
+        with open(path, "rb") as f:
+            f.seek(off)
+            assert json.loads(f.read(n))["isbn"] == isbn
+
+        # Снимок изменился — сохранённый индекс больше не годится
+        time.sleep(0.01)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(" ")
+        assert lazy.SnapshotIndex.load(path) is None
+
+
+def test_lazy_lookup_and_links():
+    old = main.JSON_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = synth.generate(synth.Scale(2000, 200, 50, 1), tmp)
+        main.JSON_FILE = path
+        library = _open(path)
+        try:
+            print(f"В памяти после открытия: {library.resident}")
+            assert len(main.librarians) == 1 and len(main.rooms) == 1 and len(main.clubs) == 1
+            assert len(main.rooms[0].seats) == synth.ROOM_SEATS
+
+            lent = next(b for b in json.load(open(path, encoding="utf-8"))["books"] if b["current_borrower"])
+            book = main.find_book_by_isbn(lent["isbn"])
+            assert book.title == lent["title"] and not book.is_available
+            # Заёмщик загружен вместе с книгой, и ссылки указывают на одни объекты
+            reader = book.current_borrower
+            assert f"{reader.first_name} {reader.last_name}" == lent["current_borrower"]
+            assert book in reader.borrowed_books
+            assert all(b.current_borrower is reader for b in reader.borrowed_books)
+            assert main.find_reader_by_name(reader.first_name, reader.last_name) is reader
+            assert main.find_reader_by_name(reader.first_name.upper(), reader.last_name.lower(), casefold=True) is reader
+
+            assert main.find_book_by_isbn("нет-такого") is None
+            assert main.find_reader_by_name("Нет", "Такого") is None
+        finally:
+            _close(library)
+            main.JSON_FILE = old
+
+
+def test_lru_bounds_resident_objects():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = synth.generate(synth.Scale(3000, 300, 0, 1), tmp)
+        library = _open(path, capacity=50)
+        try:
+            pinned = library.resident
+            for i in range(3000):
+                assert main.find_book_by_isbn(synth.book_isbn(i)) is not None
+            print(f"Загружено 3000 книг, в памяти объектов: {library.resident}")
+            # 50 групп; группа читателя — он и его книги
+            assert library.cache.evictable == 50
+            assert library.resident < pinned + 50 * 6
+            assert len(main.books) == len(library._books)
+        finally:
+            _close(library)
+
+
+def test_lazy_save_merges_changes():
+    old = main.JSON_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = synth.generate(synth.Scale(1000, 100, 30, 1), tmp)
+        main.JSON_FILE = path
+        library = _open(path, capacity=20)
+        try:
+            librarian = main.librarians[0]
+            reader = main.find_reader_by_name(*synth.reader_name(5))
+            book = next(
+                main.find_book_by_isbn(synth.book_isbn(i)) for i in range(1000)
+                if main.find_book_by_isbn(synth.book_isbn(i)).is_available
+            )
+            librarian.lend_book_to_reader(book, reader)
+            # Изменённые объекты не вытесняются до сохранения
+            for i in range(1000):
+                main.find_book_by_isbn(synth.book_isbn(i))
+            assert main.find_book_by_isbn(book.isbn) is book
+            assert main.find_reader_by_name(reader.first_name, reader.last_name) is reader
+
+            new_book = Book("Новая книга", Author.get_or_create("Новый", "Автор"), "NEW-1", Location.get_or_create("N1", "1"))
+            main.catalog.add(new_book)
+            new_reader = Reader("Новый", "Читатель", "+79990001122", "new@mail.ru", "regular")
+            main.reader_registry.add(new_reader)
+            gone = main.find_book_by_isbn(synth.book_isbn(999))
+            removed = gone.is_available
+            if removed:
+                main.catalog.remove(gone)
+            reader.set_review("Быстро нашли книгу", 5)
+
+            library.save()
+            assert library.saves == 1 and not library._dirty_books and not library._dirty_readers
+        finally:
+            _close(library)
+
+        # Полная загрузка нового файла видит все изменения
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        books = {b["isbn"]: b for b in data["books"]}
+        readers = {(r["first_name"], r["last_name"]): r for r in data["readers"]}
+        assert books[book.isbn]["current_borrower"] == f"{reader.first_name} {reader.last_name}"
+        assert book.isbn in readers[(reader.first_name, reader.last_name)]["borrowed_books_isbn"]
+        assert readers[(reader.first_name, reader.last_name)]["review"]["rating"] == 5
+        assert "NEW-1" in books and ("Новый", "Читатель") in readers
+        assert (gone.isbn in books) != removed
+        assert len(data["rooms"][0]["bookings"]) > 0 and len(data["clubs"]) == 1
+
+        # Индекс нового файла сохранён и указывает на правильные записи
+        library = _open(path, capacity=20)
+        try:
+            assert lazy.SnapshotIndex.load(path) is not None
+            again = main.find_book_by_isbn(book.isbn)
+            assert again.current_borrower.first_name == reader.first_name
+            assert main.find_book_by_isbn("NEW-1").title == "Новая книга"
+            assert main.find_reader_by_name("Новый", "Читатель") is not None
+            for i in range(0, 1000, 7):
+                isbn = synth.book_isbn(i)
+                found = main.find_book_by_isbn(isbn)
+                if isbn == gone.isbn and removed:
+                    assert found is None
+                else:
+                    assert found.isbn == isbn
+        finally:
+            _close(library)
+            main.JSON_FILE = old
+
+
+def test_lazy_save_to_staged_target():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = synth.generate(synth.Scale(300, 30, 10, 1), tmp)
+        staged = path + STAGED_SUFFIX
+        with open(path, "rb") as f:
+            original = f.read()
+        library = lazy.LazyLibrary(path, capacity=20, target=staged)
+        library.open()
+        try:
+            reader = main.find_reader_by_name(*synth.reader_name(1))
+            reader.set_review("Первый", 4)
+            library.save()
+            # Снимок на месте, новые записи читаются уже из подготовленного файла
+            with open(path, "rb") as f:
+                assert f.read() == original
+            assert library.path == staged
+            reader.set_review("Второй", 5)
+            library.save()
+        finally:
+            _close(library)
+
+        promote_staged([(staged, path), (staged + lazy.INDEX_SUFFIX, path + lazy.INDEX_SUFFIX)])
+        assert lazy.SnapshotIndex.load(path) is not None
+        library = _open(path)
+        try:
+            assert main.find_reader_by_name(*synth.reader_name(1)).review.text == "Второй"
+        finally:
+            _close(library)
+
+
+def test_lazy_open_is_faster_than_full_load():
+    old = main.JSON_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = synth.generate(synth.Scale.of(20_000), tmp)
+        main.JSON_FILE = path
+        try:
+            started = time.perf_counter()
+            main.load_from_json()
+            full = time.perf_counter() - started
+            lazy.open_index(path)
+            started = time.perf_counter()
+            library = _open(path)
+            opened = time.perf_counter() - started
+            started = time.perf_counter()
+            main.find_book_by_isbn(synth.book_isbn(7777))
+            first = time.perf_counter() - started
+            _close(library)
+        finally:
+            main.JSON_FILE = old
+    print(f"Полная загрузка: {full * 1e3:.0f} мс, открытие по индексу: {opened * 1e3:.0f} мс, "
+          f"первая книга: {first * 1e3:.2f} мс")
+    assert opened < full
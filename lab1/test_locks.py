@@ -0,0 +1,250 @@
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from classes import Author, Location, Book, Reader, Room, Club
+from exceptions import BookNotAvailableError
+from journal import Journal
+import logs
+from locks import book_locks, book_key
+import stores
+
+import main
+
+
+# Книга, у которой чтение is_available отдаёт управление другим потокам: окно между
+# проверкой и выдачей становится широким, и без блокировок гонка проявляется сразу
+class _SlowBook(Book):
+    __slots__ = ()
+
+    @property
+    def is_available(self) -> bool:
+        value = Book.is_available.__get__(self)
+        time.sleep(0)
+        return value
+
+    @is_available.setter
+    def is_available(self, value: bool) -> None:
+        Book.is_available.__set__(self, value)
+
+
+def _readers(n: int) -> list:
+    return [Reader(f"Читатель{i}", "Тестов", "+79999999999", f"r{i}@mail.ru", "regular") for i in range(n)]
+
+
+def _books(n: int, cls=Book) -> list:
+    author = Author.get_or_create("Тест", "Автор")
+    location = Location.get_or_create("A1", "1")
+    books = [cls(f"Книга {i}", author, f"LOCK-{i}", location) for i in range(n)]
+    for b in books:
+        main.catalog.add(b)
+    return books
+
+
+def _run(workers: int, target) -> float:
+    barrier = threading.Barrier(workers)
+    errors = []
+
+    def worker(i):
+        barrier.wait()
+        try:
+            target(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    t = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert not errors, errors
+    return time.perf_counter() - t
+
+
+def test_each_book_is_lent_once():
+    print("тест блокировок: одну книгу не выдают двум читателям\n")
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        books = _books(300, _SlowBook)
+        readers = _readers(8)
+        won = [[] for _ in readers]
+
+        def grab(i):
+            for b in books:
+                try:
+                    readers[i].take_book(b)
+                    won[i].append(b)
+                except BookNotAvailableError:
+                    pass
+
+        _run(len(readers), grab)
+        assert sum(len(w) for w in won) == len(books)
+        for reader, w in zip(readers, won):
+            assert reader.borrowed_books == w
+            assert all(b.current_borrower is reader for b in w)
+        assert len(main.find_checked_out_books()) == len(books)
+    finally:
+        sys.setswitchinterval(old)
+        main.books.clear()
+
+
+def test_seat_and_club_races():
+    print("тест блокировок: место и членство в клубе\n")
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        room = Room("Зал", 5)
+        club = Club()
+        readers = _readers(8)
+        dt = datetime(2030, 1, 1, 10)
+        reserved = []
+
+        def race(i):
+            for h in range(50):
+                if room.reserve_seat(1, dt.replace(hour=h % 24, day=1 + h // 24), readers[i]):
+                    reserved.append(h)
+                club.join(readers[i % 4])
+
+        _run(len(readers), race)
+        assert sorted(reserved) == list(range(50))
+        assert len(room.seats[1]) == 50
+        assert len(club.members) == 4
+    finally:
+        sys.setswitchinterval(old)
+
+
+def test_lend_return_throughput():
+    print("тест нагрузки: выдача и возврат в несколько потоков\n")
+    books = _books(800)
+    readers = _readers(8)
+    rounds = 5
+    for workers in (1, 2, 4, 8):
+        def churn(i):
+            mine = books[i::workers]
+            for _ in range(rounds):
+                for b in mine:
+                    readers[i].take_book(b)
+                for b in mine:
+                    readers[i].return_borrowed_book(b)
+
+        elapsed = _run(workers, churn)
+        ops = 2 * rounds * len(books)
+        print(f"Потоков: {workers}, операций в секунду: {ops / elapsed:,.0f}")
+        assert all(b.is_available for b in books)
+        assert len(main.find_available_books()) == len(books)
+    main.books.clear()
+
+
+def test_events_are_emitted_under_lock():
+    print("тест блокировок: подписчики вызываются под блокировкой книги\n")
+    held = []
+
+    def listener(op, data):
+        # Другой поток не должен получить блокировку книги, пока идёт рассылка
+        lock = book_locks.lock_for(book_key(data["book"]))
+        free = []
+        t = threading.Thread(target=lambda: free.append(lock.acquire(blocking=False) and (lock.release() or True)))
+        t.start()
+        t.join()
+        held.append((op, not free[0]))
+
+    book = _books(1)[0]
+    reader = _readers(1)[0]
+    librarian = main.Librarian("Иванова", "Анна", "+79990000000")
+    stores.subscribe(listener)
+    try:
+        reader.take_book(book)
+        reader.return_borrowed_book(book)
+        librarian.lend_book_to_reader(book, reader)
+        librarian.accept_book_return(book, reader)
+    finally:
+        stores.unsubscribe(listener)
+    assert held == [("lend", True), ("return", True)] * 2
+    main.books.clear()
+
+
+def _state() -> tuple:
+    borrowers = {b.isbn: (b.current_borrower.first_name, b.current_borrower.last_name)
+                 for b in main.books if b.current_borrower is not None}
+    seats = {(room.name, seat, dt): (r.first_name, r.last_name)
+             for room in main.rooms for seat, times in room.seats.items() for dt, r in times.items()}
+    members = [sorted((m.first_name, m.last_name) for m in c.members) for c in main.clubs]
+    return borrowers, seats, members
+
+
+def _yield(op, data) -> None:
+    time.sleep(random.random() / 5000)
+
+
+def test_journal_replay_matches_concurrent_state():
+    print("тест блокировок: журнал после гонок восстанавливает то же состояние\n")
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.log")
+        main.load_from_json()
+        # Подписчик перед журналом отдаёт управление другим потокам: если бы событие
+        # уходило после снятия блокировки, чужая операция с той же книгой успевала бы
+        # попасть в журнал раньше
+        stores.subscribe(_yield)
+        journal = Journal(path, fsync=False)
+        journal.open()
+        try:
+            books = _books(20)
+            readers = _readers(8)
+            for r in readers:
+                r.save()
+            room, club = main.rooms[0], main.clubs[0]
+            dt = datetime(2030, 1, 1, 10)
+
+            def churn(i):
+                rnd = random.Random(i)
+                for n in range(300):
+                    book = rnd.choice(books)
+                    try:
+                        readers[i].take_book(book)
+                    except BookNotAvailableError:
+                        pass
+                    if book in readers[i].borrowed_books and rnd.random() < 0.7:
+                        readers[i].return_borrowed_book(book)
+                    room.reserve_seat(1 + n % len(room.seats), dt.replace(day=1 + n % 28, hour=i), readers[i])
+                    (club.join if rnd.random() < 0.5 else club.leave)(readers[rnd.randrange(len(readers))])
+
+            _run(len(readers), churn)
+        finally:
+            journal.close()
+            stores.unsubscribe(_yield)
+            sys.setswitchinterval(old)
+        expected = _state()
+        assert expected[0]
+
+        main.load_from_json()
+        out = io.StringIO()
+        logs.configure(logs.WARNING, stream=out, structured=True)
+        try:
+            Journal(path).replay()
+        finally:
+            logs.configure(logs.WARNING)
+        # Записи в порядке изменений: ни одна не отвергается при воспроизведении
+        assert out.getvalue() == ""
+        assert _state() == expected
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+if __name__ == "__main__":
+    test_each_book_is_lent_once()
+    test_seat_and_club_races()
+    test_lend_return_throughput()
+    test_events_are_emitted_under_lock()
+    test_journal_replay_matches_concurrent_state()
@@ -0,0 +1,89 @@
+import contextlib
+import io
+import json
+import time
+
+from classes import Author, Location, Book, Reader, Room
+import logs
+
+import main
+
+
+class _CountingBook(Book):
+    __slots__ = ()
+    formatted = 0
+
+    def __str__(self) -> str:
+        _CountingBook.formatted += 1
+        return super().__str__()
+
+
+def _book(isbn: str, cls=Book) -> Book:
+    book = cls("Книга для журнала", Author.get_or_create("Тест", "Автор"), isbn, Location.get_or_create("L1", "1"))
+    main.catalog.add(book)
+    return book
+
+
+def test_structured_messages():
+    print("тест журнала сообщений: уровни и структурный вывод\n")
+    out = io.StringIO()
+    logs.configure(logs.DEBUG, stream=out, structured=True)
+    try:
+        _book("LOG-1").save()
+        Book.find_by_isbn("LOG-1")
+        Reader.find_by_name("Нет", "Такого")
+        Room("Пустой зал").delete()
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [r["event"] for r in records] == [
+            "book_updated", "book_found", "reader_not_found", "room_delete_missing"
+        ]
+        assert records[1]["isbn"] == "LOG-1" and records[1]["level"] == "DEBUG"
+        assert records[1]["message"].startswith("Найдена книга: 'Книга для журнала'")
+        assert records[2]["reader"] == ["Нет", "Такого"]
+        assert records[3]["level"] == "WARNING"
+
+        # На уровне INFO поиск молчит, а изменения видны
+        out.seek(0)
+        out.truncate()
+        logs.configure(logs.INFO, stream=out)
+        Book.find_by_isbn("LOG-1")
+        main.find_book_by_isbn("LOG-1").delete()
+        assert out.getvalue() == "Книга ''Книга для журнала' (Тест Автор) — доступна' удалена из списка.\n"
+    finally:
+        logs.configure(logs.WARNING)
+        main.books.clear()
+
+
+def test_disabled_lookups_are_cheap():
+    print("тест журнала сообщений: выключенный уровень не форматирует сообщения\n")
+    logs.configure(logs.WARNING)
+    isbns = [_book(f"LOG-{i}", _CountingBook).isbn for i in range(100)]
+    rounds = 200
+    try:
+        # Прежнее поведение: print на каждый поиск (вывод перехвачен, терминала нет)
+        t = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(rounds):
+                for isbn in isbns:
+                    book = main.catalog.get(isbn)
+                    print(f"Найдена книга: {book}")
+        printed = time.perf_counter() - t
+        _CountingBook.formatted = 0
+
+        t = time.perf_counter()
+        for _ in range(rounds):
+            for isbn in isbns:
+                Book.find_by_isbn(isbn)
+        silent = time.perf_counter() - t
+        lookups = rounds * len(isbns)
+        print(f"Поисков: {lookups}. С print: {lookups / printed:,.0f}/с, "
+              f"с выключенным журналом: {lookups / silent:,.0f}/с")
+        assert _CountingBook.formatted == 0
+        assert silent < printed
+    finally:
+        main.books.clear()
+
+
+if __name__ == "__main__":
+    test_structured_messages()
+    test_disabled_lookups_are_cheap()
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from classes import Author, Location, Book, Reader, Librarian, Room
+from exceptions import BookNotAvailableError
+import metrics
+
+import main
+
+
+def test_metrics_collect_and_export():
+    print("тест метрик: счётчики, гистограммы и выгрузка в файл\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "library.prom")
+        json_path = os.path.join(tmp, "library.json")
+        main.load_from_json()
+        exporter = metrics.enable(text_path, interval=0.05)
+        metrics.registry.reset()
+        try:
+            librarian = main.librarians[0]
+            reader = main.readers[0]
+            book = next(b for b in main.books if b.is_available)
+            librarian.lend_book_to_reader(book, reader)
+            try:
+                librarian.lend_book_to_reader(book, reader)
+            except BookNotAvailableError:
+                pass
+            librarian.accept_book_return(book, reader)
+            main.rooms[0].reserve_seat(1, datetime(2030, 1, 1, 10), reader)
+
+            ops = metrics.registry.snapshot()["operations"]
+            lend = ops["Librarian.lend_book_to_reader"]
+            assert lend["count"] == 2 and lend["errors"] == 1
+            assert ops["Reader.take_book"]["count"] == 2
+            assert ops["Librarian.accept_book_return"]["count"] == 1
+            assert ops["Room.reserve_seat"]["count"] == 1
+            assert 0 < lend["p50"] <= lend["p99"]
+            counters = metrics.registry.snapshot()["counters"]
+            assert counters["lend"] == 1 and counters["return"] == 1
+
+            time.sleep(0.15)
+            with open(text_path, encoding="utf-8") as f:
+                text = f.read()
+            assert 'library_op_seconds_count{op="Librarian.lend_book_to_reader"} 2' in text
+            assert 'library_op_errors_total{op="Librarian.lend_book_to_reader"} 1' in text
+            metrics.registry.export(json_path)
+            with open(json_path, encoding="utf-8") as f:
+                assert json.load(f)["operations"]["Room.reserve_seat"]["count"] == 1
+        finally:
+            exporter.stop()
+            metrics.disable()
+    # После выключения методы снова исходные
+    assert Librarian.lend_book_to_reader.__qualname__ == "Librarian.lend_book_to_reader"
+    assert not hasattr(Librarian.lend_book_to_reader, "__wrapped__")
+    assert not hasattr(main.load_from_json, "__wrapped__")
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+def test_metrics_overhead():
+    print("тест метрик: накладные расходы на выдачу и возврат\n")
+    author, location = Author.get_or_create("Тест", "Автор"), Location.get_or_create("M1", "1")
+    books = [Book(f"Книга {i}", author, f"MET-{i}", location) for i in range(200)]
+    for b in books:
+        main.catalog.add(b)
+    reader = Reader("Метрик", "Тестов", "+79999999999", "m@mail.ru", "regular")
+    librarian = Librarian("Тестова", "Метрика", "+79999999998")
+    rounds = 20
+
+    def churn() -> float:
+        t = time.perf_counter()
+        for _ in range(rounds):
+            for b in books:
+                librarian.lend_book_to_reader(b, reader)
+            for b in books:
+                librarian.accept_book_return(b, reader)
+        return time.perf_counter() - t
+
+    try:
+        churn()
+        off = min(churn() for _ in range(3))
+        metrics.enable()
+        on = min(churn() for _ in range(3))
+        ops = 2 * rounds * len(books)
+        print(f"Операций: {ops}. Без метрик: {off / ops * 1e6:.2f} мкс, "
+              f"с метриками: {on / ops * 1e6:.2f} мкс на операцию")
+        assert metrics.registry.snapshot()["operations"]["Librarian.accept_book_return"]["count"] >= ops // 2
+    finally:
+        metrics.disable()
+        metrics.registry.reset()
+        main.books.clear()
+
+
+if __name__ == "__main__":
+    test_metrics_collect_and_export()
+    test_metrics_overhead()
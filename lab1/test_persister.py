@@ -0,0 +1,206 @@
+import io
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+from journal import Journal
+from persister import Persister
+from snapshot import STAGED_SUFFIX
+
+import logs
+import main
+
+
+def _reset():
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+def _wait(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _lines(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        return len(f.readlines())
+
+
+def test_group_commit():
+    print("тест фонового сохранения: снимок раз в несколько изменений\n")
+    old = main.JSON_FILE, main.XML_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        main.load_from_json()
+        main.JSON_FILE = os.path.join(tmp, "data.json")
+        main.XML_FILE = os.path.join(tmp, "data.xml")
+        journal_path = os.path.join(tmp, "journal.log")
+        journal = Journal(journal_path, fsync=False)
+        journal.open()
+        persister = Persister(main.snapshot_jobs, interval=60, max_changes=5, journal=journal)
+        persister.start()
+        try:
+            reader = main.readers[0]
+            room = main.rooms[0]
+            dt = main.datetime(2030, 1, 1, 10)
+            for seat in range(1, 5):
+                assert room.reserve_seat(seat, dt, reader)
+            # Четыре изменения: снимок ещё не нужен, всё лежит в журнале
+            time.sleep(0.1)
+            assert persister.snapshots == 0 and persister.pending == 4
+            assert not os.path.exists(main.JSON_FILE)
+            assert _lines(journal_path) == 4
+
+            assert room.reserve_seat(5, dt, reader)
+            assert _wait(lambda: persister.snapshots == 1)
+            assert os.path.exists(main.JSON_FILE) and os.path.exists(main.XML_FILE)
+            assert _lines(journal_path) == 0
+
+            # flush() — барьер: после него на диске всё, что было до вызова
+            book = next(b for b in main.books if b.is_available)
+            reader.take_book(book)
+            persister.close()
+            journal.close()
+            assert persister.snapshots == 2 and _lines(journal_path) == 0
+
+            with open(main.JSON_FILE, encoding="utf-8") as f:
+                assert len(json.load(f)["rooms"][0]["bookings"]) == 5
+            main.load_from_json()
+            assert main.find_book_by_isbn(book.isbn).due_date == book.due_date
+        finally:
+            persister.close(flush=False)
+            journal.close()
+            main.JSON_FILE, main.XML_FILE = old
+    _reset()
+
+
+def test_interval_and_discard():
+    print("тест фонового сохранения: снимок по таймеру и выход без сохранения\n")
+    old = main.JSON_FILE, main.XML_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        main.load_from_json()
+        main.JSON_FILE = os.path.join(tmp, "data.json")
+        main.XML_FILE = os.path.join(tmp, "data.xml")
+        persister = Persister(main.snapshot_jobs, interval=0.05, max_changes=1000)
+        persister.start()
+        try:
+            book = next(b for b in main.books if b.is_available)
+            main.readers[0].take_book(book)
+            assert _wait(lambda: persister.snapshots == 1)
+            main.readers[0].return_borrowed_book(book)
+            persister.close(flush=False)
+            assert persister.snapshots == 1
+        finally:
+            persister.close(flush=False)
+            main.JSON_FILE, main.XML_FILE = old
+    _reset()
+
+
+def test_background_error_is_logged():
+    print("тест фонового сохранения: ошибка снимка уходит в лог, а не в stdout\n")
+    def fail():
+        raise OSError("диск заполнен")
+
+    out = io.StringIO()
+    logs.configure(logs.WARNING, stream=out, structured=True)
+    persister = Persister(lambda: [fail], interval=60, max_changes=1)
+    persister.start()
+    try:
+        with pytest.raises(OSError):
+            persister.flush()
+    finally:
+        persister.close(flush=False)
+        logs.configure(logs.WARNING)
+    event = json.loads(out.getvalue())
+    assert event["event"] == "snapshot_failed" and event["error"] == "OSError"
+
+
+def test_operator_does_not_wait():
+    print("тест фонового сохранения: операции не ждут записи снимка\n")
+    old = main.JSON_FILE, main.XML_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        main.load_from_json()
+        main.JSON_FILE = os.path.join(tmp, "data.json")
+        main.XML_FILE = os.path.join(tmp, "data.xml")
+        reader = main.readers[0]
+        book = next(b for b in main.books if b.is_available)
+        rounds = 50
+        try:
+            # Прежний порядок: полный снимок после каждого изменения
+            t = time.perf_counter()
+            for _ in range(rounds):
+                reader.take_book(book)
+                main.save_data(pretty=True)
+                reader.return_borrowed_book(book)
+                main.save_data(pretty=True)
+            blocking = time.perf_counter() - t
+
+            persister = Persister(lambda: main.snapshot_jobs(pretty=True), interval=0.05, max_changes=50)
+            persister.start()
+            t = time.perf_counter()
+            for _ in range(rounds):
+                reader.take_book(book)
+                reader.return_borrowed_book(book)
+            background = time.perf_counter() - t
+            persister.close()
+            print(f"Снимок на каждое изменение: {blocking * 1000:.1f} мс, "
+                  f"фоновое сохранение: {background * 1000:.1f} мс, снимков: {persister.snapshots}")
+            assert background < blocking
+            assert 1 <= persister.snapshots <= 4
+        finally:
+            main.JSON_FILE, main.XML_FILE = old
+    _reset()
+
+
+def test_staged_snapshots_promote_or_discard():
+    print("тест фонового сохранения: подготовленные снимки и выход без сохранения\n")
+    old = main.JSON_FILE, main.XML_FILE, main.BIN_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        main.load_from_json()
+        main.JSON_FILE = os.path.join(tmp, "data.json")
+        main.XML_FILE = os.path.join(tmp, "data.xml")
+        main.BIN_FILE = os.path.join(tmp, "data.bin")
+        try:
+            main.save_data()
+            with open(main.JSON_FILE, encoding="utf-8") as f:
+                saved = f.read()
+            book = next(b for b in main.books if b.is_available)
+            for promote in (False, True):
+                persister = Persister(main.staged_jobs, interval=60, max_changes=1)
+                persister.start()
+                main.readers[0].take_book(book)
+                assert _wait(lambda: persister.snapshots == 1)
+                persister.close(flush=False)
+                # Фоновый снимок не трогает data.json
+                with open(main.JSON_FILE, encoding="utf-8") as f:
+                    assert f.read() == saved
+                assert os.path.exists(main.JSON_FILE + STAGED_SUFFIX)
+                if promote:
+                    assert main.promote_staged(main.staged_files()) == [main.JSON_FILE, main.XML_FILE]
+                else:
+                    main.discard_staged(main.staged_files())
+                    main.readers[0].return_borrowed_book(book)
+                assert sorted(os.listdir(tmp)) == ["data.json", "data.xml"]
+            with open(main.JSON_FILE, encoding="utf-8") as f:
+                data = json.load(f)
+            assert next(b for b in data["books"] if b["isbn"] == book.isbn)["current_borrower"]
+        finally:
+            main.JSON_FILE, main.XML_FILE, main.BIN_FILE = old
+    _reset()
+
+
+if __name__ == "__main__":
+    test_group_commit()
+    test_interval_and_discard()
+    test_background_error_is_logged()
+    test_operator_does_not_wait()
+    test_staged_snapshots_promote_or_discard()
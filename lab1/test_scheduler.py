@@ -0,0 +1,178 @@
+import os
+import tempfile
+from datetime import date, timedelta
+
+from classes import Author, Location, Book, Reader
+from backends import SQLiteBackend, CachedSQLiteBackend
+from scheduler import Scheduler, LOAN, TICKET, scheduler
+import lazy
+import synth
+
+import main
+
+
+def _reset():
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+def test_due_dates_and_scheduler():
+    print("тест планировщика: просроченные книги и билеты\n")
+    today = date.today()
+    scheduler = Scheduler()
+    scheduler.attach()
+    try:
+        author = Author.get_or_create("Тест", "Автор")
+        books = [Book(f"Книга {i}", author, f"ISBN-{i}", Location.get_or_create("A1", "1")) for i in range(4)]
+        for b in books:
+            b.save()
+        reader = Reader("Тест", "Читатель", "+79999999999", "t@mail.ru", "regular")
+        reader.save()
+        for b in books:
+            reader.take_book(b)
+        assert books[0].due_date == today + timedelta(days=14)
+        books[1].due_date = today - timedelta(days=3)
+        scheduler.schedule(LOAN, books[1], books[1].due_date)
+        reader.return_borrowed_book(books[2])
+        assert books[2].due_date is None
+
+        assert scheduler.peek().obj is books[1]
+        due = scheduler.pop_due(today)
+        assert [(d.kind, d.obj) for d in due] == [(LOAN, books[1])]
+        assert scheduler.pop_due(today) == []
+
+        # Через 15 дней истекают и билет (14 дней), и выдачи
+        due = scheduler.pop_due(today + timedelta(days=15))
+        assert [d.kind for d in due] == [TICKET, LOAN, LOAN]
+        assert {id(d.obj) for d in due if d.kind == LOAN} == {id(books[0]), id(books[3])}
+
+        # Устаревшие записи после очистки каталога не возвращаются
+        books[0].due_date = today + timedelta(days=20)
+        scheduler.schedule(LOAN, books[0], books[0].due_date)
+        main.books.clear()
+        assert scheduler.pop_due(today + timedelta(days=30)) == []
+    finally:
+        scheduler.detach()
+    _reset()
+
+
+def test_due_dates_persist():
+    print("тест сохранения сроков выдачи во всех форматах\n")
+    old = main.JSON_FILE, main.XML_FILE, main.BIN_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        main.load_from_json()
+        main.JSON_FILE = os.path.join(tmp, "data.json")
+        main.XML_FILE = os.path.join(tmp, "data.xml")
+        main.BIN_FILE = os.path.join(tmp, "data.bin")
+        try:
+            reader = main.readers[0]
+            book = next(b for b in main.books if b.is_available)
+            reader.take_book(book)
+            book.due_date = date(2030, 3, 1)
+            main.save_data()
+            main.save_to_binary()
+
+            for load in (main.load_from_json, main.load_from_xml, main.load_from_binary):
+                load()
+                assert main.find_book_by_isbn(book.isbn).due_date == date(2030, 3, 1), load
+
+            backend = SQLiteBackend(os.path.join(tmp, "library.db"))
+            backend.import_current()
+            backend.load()
+            assert main.find_book_by_isbn(book.isbn).due_date == date(2030, 3, 1)
+            backend.close()
+        finally:
+            main.JSON_FILE, main.XML_FILE, main.BIN_FILE = old
+    _reset()
+
+
+def test_reminders_after_json_roundtrip(capsys):
+    print("тест напоминаний после сохранения и загрузки data.json\n")
+    old = main.JSON_FILE, main.XML_FILE, main.BIN_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        main.load_from_json()
+        main.JSON_FILE = os.path.join(tmp, "data.json")
+        main.XML_FILE = os.path.join(tmp, "data.xml")
+        main.BIN_FILE = os.path.join(tmp, "data.bin")
+        try:
+            reader = main.readers[0]
+            book = next(b for b in main.books if b.is_available)
+            reader.take_book(book)
+            main.save_data()
+            main.load_from_json()
+
+            loaded = main.find_book_by_isbn(book.isbn)
+            borrower = loaded.current_borrower
+            assert (borrower.first_name, borrower.last_name) == (reader.first_name, reader.last_name)
+            assert loaded in borrower.borrowed_books
+
+            scheduler.attach()
+            try:
+                capsys.readouterr()
+                due = main.send_reminders(date.today() + timedelta(days=30))
+            finally:
+                scheduler.detach()
+            assert loaded in [d.obj for d in due if d.kind == LOAN]
+            assert f"читатель {reader.first_name} {reader.last_name}" in capsys.readouterr().out
+        finally:
+            main.JSON_FILE, main.XML_FILE, main.BIN_FILE = old
+    _reset()
+
+
+def _reminders(before: date) -> set:
+    scheduler.attach()
+    try:
+        return {(d.kind, d.obj.isbn if d.kind == LOAN else (d.obj.first_name, d.obj.last_name))
+                for d in scheduler.pop_due(before)}
+    finally:
+        scheduler.detach()
+
+
+def test_reminders_cover_objects_not_in_memory():
+    print("тест планировщика: напоминания в ленивом режиме и в режиме кэша SQLite\n")
+    before = synth.EPOCH + timedelta(days=10)
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = synth.generate(synth.Scale(2000, 200, 0, 1), tmp)
+        expected = _reminders(before)
+        assert {kind for kind, _ in expected} == {LOAN, TICKET}
+        backend = SQLiteBackend(os.path.join(tmp, "library.db"))
+        backend.import_current()
+        backend.close()
+
+        library = lazy.LazyLibrary(path, capacity=20)
+        library.open()
+        try:
+            assert _reminders(before) == expected
+            # Выдача после сохранения попадает в сроки нового индекса
+            book = next(b for b in map(main.find_book_by_isbn, map(synth.book_isbn, range(2000))) if b.is_available)
+            main.readers[0].take_book(book)
+            library.save()
+        finally:
+            library.close()
+            _reset()
+        library = lazy.LazyLibrary(path, capacity=20)
+        library.open()
+        try:
+            assert len(main.books) < 100
+            assert (LOAN, book.isbn) in _reminders(date.today() + timedelta(days=15))
+        finally:
+            library.close()
+            _reset()
+
+        backend = CachedSQLiteBackend(os.path.join(tmp, "library.db"), capacity=20)
+        backend.load()
+        try:
+            assert len(main.books) < 100
+            assert _reminders(before) == expected
+        finally:
+            backend.close()
+            _reset()
+
+
+if __name__ == "__main__":
+    test_due_dates_and_scheduler()
+    test_due_dates_persist()
+    test_reminders_cover_objects_not_in_memory()
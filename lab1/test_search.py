@@ -0,0 +1,161 @@
+import json
+import tempfile
+import threading
+import time
+
+from classes import Author, Location, Book
+from search import SearchIndex, search_books, tokenize
+import lazy
+import synth
+
+import main
+
+
+def test_search_index():
+    print("тест полнотекстового поиска: ё/е, префиксы, опечатки\n")
+    index = SearchIndex()
+    hawking = Author("Стивен", "Хокинг", "Физик-теоретик")
+    tolstoy = Author("Лев", "Толстой")
+    history = Book("Краткая история времени", hawking, "ISBN-1", Location("A3", "1"))
+    war = Book("Война и мир", tolstoy, "ISBN-2", Location("B1", "1"))
+    hedgehog = Book("Ёжик в тумане", Author("Сергей", "Козлов"), "ISBN-3", Location("B1", "2"))
+    for b in (history, war, hedgehog):
+        index.add(b)
+
+    assert tokenize("Ёжик в ТУМАНЕ") == ["ежик", "в", "тумане"]
+    assert index.search("ежик") == [hedgehog]
+    assert index.search("хокинг история") == [history]
+    assert index.search("физик") == [history]
+    # Подсказки при вводе: последнее слово — начало слова
+    assert index.search("вой") == [war]
+    assert index.complete("ист") == ["история"]
+    # Опечатка
+    assert index.search("Хоккинг", prefix=False) == [history]
+    assert index.search("толстой физик") == []
+
+    # Изменение названия переиндексирует книгу, удаление убирает её
+    war.title = "Анна Каренина"
+    index.add(war)
+    assert index.search("война") == []
+    assert index.search("каренина") == [war]
+    index.remove(war)
+    assert index.search("каренина") == []
+    assert index.complete("кар") == []
+    assert len(index) == 2
+
+
+def test_search_while_indexing():
+    print("тест поиска: запросы во время добавления книг\n")
+    index = SearchIndex()
+    author = Author.get_or_create("Тест", "Автор")
+    location = Location.get_or_create("A1", "1")
+    books = [Book(f"Том{i} слово{i % 50}", author, f"SW-{i}", location) for i in range(3000)]
+    errors = []
+    done = threading.Event()
+
+    def query():
+        try:
+            while not done.is_set():
+                index.search("слово1", limit=None)
+                index.search("том", limit=None)
+        except Exception as e:
+            errors.append(e)
+
+    reader = threading.Thread(target=query)
+    reader.start()
+    try:
+        for i, book in enumerate(books):
+            index.add(book)
+            if i % 500 == 0:
+                index.complete("том")
+    finally:
+        done.set()
+        reader.join()
+    assert not errors, errors
+    # Словарь, собранный слиянием кусков, совпадает с полной сортировкой
+    vocab = index.complete("", limit=10_000)
+    assert vocab == sorted(set(vocab)) and len(vocab) == 3000 + 50 + 2
+    assert len(index.search("слово7", prefix=False, limit=None)) == 60
+
+
+def test_search_follows_catalog():
+    print("тест поиска: индекс обновляется вместе с каталогом\n")
+    main.load_from_json()
+    first = main.books[0]
+    assert first in search_books(first.title)
+
+    book = Book("Сказка о потерянном времени", Author.get_or_create("Евгений", "Шварц"), "ISBN-MM", Location.get_or_create("C1", "1"))
+    book.save()
+    assert search_books("потерян") == [book]
+    Book("Обыкновенное чудо", book.author, "ISBN-MM", book.location).save()
+    assert search_books("потерянном") == []
+    assert search_books("шварц чуд") == [book]
+    book.delete()
+    assert search_books("шварц") == []
+
+    main.books.clear()
+    assert search_books(first.title) == []
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+def test_lazy_search_covers_snapshot():
+    print("тест поиска в ленивом режиме: находятся и не загруженные книги\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = synth.generate(synth.Scale(2000, 200, 0, 1), tmp)
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)["books"]
+        for library in (lazy.LazyLibrary(path, capacity=20), lazy.LazyLibrary(path, capacity=20)):
+            # Второй раз тексты берутся из сохранённого индекса, а не из разбора снимка
+            library.open()
+            try:
+                assert len(main.books) < 100
+                far = records[1999]
+                author = f"{far['author']['last_name']} {far['title']}"
+                assert far["isbn"] in [b.isbn for b in search_books(author, limit=None)]
+                expected = {r["isbn"] for r in records if r["author"]["last_name"] == far["author"]["last_name"]}
+                assert {b.isbn for b in search_books(far["author"]["last_name"], limit=None)} == expected
+                assert len(search_books(far["author"]["last_name"], limit=3)) == 3
+
+                # Удалённая книга пропадает из результатов, новая находится
+                gone = main.find_book_by_isbn(far["isbn"])
+                main.catalog.remove(gone)
+                assert far["isbn"] not in [b.isbn for b in search_books(author, limit=None)]
+                Book("Сказка о потерянном времени", Author.get_or_create("Евгений", "Шварц"),
+                     "ISBN-MM", Location.get_or_create("C1", "1")).save()
+                for i in range(0, 2000, 3):
+                    main.find_book_by_isbn(synth.book_isbn(i))
+                assert [b.isbn for b in search_books("шварц")] == ["ISBN-MM"]
+            finally:
+                library.close()
+                for items in (main.books, main.readers, main.librarians, main.rooms, main.clubs):
+                    items.clear()
+
+
+def test_search_speed():
+    print("тест скорости поиска: 100 000 книг\n")
+    index = SearchIndex()
+    authors = [Author(f"Имя{i}", f"Фамилия{i}") for i in range(1000)]
+    words = ["история", "война", "мир", "время", "море", "город", "сад", "ночь", "путь", "дом"]
+    location = Location("A1", "1")
+    for i in range(100_000):
+        title = f"{words[i % 10]} {words[i // 10 % 10]} том{i}"
+        index.add(Book(title, authors[i % 1000], f"ISBN-{i}", location))
+    index.complete("а")
+
+    for query in ("фамилия17 ночь", "том4242", "истори", "фомилия42"):
+        t = time.perf_counter()
+        found = index.search(query)
+        elapsed = time.perf_counter() - t
+        assert found, query
+        print(f"'{query}': {len(found)} книг, {elapsed * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    test_search_index()
+    test_search_while_indexing()
+    test_search_follows_catalog()
+    test_lazy_search_covers_snapshot()
+    test_search_speed()
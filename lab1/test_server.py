@@ -0,0 +1,128 @@
+import asyncio
+import json
+import os
+import tempfile
+
+from journal import Journal
+from server import LibraryServer
+
+import main
+
+
+async def _call(reader, writer, request) -> dict:
+    data = request if isinstance(request, bytes) else json.dumps(request, ensure_ascii=False).encode("utf-8")
+    writer.write(data + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def test_server_operations():
+    print("тест сервера: операции по построчному JSON-протоколу\n")
+    main.load_from_json()
+    vasilisa = ["василиса", "петрова"]
+    isbn = "978-5-699123-45-6"
+
+    async def scenario(tmp):
+        journal = Journal(os.path.join(tmp, "journal.log"), fsync=False)
+        journal.open()
+        server = LibraryServer(journal, flush_interval=0.01)
+        await server.start(port=0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+
+        assert (await _call(reader, writer, {"op": "ping"}))["ok"]
+        lent = await _call(reader, writer, {"op": "lend", "isbn": isbn, "reader": vasilisa})
+        assert lent["ok"] and lent["due_date"]
+        again = await _call(reader, writer, {"op": "lend", "isbn": isbn, "reader": vasilisa})
+        assert not again["ok"] and again["type"] == "BookNotAvailableError"
+        assert (await _call(reader, writer, {"op": "return", "isbn": isbn, "reader": vasilisa}))["ok"]
+
+        seat = {"op": "reserve", "room": main.rooms[0].name, "seat": 4,
+                "datetime": "2030-01-01T10:00:00", "reader": vasilisa}
+        assert (await _call(reader, writer, seat))["reserved"] is True
+        assert (await _call(reader, writer, seat))["reserved"] is False
+        assert (await _call(reader, writer, {"op": "review", "text": "Отлично", "rating": 5, "reader": vasilisa}))["ok"]
+        assert (await _call(reader, writer, {"op": "join", "club": 0, "reader": vasilisa}))["ok"]
+        found = await _call(reader, writer, {"op": "search", "query": main.books[0].title})
+        assert found["books"][0]["isbn"] == main.books[0].isbn
+
+        assert (await _call(reader, writer, {"op": "lend", "isbn": "нет", "reader": vasilisa}))["type"] == "BookNotFoundError"
+        assert (await _call(reader, writer, {"op": "lend", "isbn": isbn, "reader": ["Нет", "Такого"]}))["type"] == "ReaderNotFoundError"
+        assert (await _call(reader, writer, {"op": "lend"}))["type"] == "KeyError"
+        assert (await _call(reader, writer, {"op": "fly"}))["type"] == "LibraryError"
+        assert (await _call(reader, writer, b"{not json"))["type"] == "ValueError"
+
+        # Параллельные клиенты: каждая книга достаётся ровно одному
+        async def grab(i):
+            r, w = await asyncio.open_connection("127.0.0.1", server.port)
+            wins = 0
+            for b in main.books:
+                person = main.readers[i % len(main.readers)]
+                resp = await _call(r, w, {"op": "lend", "isbn": b.isbn, "reader": [person.first_name, person.last_name]})
+                wins += resp["ok"]
+            w.close()
+            return wins
+
+        available = sum(b.is_available for b in main.books)
+        assert sum(await asyncio.gather(*(grab(i) for i in range(6)))) == available
+
+        writer.close()
+        await server.close()
+        journal.close()
+        return journal.entries
+
+    with tempfile.TemporaryDirectory() as tmp:
+        entries = asyncio.run(scenario(tmp))
+        with open(os.path.join(tmp, "journal.log"), encoding="utf-8") as f:
+            assert len(f.readlines()) == entries
+
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+def test_mutation_is_answered_after_fsync():
+    print("тест сервера: ответ на изменение приходит после сброса журнала\n")
+    main.load_from_json()
+    person = [main.readers[0].first_name, main.readers[0].last_name]
+
+    async def scenario(tmp):
+        journal = Journal(os.path.join(tmp, "journal.log"), fsync=False)
+        journal.open()
+        synced = []
+        sync = journal.sync
+
+        def counting_sync():
+            sync()
+            synced.append(journal.entries)
+        journal.sync = counting_sync
+
+        server = LibraryServer(journal, flush_interval=0.05)
+        await server.start(port=0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        isbn = next(b for b in main.books if b.is_available).isbn
+        for request in ({"op": "lend", "isbn": isbn}, {"op": "return", "isbn": isbn},
+                        {"op": "review", "text": "Быстро", "rating": 5}):
+            assert (await _call(reader, writer, {**request, "reader": person}))["ok"]
+            # Запись этой операции уже сброшена на диск
+            assert synced and synced[-1] == journal.entries
+        assert (await _call(reader, writer, {"op": "ping"}))["ok"]
+        writer.close()
+        await server.close()
+        journal.close()
+        return len(synced)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assert asyncio.run(scenario(tmp)) >= 3
+
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+if __name__ == "__main__":
+    test_server_operations()
+    test_mutation_is_answered_after_fsync()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+from snapshot import atomic_write
+
+import main
+
+
+def test_atomic_write_keeps_old_file_on_error():
+    print("тест атомарной записи: при ошибке старый файл не портится\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.json")
+        atomic_write(path, lambda f: f.write("старое"))
+
+        def broken(f):
+            f.write("новое, но недописанное")
+            raise RuntimeError("сбой во время записи")
+
+        try:
+            atomic_write(path, broken)
+            assert False, "ожидалась ошибка"
+        except RuntimeError as e:
+            print(f"Ошибка: {e}")
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "старое"
+        assert os.listdir(tmp) == ["data.json"]
+
+
+def test_save_compact_and_pretty():
+    print("тест сохранения снимков в компактном и читаемом виде\n")
+    old_json, old_xml = main.JSON_FILE, main.XML_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        main.load_from_json()
+        expected = [str(b) for b in main.books]
+        main.JSON_FILE = os.path.join(tmp, "data.json")
+        main.XML_FILE = os.path.join(tmp, "data.xml")
+        try:
+            main.save_data()
+            with open(main.JSON_FILE, encoding="utf-8") as f:
+                compact = f.read()
+            assert "\n" not in compact
+            main.load_from_json()
+            assert [str(b) for b in main.books] == expected
+            main.load_from_xml()
+            assert len(main.books) == len(expected)
+
+            main.save_data(pretty=True)
+            with open(main.JSON_FILE, encoding="utf-8") as f:
+                assert len(f.read()) > len(compact)
+        finally:
+            main.JSON_FILE, main.XML_FILE = old_json, old_xml
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+if __name__ == "__main__":
+    test_atomic_write_keeps_old_file_on_error()
+    test_save_compact_and_pretty()
@@ -0,0 +1,225 @@
+from classes import Author, Location, Book, Reader, Librarian
+from exceptions import DuplicateBookError
+from records import book_from_dict
+from stores import Catalog, NameRegistry
+
+import main
+
+
+def test_catalog():
+    print("тест каталога книг с индексом по ISBN\n")
+    catalog = Catalog()
+    author = Author("Тест", "Автор")
+    books = [Book(f"Книга {i}", author, f"ISBN-{i}", Location("R", "1")) for i in range(5)]
+    for book in books:
+        catalog.add(book)
+
+    assert len(catalog) == 5
+    assert catalog.get("ISBN-3") is books[3]
+    assert catalog.get("нет такого") is None
+
+    # Повторный ISBN
+    try:
+        catalog.add(Book("Дубль", author, "ISBN-3", Location("R", "1")))
+        assert False, "ожидалась DuplicateBookError"
+    except DuplicateBookError as e:
+        print(f"Ошибка: {e}")
+
+    # Удаление переставляет последнюю книгу, индекс должен остаться верным
+    assert catalog.remove(books[1])
+    assert not catalog.remove(books[1])
+    assert catalog.get("ISBN-1") is None
+    for i in (0, 2, 3, 4):
+        assert catalog.get(f"ISBN-{i}") is books[i]
+
+    # Изменение списка в обход каталога
+    catalog.books.clear()
+    assert catalog.get("ISBN-0") is None
+    print("Каталог работает корректно.")
+
+
+def test_book_save_upsert():
+    print("тест Book.save: вставка и обновление по ISBN\n")
+    main.books.clear()
+    author = Author("Тест", "Автор")
+    book = Book("Старое название", author, "UPSERT-1", Location("R", "1"))
+    book.save()
+    Book("Новое название", author, "UPSERT-1", Location("R", "2")).save()
+
+    assert len(main.books) == 1
+    assert main.find_book_by_isbn("UPSERT-1") is book
+    assert book.title == "Новое название"
+    assert Book.find_by_isbn("UPSERT-1") is book
+    assert book.delete()
+    assert main.find_book_by_isbn("UPSERT-1") is None
+    main.books.clear()
+
+
+def test_name_registry():
+    print("тест реестра читателей по (имя, фамилия)\n")
+    registry = NameRegistry()
+    sergey = Reader("сергей", "петров", "+70000000000", "s@mail.ru", "regular")
+    ivan = Reader("Иван", "Иванов", "+71234567890", "ivan@mail.ru", "regular")
+    namesake = Reader("Иван", "Иванов", "+71111111111", "ivan2@mail.ru", "regular")
+    for reader in (sergey, ivan, namesake):
+        registry.add(reader)
+
+    assert registry.get("Иван", "Иванов") is ivan
+    assert registry.get("Сергей", "Петров") is None
+    assert registry.get("Сергей", "ПЕТРОВ", casefold=True) is sergey
+
+    # После удаления первого однофамильца находится второй
+    assert registry.remove(ivan)
+    assert registry.get("Иван", "Иванов") is namesake
+    assert registry.get("иван", "иванов", casefold=True) is namesake
+    assert len(registry) == 2
+    print("Реестр работает корректно.")
+
+
+def test_reader_and_librarian_crud():
+    print("тест Reader/Librarian save, find_by_name, delete\n")
+    main.readers.clear()
+    main.librarians.clear()
+    reader = Reader("Тест", "Читатель", "+79999999999", "t@mail.ru", "regular")
+    reader.save()
+    librarian = Librarian("Биб", "Тест", "+78888888888")
+    librarian.save()
+
+    assert main.find_reader_by_name("Тест", "Читатель") is reader
+    assert main.find_reader_by_name("тест", "читатель", casefold=True) is reader
+    assert Reader.find_by_name("Тест", "Читатель") is reader
+    assert Librarian.find_by_name("Тест", "Биб") is librarian
+    assert reader.delete()
+    assert librarian.delete()
+    assert main.find_reader_by_name("Тест", "Читатель") is None
+    assert len(main.readers) == 0 and len(main.librarians) == 0
+
+
+def test_compact_objects():
+    print("тест компактных объектов: __slots__ и общие Location\n")
+    data = [
+        {"title": f"Книга {i}", "isbn": f"ISBN-{i}", "is_available": True,
+         "author": {"first_name": "Тест", "last_name": "Автор"},
+         "location": {"rack": "A1", "shelf": str(i % 2)}}
+        for i in range(4)
+    ]
+    books = [book_from_dict(b) for b in data]
+    assert books[0].location is books[2].location
+    assert books[0].location is not books[1].location
+    assert books[0].author is books[3].author
+    assert not hasattr(books[0], "__dict__")
+
+    reader = Reader("Тест", "Читатель", "+79999999999", "t@mail.ru", "regular")
+    try:
+        reader.nickname = "x"
+        assert False, "ожидалась ошибка"
+    except AttributeError as e:
+        print(f"Ошибка: {e}")
+
+def test_flyweights_and_reverse_lookups():
+    print("тест общих авторов и мест, поиск книг по автору и стеллажу\n")
+    author = Author.get_or_create("Тест", "Автор")
+    assert Author.get_or_create(" Тест ", "Автор", "биография") is author
+    assert author.bio == "биография"
+    assert Location.get_or_create("A3", "1") is Location.get_or_create("A3", "1")
+
+    for i in range(6):
+        Book(f"Книга {i}", author, f"ISBN-{i}", Location.get_or_create("A3", str(i % 3))).save()
+    Book("Чужая", Author.get_or_create("Другой", "Автор"), "ISBN-X", Location.get_or_create("B1", "1")).save()
+    assert len(main.find_books_by_author("Тест", "Автор")) == 6
+    assert len(main.find_books_by_location("A3")) == 6
+    assert [b.isbn for b in main.find_books_by_location("A3", "1")] == ["ISBN-1", "ISBN-4"]
+
+    book = main.find_book_by_isbn("ISBN-1")
+    book.update_location(Location.get_or_create("B1", "1"))
+    assert len(main.find_books_by_location("B1", "1")) == 2
+    assert book not in main.find_books_by_location("A3")
+    Book("Новое название", Author.get_or_create("Другой", "Автор"), "ISBN-0", book.location).save()
+    assert len(main.find_books_by_author("Тест", "Автор")) == 5
+    assert main.find_book_by_isbn("ISBN-X").delete()
+    assert [b.isbn for b in main.find_books_by_author("Другой", "Автор")] == ["ISBN-0"]
+
+    main.load_from_json()
+    assert main.find_books_by_author("Тест", "Автор") == []
+    first = main.books[0]
+    assert main.find_books_by_author(first.author.first_name, first.author.last_name)[0] is first
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+def test_secondary_indexes():
+    print("тест вторичных индексов: автор, стеллаж, доступность\n")
+    authors = [Author.get_or_create("Автор", str(i)) for i in range(4)]
+    for i in range(40):
+        Book(f"Книга {i}", authors[i % 4], f"ISBN-{i}", Location.get_or_create(f"R{i % 5}", str(i % 2))).save()
+    reader = Reader("Тест", "Читатель", "+79999999999", "t@mail.ru", "regular")
+    for i in range(0, 40, 3):
+        reader.take_book(main.find_book_by_isbn(f"ISBN-{i}"))
+    reader.return_borrowed_book(main.find_book_by_isbn("ISBN-0"))
+    main.find_book_by_isbn("ISBN-1").update_location(Location.get_or_create("R9", "0"))
+    main.find_book_by_isbn("ISBN-2").delete()
+
+    def scan(author=None, rack=None, shelf=None, available=None):
+        return [
+            b for b in main.books
+            if (author is None or (b.author.first_name, b.author.last_name) == author)
+            and (rack is None or b.location.rack == rack)
+            and (shelf is None or b.location.shelf == shelf)
+            and (available is None or b.is_available == available)
+        ]
+
+    def same(found, expected):
+        return sorted(b.isbn for b in found) == sorted(b.isbn for b in expected)
+
+    assert same(main.find_available_books(), scan(available=True))
+    assert same(main.find_checked_out_books(), scan(available=False))
+    assert len(main.find_checked_out_books()) == 13
+    for query in (
+        {"author": ("Автор", "1")},
+        {"author": ("Автор", "1"), "available": True},
+        {"rack": "R0", "available": False},
+        {"rack": "R3", "shelf": "1", "author": ("Автор", "3")},
+        {"rack": "R9"},
+        {"author": ("Нет", "Такого")},
+    ):
+        assert same(main.find_books(**query), scan(**query)), query
+    assert len(main.find_books()) == 39
+    main.books.clear()
+
+
+def test_direct_list_changes_update_indexes():
+    print("тест хранилищ: замена элементов списка в обход каталога\n")
+    catalog = Catalog()
+    author = Author.get_or_create("Тест", "Автор")
+    old = [Book(f"Книга {i}", author, f"OLD-{i}", Location.get_or_create("A1", "1")) for i in range(3)]
+    new = [Book(f"Книга {i}", author, f"NEW-{i}", Location.get_or_create("B1", "1")) for i in range(3)]
+    for b in old:
+        catalog.add(b)
+
+    # Длина не меняется, но индексы всё равно видят замену
+    catalog.books[0] = new[0]
+    assert catalog.get("OLD-0") is None and catalog.get("NEW-0") is new[0]
+    assert catalog.contains(new[0]) and not catalog.contains(old[0])
+    catalog.books[1:] = new[1:]
+    assert [catalog.get(f"NEW-{i}") for i in range(3)] == new
+    assert catalog.by_location("A1", "1") == [] and len(catalog.by_location("B1", "1")) == 3
+
+    # Удаление через каталог после замены убирает нужный объект
+    assert catalog.remove(new[1])
+    assert sorted(b.isbn for b in catalog.books) == ["NEW-0", "NEW-2"]
+    catalog.books.reverse()
+    assert catalog.remove(new[0]) and catalog.books == [new[2]]
+
+
+if __name__ == "__main__":
+    test_catalog()
+    test_book_save_upsert()
+    test_name_registry()
+    test_reader_and_librarian_crud()
+    test_compact_objects()
+    test_flyweights_and_reverse_lookups()
+    test_secondary_indexes()
+    test_direct_list_changes_update_indexes()
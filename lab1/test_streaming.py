@@ -0,0 +1,130 @@
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+
+import classes
+import logs
+import main
+from streaming import iter_json_items
+
+
+def test_iter_json_items_small_chunks():
+    print("тест потокового разбора JSON маленькими порциями\n")
+    with open("data.json", encoding="utf-8") as f:
+        expected = json.load(f)
+    for chunk_size in (1, 7, 4096):
+        with open("data.json", encoding="utf-8") as f:
+            got = {}
+            for section, item in iter_json_items(f, chunk_size=chunk_size):
+                got.setdefault(section, []).append(item)
+        for section in ("librarians", "readers", "books", "rooms", "clubs"):
+            assert got.get(section, []) == expected[section], (chunk_size, section)
+
+    # Числа на границе порций и неизвестные разделы
+    text = '{"meta": {"v": 12345}, "books": [1234567, 2.5e3], "clubs": []}'
+    items = list(iter_json_items(io.StringIO(text), chunk_size=3))
+    assert items == [("books", 1234567), ("books", 2500.0)]
+
+
+def test_load_from_json_deferred_fixups():
+    print("тест загрузки с отложенным связыванием читателей и книг\n")
+    # Клубы и книги идут раньше читателей, на которых они ссылаются
+    data = {
+        "clubs": [{
+            "members_names": {"first_name": "Иван", "last_name": "Иванов"},
+            "meetings": ["2025-10-25T18:00:00"],
+            "current_book_isbn": "ISBN-1"
+        }],
+        "books": [{
+            "title": "Книга",
+            "author": {"first_name": "Тест", "last_name": "Автор", "bio": ""},
+            "isbn": "ISBN-1",
+            "location": {"rack": "A1", "shelf": "1"},
+            "is_available": False,
+            "current_borrower_name": {"first_name": "Иван", "last_name": "Иванов"}
+        }],
+        "rooms": [{"name": "Зал", "bookings": [
+            {"seat_number": 2, "datetime": "2030-01-01T10:00:00", "reader": "Иван Иванов"},
+            {"seat_number": 999, "datetime": "2030-01-01T10:00:00", "reader": "Иван Иванов"}
+        ]}],
+        "librarians": [{"first_name": "Галина", "last_name": "Ивановна", "phone": "+79986573821"}],
+        "readers": [{
+            "first_name": "Иван", "last_name": "Иванов", "phone": "+71234567890",
+            "email": "ivan@mail.ru", "reader_type": "regular", "in_club": False,
+            "ticket": {"ticket_id": "A1", "issue_date": "2025-10-19", "expiry_date": "2026-10-19"},
+            "review": None
+        }]
+    }
+    old_file = main.JSON_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        main.JSON_FILE = os.path.join(tmp, "data.json")
+        with open(main.JSON_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        out = io.StringIO()
+        logs.configure(logs.WARNING, stream=out, structured=True)
+        try:
+            main.load_from_json()
+        finally:
+            logs.configure(logs.WARNING)
+            main.JSON_FILE = old_file
+
+    reader = main.find_reader_by_name("Иван", "Иванов")
+    book = main.find_book_by_isbn("ISBN-1")
+    assert book.current_borrower is reader
+    assert reader.borrowed_books == [book]
+    assert main.clubs[0].members == [reader] and reader.in_club
+    assert main.clubs[0].current_book is book
+    assert len(main.librarians) == 1
+    # Бронирование несуществующего места пропускается с предупреждением в лог
+    assert main.rooms[0].seats[2][datetime(2030, 1, 1, 10)] is reader
+    skipped = json.loads(out.getvalue())
+    assert skipped["event"] == "booking_skipped" and skipped["room"] == "Зал"
+    print("Связи восстановлены.")
+
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+def _graph():
+    # Сводка графа объектов для сравнения двух загрузчиков
+    return (
+        [(l.first_name, l.last_name, l.phone) for l in main.librarians],
+        [(r.first_name, r.last_name, r.reader_type, r.education_place, r.in_club,
+          r.ticket.ticket_id, r.ticket.expiry_date, r.review and (r.review.text, r.review.rating),
+          [b.isbn for b in r.borrowed_books]) for r in main.readers],
+        [(b.isbn, b.title, str(b.author), b.author.bio, str(b.location), b.is_available,
+          b.current_borrower and str(b.current_borrower)) for b in main.books],
+        [(room.name, {s: {dt: str(r) for dt, r in t.items()} for s, t in room.seats.items()})
+         for room in main.rooms],
+        [(c.key(), [str(m) for m in c.members], c.meetings, c.current_book and c.current_book.isbn)
+         for c in main.clubs],
+    )
+
+
+def test_load_from_xml_incremental_matches_dom_loader():
+    print("тест: iterparse-загрузчик строит тот же граф, что и load_from_xml\n")
+    main.load_from_xml()
+    expected = _graph()
+    main.load_from_xml_incremental()
+    assert _graph() == expected
+    # Книга из раздела Books ссылается на читателя из более позднего раздела Readers
+    book = main.find_book_by_isbn("978-0-123456-78-0")
+    assert book.current_borrower is main.find_reader_by_name("Иван", "Иванов")
+    print("Графы совпадают.")
+
+    main.books.clear()
+    main.readers.clear()
+    main.librarians.clear()
+    main.rooms.clear()
+    main.clubs.clear()
+
+
+if __name__ == "__main__":
+    test_iter_json_items_small_chunks()
+    test_load_from_json_deferred_fixups()
+    test_load_from_xml_incremental_matches_dom_loader()
@@ -0,0 +1,103 @@
+import time
+
+from classes import Reader, School, Student, Librarian
+from exceptions import ValidationError
+import validators
+
+
+def _records(n: int) -> list:
+    records = []
+    for i in range(n):
+        r = {"first_name": f" Читатель{i} ", "last_name": "Тестов", "phone": f"+7999{i:07d}",
+             "email": f"r{i}@mail.ru", "reader_type": ("regular", "school", "student")[i % 3],
+             "ticket": {"ticket_id": f"T{i:07d}", "issue_date": "2025-01-01", "expiry_date": "2026-01-01"}}
+        if r["reader_type"] == "school":
+            r.update(school_name="Школа №1", grade="7")
+        elif r["reader_type"] == "student":
+            r.update(university="МГУ", course=2)
+        records.append(r)
+    return records
+
+
+def test_constructor_messages():
+    print("тест проверок: сообщения конструкторов не изменились\n")
+    cases = [
+        (lambda: Reader("Иван", "Иванов", "89991234567", "i@mail.ru", "regular"),
+         ValueError, "Неверный формат телефона. Пример: +70000000000"),
+        (lambda: Reader("Иван", " ", "+79991234567", "i@mail.ru", "regular"),
+         ValueError, "last_name не может быть пустым."),
+        (lambda: Reader("Иван", "Иванов", "+79991234567", "без собаки", "regular"),
+         ValueError, "Некорректный email."),
+        (lambda: Student("Иван", "Иванов", "+79991234567", "i@mail.ru", "МГУ", 9),
+         ValueError, "course должен быть от 1 до 6."),
+        (lambda: Librarian("Иванова", 5, "+79991234567"),
+         TypeError, "first_name должен быть строкой."),
+    ]
+    for make, error, message in cases:
+        try:
+            make()
+            assert False, "ожидалась ошибка"
+        except error as e:
+            print(f"Ошибка: {e}")
+            assert str(e) == message
+    librarian = Librarian("Иванова", "Галина", "+79991234567")
+    assert not librarian.update_phone("123")
+    assert librarian.update_phone(" +79990000000 ") and librarian.phone == "+79990000000"
+
+
+def test_validate_many_reports_all_errors():
+    print("тест проверок: все ошибки пачки сообщаются сразу\n")
+    records = _records(6)
+    records[1]["phone"] = "12345"
+    records[1]["email"] = "нет"
+    records[2]["course"] = "второй"
+    del records[4]["grade"]
+    valid, errors = validators.validate_many(records, validators.reader_schema)
+    assert len(valid) == 3 and valid[0]["first_name"] == "Читатель0"
+    assert [(i, field) for i, field, _ in errors] == [(1, "phone"), (1, "email"), (2, "course"), (4, "grade")]
+    try:
+        Reader.from_records(records)
+        assert False, "ожидалась ошибка"
+    except ValidationError as e:
+        print(f"Ошибка: {e}")
+        assert len(e.errors) == 4
+
+    readers = Reader.from_records(_records(3))
+    assert [type(r) for r in readers] == [Reader, School, Student]
+    assert readers[0].first_name == "Читатель0" and readers[2].course == 2
+    assert readers[1].ticket.owner is readers[1] and readers[1].borrowed_books == []
+
+
+def test_batch_and_trusted_speed():
+    print("тест проверок: пачка и доверенная загрузка быстрее конструкторов\n")
+    records = _records(30_000)
+    classes = {"school": School, "student": Student}
+
+    t = time.perf_counter()
+    for r in records:
+        cls = classes.get(r["reader_type"])
+        if cls is School:
+            School(r["first_name"], r["last_name"], r["phone"], r["email"], r["school_name"], r["grade"])
+        elif cls is Student:
+            Student(r["first_name"], r["last_name"], r["phone"], r["email"], r["university"], r["course"])
+        else:
+            Reader(r["first_name"], r["last_name"], r["phone"], r["email"], r["reader_type"])
+    one_by_one = time.perf_counter() - t
+
+    t = time.perf_counter()
+    Reader.from_records(records)
+    batch = time.perf_counter() - t
+
+    t = time.perf_counter()
+    Reader.from_records(records, trusted=True)
+    trusted = time.perf_counter() - t
+
+    print(f"Конструкторы: {one_by_one * 1000:.0f} мс, пачка: {batch * 1000:.0f} мс, "
+          f"доверенные данные: {trusted * 1000:.0f} мс")
+    assert trusted < one_by_one
+
+
+if __name__ == "__main__":
+    test_constructor_messages()
+    test_validate_many_reports_all_errors()
+    test_batch_and_trusted_speed()
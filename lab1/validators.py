@@ -0,0 +1,111 @@
+# Проверки полей читателей и библиотекарей.
+# Регулярные выражения компилируются один раз при импорте модуля, а проверки
+# каждого класса собраны в схему «поле -> функция». По схеме validate_many
+# проверяет целую пачку записей за один проход и возвращает сразу все ошибки,
+# а не только первую, как конструктор
+
+import re
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+PHONE = re.compile(r"\+7\d{10}")
+READER_TYPES = frozenset({"school", "student", "regular"})
+
+Validator = Callable[[object], object]
+Schema = Tuple[Tuple[str, Validator], ...]
+
+
+def text(field: str) -> Validator:
+    # Непустая строка; возвращается без пробелов по краям
+    def check(value) -> str:
+        if not isinstance(value, str):
+            raise TypeError(f"{field} должен быть строкой.")
+        value = value.strip()
+        if not value:
+            raise ValueError(f"{field} не может быть пустым.")
+        return value
+    return check
+
+
+def phone(value) -> str:
+    if not isinstance(value, str):
+        raise TypeError("phone должен быть строкой.")
+    value = value.strip()
+    if PHONE.fullmatch(value) is None:
+        raise ValueError("Неверный формат телефона. Пример: +70000000000")
+    return value
+
+
+def is_phone(value: str) -> bool:
+    return PHONE.fullmatch(value.strip()) is not None
+
+
+def email(value) -> str:
+    if not isinstance(value, str):
+        raise TypeError("email должен быть строкой.")
+    value = value.strip()
+    if not value or "@" not in value:
+        raise ValueError("Некорректный email.")
+    return value
+
+
+def reader_type(value) -> str:
+    if not isinstance(value, str):
+        raise TypeError("reader_type должен быть строкой.")
+    if value not in READER_TYPES:
+        raise ValueError("reader_type должен быть 'school', 'student' или 'regular'.")
+    return value
+
+
+def course(value) -> int:
+    if not isinstance(value, int):
+        raise TypeError("course должен быть целым числом.")
+    if not (1 <= value <= 6):
+        raise ValueError("course должен быть от 1 до 6.")
+    return value
+
+
+first_name = text("first_name")
+last_name = text("last_name")
+school_name = text("school_name")
+grade = text("grade")
+university = text("university")
+
+PERSON: Schema = (("first_name", first_name), ("last_name", last_name))
+LIBRARIAN: Schema = PERSON + (("phone", phone),)
+READER: Schema = LIBRARIAN + (("email", email), ("reader_type", reader_type))
+SCHOOL: Schema = READER + (("school_name", school_name), ("grade", grade))
+STUDENT: Schema = READER + (("university", university), ("course", course))
+
+_READER_SCHEMAS = {"school": SCHOOL, "student": STUDENT}
+
+
+def reader_schema(record: dict) -> Schema:
+    # Набор полей зависит от типа читателя
+    return _READER_SCHEMAS.get(record.get("reader_type"), READER)
+
+
+def validate_many(
+    records: Iterable[dict],
+    schema: Union[Schema, Callable[[dict], Schema]]
+) -> Tuple[List[dict], List[Tuple[int, str, str]]]:
+    # Возвращает (проверенные записи, ошибки). Проверенная запись — копия исходной
+    # с очищенными значениями; ошибка — (номер записи, поле, сообщение)
+    pick = schema if callable(schema) else None
+    valid: List[dict] = []
+    errors: List[Tuple[int, str, str]] = []
+    for i, record in enumerate(records):
+        fields = pick(record) if pick is not None else schema
+        clean: Dict[str, object] = dict(record)
+        ok = True
+        for name, check in fields:
+            try:
+                clean[name] = check(record[name])
+            except KeyError:
+                errors.append((i, name, "поле отсутствует."))
+                ok = False
+            except (TypeError, ValueError) as e:
+                errors.append((i, name, str(e)))
+                ok = False
+        if ok:
+            valid.append(clean)
+    return valid, errors